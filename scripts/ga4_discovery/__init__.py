@@ -0,0 +1,60 @@
+"""
+Auto-discover and populate GA4 properties from Google Analytics Admin API
+
+This package:
+1. Connects to Google Analytics Admin API
+2. Discovers all GA4 properties you have access to
+3. Extracts property ID, domain, and metadata
+4. Generates SQL INSERT statements / CSV
+5. Optionally loads them directly into Supabase or PostgreSQL
+
+Usage:
+    python -m ga4_discovery --output sql
+    python -m ga4_discovery --output csv
+    python -m ga4_discovery --insert-to-supabase
+    python -m ga4_discovery --load-to-postgres --pipeline
+    python -m ga4_discovery --workers 16
+    python -m ga4_discovery --strategy summaries
+    python -m ga4_discovery --engine async --concurrency 64
+    python -m ga4_discovery --incremental
+    python -m ga4_discovery --resume
+    python -m ga4_discovery --credentials sa-1.json --credentials sa-2.json
+    python -m ga4_discovery --domain-winner oldest --collision-report collisions.csv
+
+Monthly metrics (GA4 Data API batch reports):
+    python -m ga4_discovery.monthly --month 2025-10 --load-to-postgres
+
+Client libraries (google-analytics-admin/-data, supabase, psycopg) are imported only
+on the code path that needs them, so importing the package is cheap.
+"""
+
+from .categories import CategoryRules, categorize_properties, categorize_property, load_category_rules
+from .discovery import AsyncGA4PropertyDiscovery, GA4PropertyDiscovery, PropertySnapshot
+from .domains import DomainIndex
+from .loaders import insert_to_supabase, load_to_postgres, stream_to_supabase
+from .pipeline import DatabasePipeline
+from .records import PropertyRecord, normalize_domain
+from .scheduler import RequestScheduler
+from .sharding import ShardedDiscovery
+from .writers import generate_csv, generate_sql_inserts
+
+__all__ = [
+    'AsyncGA4PropertyDiscovery',
+    'CategoryRules',
+    'DatabasePipeline',
+    'DomainIndex',
+    'GA4PropertyDiscovery',
+    'PropertyRecord',
+    'PropertySnapshot',
+    'RequestScheduler',
+    'ShardedDiscovery',
+    'categorize_properties',
+    'categorize_property',
+    'generate_csv',
+    'generate_sql_inserts',
+    'insert_to_supabase',
+    'load_category_rules',
+    'load_to_postgres',
+    'normalize_domain',
+    'stream_to_supabase',
+]
@@ -0,0 +1,7 @@
+"""Entry point for ``python -m ga4_discovery``"""
+
+from .cli import main
+
+# Guarded so worker processes started by sharded runs do not rerun the CLI
+if __name__ == '__main__':
+    main()
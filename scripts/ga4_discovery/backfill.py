@@ -0,0 +1,133 @@
+"""
+Gap-aware backfill planning for ga4_monthly_metrics_v2
+
+sync-all-2024-months.js and sync-all-2025.js fetch every property for every
+month, whether the row is already there or not. The planner instead builds a
+(property × month) coverage matrix from the discovered properties and the
+existing ga4_monthly_metrics_v2 rows (read once, key columns only), and
+schedules Data API batches only for cells that are missing or marked
+is_stale. Batches are ordered newest month first, so an interrupted
+backfill has already filled the months the dashboards look at, and a newly
+discovered property costs only the months it actually lacks.
+"""
+
+from datetime import date
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .reports import MONTHS_PER_BATCH
+
+MISSING = 0
+STALE = 1
+PRESENT = 2
+
+CELL_STATES = ('missing', 'stale', 'present')
+
+
+class CoverageMatrix:
+    """State of every (property, month) cell: MISSING, STALE or PRESENT
+
+    One bytearray row per (domain, property_id), the unique key of
+    ga4_monthly_metrics_v2 rows besides the month: a row stored under another
+    domain does not cover a property. One byte per month, months newest first.
+    """
+
+    def __init__(self, properties: Iterable[Tuple[str, str]], months: Sequence[date]):
+        """
+        Args:
+            properties: (domain, property_id) pairs that should have rows
+            months: Months that should be covered (first days)
+        """
+        self.months: List[date] = sorted(set(months), reverse=True)
+        self.month_index: Dict[str, int] = {month.isoformat(): index for index, month in enumerate(self.months)}
+        self.cells: Dict[Tuple[str, str], bytearray] = {}
+        for domain, property_id in properties:
+            if (domain, property_id) not in self.cells:
+                self.cells[(domain, property_id)] = bytearray(len(self.months))
+
+    def mark(self, domain: str, property_id: str, metric_month: str, stale: bool = False):
+        """Record an existing row; rows for other properties, domains or months are ignored"""
+        row = self.cells.get((domain, property_id))
+        index = self.month_index.get(metric_month[:10])
+        if row is None or index is None:
+            return
+        state = STALE if stale else PRESENT
+        # A cell counts as present if any of its rows is fresh
+        row[index] = max(row[index], state)
+
+    @classmethod
+    def from_rows(cls, properties: Iterable[Tuple[str, str]], months: Sequence[date],
+                  rows: Iterable[Tuple[str, str, str, bool]]) -> 'CoverageMatrix':
+        """Build the matrix from (domain, property_id, metric_month, is_stale) rows in one pass"""
+        matrix = cls(properties, months)
+        for domain, property_id, metric_month, stale in rows:
+            matrix.mark(domain, str(property_id), str(metric_month), bool(stale))
+        return matrix
+
+    def needed(self, domain: str, property_id: str) -> List[date]:
+        """Months of a property that are missing or stale, newest first"""
+        row = self.cells[(domain, property_id)]
+        return [month for month, state in zip(self.months, row) if state != PRESENT]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of cells in each state"""
+        counts = dict.fromkeys(CELL_STATES, 0)
+        for row in self.cells.values():
+            for state, name in enumerate(CELL_STATES):
+                counts[name] += row.count(state)
+        return counts
+
+    def month_counts(self) -> Dict[date, Dict[str, int]]:
+        """Cells in each state per month, newest month first"""
+        by_month = {month: dict.fromkeys(CELL_STATES, 0) for month in self.months}
+        for row in self.cells.values():
+            for month, state in zip(self.months, row):
+                by_month[month][CELL_STATES[state]] += 1
+        return by_month
+
+    def plan(self) -> List[Tuple[str, str, List[date]]]:
+        """Data API batches for the missing and stale cells, newest month first
+
+        A property's needed months are paired in order (up to MONTHS_PER_BATCH
+        per batch). Batches are sorted by their newest month, descending, then
+        by domain.
+        """
+        batches = []
+        for domain, property_id in self.cells:
+            needed = self.needed(domain, property_id)
+            for start in range(0, len(needed), MONTHS_PER_BATCH):
+                batches.append((domain, property_id, needed[start:start + MONTHS_PER_BATCH]))
+
+        batches.sort(key=lambda batch: (-batch[2][0].toordinal(), batch[0], batch[1]))
+        return batches
+
+    def print_report(self, batches: Sequence[Tuple[str, str, List[date]]]):
+        counts = self.counts()
+        total = sum(counts.values())
+        print(f"Coverage of {len(self.cells)} properties × {len(self.months)} months ({total} cells):")
+        print(f"  - Present: {counts['present']}")
+        print(f"  - Stale: {counts['stale']}")
+        print(f"  - Missing: {counts['missing']}")
+        for month, month_counts in self.month_counts().items():
+            todo = month_counts['missing'] + month_counts['stale']
+            if todo:
+                print(f"    {month:%Y-%m}: {month_counts['missing']} missing, {month_counts['stale']} stale")
+        full = len(self.cells) * -(-len(self.months) // MONTHS_PER_BATCH)
+        print(f"  → {len(batches)} batchRunReports requests instead of {full} for a full re-fetch")
+
+
+def plan_backfill(properties: Iterable[Tuple[str, str]], months: Sequence[date],
+                  rows: Iterable[Tuple[str, str, str, bool]]
+                  ) -> Tuple[CoverageMatrix, List[Tuple[str, str, List[date]]]]:
+    """Coverage matrix and the batches that fill its gaps
+
+    Args:
+        properties: (domain, property_id) pairs that should have rows
+        months: Months to cover
+        rows: Existing (domain, property_id, metric_month, is_stale) rows
+
+    Returns:
+        (matrix, batches) where batches feed MonthlyMetricsEngine.fetch_batches
+    """
+    matrix = CoverageMatrix.from_rows(properties, months, rows)
+    return matrix, matrix.plan()
+
@@ -0,0 +1,572 @@
+"""
+Offline benchmarks for discovery, access grants and the output writers
+
+Drives the real discovery engines, the grant planner and the SQL / CSV /
+Supabase writers against FakeAdminService, an in-process stand-in for the
+Admin API with configurable latency, error rate and fleet size. Fleets are
+skewed like the production one: a single large account (easyvet Clinics) owns
+a third of the properties, a few mid-size accounts follow and the long tail is
+small or empty accounts. No network access or credentials are needed.
+
+For each scenario the benchmark reports wall time, API calls (every page
+counts), retries, errors and peak Python heap (tracemalloc).
+
+Usage:
+    python -m ga4_discovery.benchmark
+    python -m ga4_discovery.benchmark --fleet 400 4000 --latency-ms 80 --error-rate 0.01
+    python -m ga4_discovery.benchmark --scenarios sync-accounts async-summaries --workers 32
+    python -m ga4_discovery.benchmark --fleet 40000 --json benchmark.json
+"""
+
+import os
+import json
+import time
+import random
+import argparse
+import asyncio
+import importlib.util
+import tempfile
+import threading
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+from .discovery import AsyncGA4PropertyDiscovery, GA4PropertyDiscovery
+from .loaders import insert_to_supabase, SUPABASE_BATCH_SIZE
+from .records import PropertyRecord
+from .scheduler import RequestScheduler
+from .writers import CsvFileWriter, create_sql_writer, SQL_MULTIROW_BATCH_SIZE
+
+# Fleet sizes used when --fleet is not given
+DEFAULT_FLEET_SIZES = [400]
+
+# Share of the fleet owned by the one large account, and by each mid-size one
+LARGE_ACCOUNT_NAME = 'easyvet Clinics'
+LARGE_ACCOUNT_SHARE = 0.35
+MID_ACCOUNT_COUNT = 5
+MID_ACCOUNT_SHARE = 0.03
+
+# Admin API default page sizes
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+DISCOVERY_SCENARIOS = ('sync-accounts', 'sync-summaries', 'async-accounts', 'async-summaries')
+GRANT_SCENARIOS = ('grant-plan', 'grant-apply')
+WRITER_SCENARIOS = ('sql-statements', 'sql-multirow', 'sql-copy', 'csv', 'supabase')
+SCENARIOS = DISCOVERY_SCENARIOS + GRANT_SCENARIOS + WRITER_SCENARIOS
+
+GRANT_EMAIL = 'benchmark@example.iam.gserviceaccount.com'
+
+# Stand-ins for the Admin API request types the grant flow builds, so it runs
+# without google-analytics-admin installed
+FAKE_ADMIN_TYPES = SimpleNamespace(
+    AccessBinding=SimpleNamespace,
+    BatchCreateAccessBindingsRequest=SimpleNamespace,
+    CreateAccessBindingRequest=SimpleNamespace,
+    ListPropertiesRequest=SimpleNamespace,
+)
+
+
+class FakeApiError(Exception):
+    """Transient error raised by the fake API; ``code`` makes it retryable"""
+
+    def __init__(self, method: str, code: int = 429):
+        super().__init__(f"{code} RESOURCE_EXHAUSTED: injected failure in {method}")
+        self.code = code
+
+
+def build_fleet(size: int, seed: int = 0) -> SimpleNamespace:
+    """Build accounts, properties, data streams and access bindings for ``size`` properties
+
+    Besides the skewed account sizes the fleet mirrors the real data: most
+    easyvet clinics share easyvet.com under a path or a subdomain, some small
+    sites are tracked twice (www. and bare), a few properties have no web
+    stream, and part of the fleet already grants the benchmark email access.
+    """
+    rng = random.Random(seed)
+    created = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+    sizes = [int(size * LARGE_ACCOUNT_SHARE)] + [int(size * MID_ACCOUNT_SHARE)] * MID_ACCOUNT_COUNT
+    remaining = size - sum(sizes)
+    while remaining > 0:
+        count = min(remaining, rng.choice([1, 1, 1, 2, 2, 3, 5]))
+        sizes.append(count)
+        remaining -= count
+        # About one account in ten has no properties left
+        if rng.random() < 0.1:
+            sizes.append(0)
+
+    fleet = SimpleNamespace(accounts=[], properties={}, streams={}, bindings={}, size=size)
+    property_number = 100000000
+
+    for index, count in enumerate(sizes):
+        account_name = f"accounts/{1000 + index}"
+        display_name = LARGE_ACCOUNT_NAME if index == 0 else f"Practice Group {index}"
+        fleet.accounts.append(SimpleNamespace(name=account_name, display_name=display_name))
+        fleet.properties[account_name] = []
+
+        # Some accounts grant access to every property at account level
+        account_bound = index > 0 and rng.random() < 0.2
+        fleet.bindings[account_name] = [SimpleNamespace(user=GRANT_EMAIL)] if account_bound else []
+
+        for number in range(count):
+            property_number += 1
+            name = f"properties/{property_number}"
+            slug = f"clinic-{index}-{number}"
+
+            if index == 0:
+                uri = rng.choice([f"https://www.easyvet.com/{slug}", f"https://{slug}.easyvet.com",
+                                  "https://www.easyvet.com/"])
+                title = f"easyvet {slug}"
+            else:
+                uri = f"https://{'www.' if rng.random() < 0.5 else ''}{slug}-vet.com"
+                title = f"{slug.replace('-', ' ').title()} Veterinary"
+
+            fleet.properties[account_name].append(SimpleNamespace(
+                name=name,
+                display_name=title,
+                parent=account_name,
+                property_type=SimpleNamespace(name='PROPERTY_TYPE_ORDINARY'),
+                currency_code='USD',
+                time_zone='America/Los_Angeles',
+                create_time=created + timedelta(days=property_number % 1000),
+                update_time=created + timedelta(days=1000),
+            ))
+
+            if rng.random() < 0.05:
+                fleet.streams[name] = []
+            else:
+                fleet.streams[name] = [SimpleNamespace(web_stream_data=SimpleNamespace(default_uri=uri))]
+
+            # The same site tracked by a second property (www. and bare domain)
+            if index > 0 and rng.random() < 0.02:
+                property_number += 1
+                duplicate = f"properties/{property_number}"
+                fleet.properties[account_name].append(SimpleNamespace(
+                    **{**vars(fleet.properties[account_name][-1]), 'name': duplicate}
+                ))
+                fleet.streams[duplicate] = [SimpleNamespace(web_stream_data=SimpleNamespace(
+                    default_uri=uri.replace('https://www.', 'https://')
+                ))]
+
+            bound = account_bound or rng.random() < 0.5
+            fleet.bindings[name] = [SimpleNamespace(user=GRANT_EMAIL)] if bound else []
+
+    fleet.property_count = sum(len(props) for props in fleet.properties.values())
+    return fleet
+
+
+def property_records(fleet: SimpleNamespace) -> List[PropertyRecord]:
+    """Resolved property records for the fleet, as discovery would yield them"""
+    props = []
+    for account in fleet.accounts:
+        for prop in fleet.properties[account.name]:
+            streams = fleet.streams[prop.name]
+            props.append(PropertyRecord(
+                property_id=prop.name.split('/')[-1],
+                display_name=prop.display_name,
+                domain=GA4PropertyDiscovery._domain_from_streams(prop, streams),
+                default_uri=GA4PropertyDiscovery._web_stream_uri(streams),
+                currency_code=prop.currency_code,
+                time_zone=prop.time_zone,
+                account=prop.parent,
+                create_time=prop.create_time.isoformat(),
+            ))
+    return props
+
+
+class FakePager:
+    """Pager shaped like google.api_core's
+
+    Attributes of the current response (next_page_token, the item field) read
+    through the pager; iterating it fetches later pages through ``_method``.
+    """
+
+    def __init__(self, fetch_page: Callable, response: SimpleNamespace, field: str):
+        self._method = fetch_page
+        self._response = response
+        self._field = field
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    @property
+    def pages(self):
+        yield self._response
+        while self._response.next_page_token:
+            self._response = self._method(self._response.next_page_token)
+            yield self._response
+
+    def __iter__(self):
+        for page in self.pages:
+            yield from getattr(page, self._field)
+
+
+class FakeAsyncPager(FakePager):
+    """Async pager shaped like google.api_core's"""
+
+    @property
+    async def pages(self):
+        yield self._response
+        while self._response.next_page_token:
+            self._response = await self._method(self._response.next_page_token)
+            yield self._response
+
+    async def __aiter__(self):
+        async for page in self.pages:
+            for item in getattr(page, self._field):
+                yield item
+
+
+class FakeAdminService:
+    """In-process Admin API with latency, injected errors and call counting
+
+    client() and async_client() return objects with the subset of the
+    AnalyticsAdminServiceClient / AnalyticsAdminServiceAsyncClient surface the
+    scripts use. Every page fetch is one API call: it sleeps for the configured
+    latency (with +/- ``jitter``) and fails with probability ``error_rate``.
+    """
+
+    def __init__(self, fleet: SimpleNamespace, latency: float = 0.05, jitter: float = 0.2,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.fleet = fleet
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.calls: Dict[str, int] = {}
+        self.injected_errors = 0
+        self.lock = threading.Lock()
+
+    def _admit(self, method: str) -> float:
+        """Count one request and return its latency, or raise an injected error"""
+        with self.lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            failed = self.rng.random() < self.error_rate
+            delay = self.latency * (1 + self.rng.uniform(-self.jitter, self.jitter))
+            if failed:
+                self.injected_errors += 1
+
+        if failed:
+            raise FakeApiError(method)
+        return delay
+
+    def _request(self, method: str):
+        time.sleep(self._admit(method))
+
+    async def _request_async(self, method: str):
+        await asyncio.sleep(self._admit(method))
+
+    @staticmethod
+    def _pages(items: List, page_size: int, field: str) -> List[SimpleNamespace]:
+        """List responses for ``items`` in ``field``; a page's next_page_token is the next page's index"""
+        page_size = min(MAX_PAGE_SIZE, page_size or DEFAULT_PAGE_SIZE)
+        chunks = [items[start:start + page_size] for start in range(0, len(items), page_size)] or [[]]
+        return [SimpleNamespace(**{field: chunk},
+                                next_page_token=str(index + 1) if index + 1 < len(chunks) else '')
+                for index, chunk in enumerate(chunks)]
+
+    def _account_summaries(self) -> List:
+        return [
+            SimpleNamespace(
+                account=account.name,
+                display_name=account.display_name,
+                property_summaries=[
+                    SimpleNamespace(property=prop.name, display_name=prop.display_name,
+                                    property_type=prop.property_type, parent=prop.parent)
+                    for prop in self.fleet.properties[account.name]
+                ],
+            )
+            for account in self.fleet.accounts
+        ]
+
+    def _resolve(self, method: str, request=None, **kwargs):
+        """Items, page size and page token for a list method"""
+        if request is None:
+            request = kwargs
+        get = request.get if isinstance(request, dict) else lambda key: getattr(request, key, None)
+
+        if method == 'list_accounts':
+            items = self.fleet.accounts
+        elif method == 'list_properties':
+            items = self.fleet.properties.get(get('filter').split('parent:', 1)[-1], [])
+        elif method == 'list_account_summaries':
+            items = self._account_summaries()
+        elif method == 'list_data_streams':
+            items = self.fleet.streams.get(get('parent'), [])
+        else:
+            items = self.fleet.bindings.get(get('parent'), [])
+
+        return items, get('page_size'), get('page_token') or '0'
+
+    def client(self) -> SimpleNamespace:
+        """Sync client; pagers fetch further pages lazily as they are iterated"""
+        def list_method(method):
+            def call(request=None, **kwargs):
+                items, page_size, page_token = self._resolve(method, request, **kwargs)
+                field = method[len('list_'):]
+                pages = self._pages(items, page_size, field)
+
+                def fetch_page(page_token: str) -> SimpleNamespace:
+                    self._request(method)
+                    return pages[int(page_token)]
+
+                return FakePager(fetch_page, fetch_page(page_token), field)
+            return call
+
+        def batch_create_access_bindings(request=None, **kwargs):
+            self._request('batch_create_access_bindings')
+            return SimpleNamespace(access_bindings=list(request.requests))
+
+        methods = ('list_accounts', 'list_properties', 'list_account_summaries',
+                   'list_data_streams', 'list_access_bindings')
+        return SimpleNamespace(batch_create_access_bindings=batch_create_access_bindings,
+                               **{method: list_method(method) for method in methods})
+
+    def async_client(self) -> SimpleNamespace:
+        """Async client; awaiting a list call fetches the first page"""
+        def list_method(method):
+            async def call(request=None, **kwargs):
+                items, page_size, page_token = self._resolve(method, request, **kwargs)
+                field = method[len('list_'):]
+                pages = self._pages(items, page_size, field)
+
+                async def fetch_page(page_token: str) -> SimpleNamespace:
+                    await self._request_async(method)
+                    return pages[int(page_token)]
+
+                return FakeAsyncPager(fetch_page, await fetch_page(page_token), field)
+            return call
+
+        methods = ('list_accounts', 'list_properties', 'list_account_summaries', 'list_data_streams')
+        return SimpleNamespace(**{method: list_method(method) for method in methods})
+
+
+class FakeSupabase:
+    """Supabase client stand-in for insert_to_supabase, with per-request latency"""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.rows: Dict[str, Dict] = {}
+        self.calls: Dict[str, int] = {}
+
+    def table(self, name: str):
+        return _FakeSupabaseQuery(self)
+
+
+class _FakeSupabaseQuery:
+    def __init__(self, db: FakeSupabase):
+        self.db = db
+        self.rows = None
+        self.bounds = None
+
+    def select(self, columns):
+        return self
+
+    def order(self, column):
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        method = 'select' if self.rows is None else 'upsert'
+        self.db.calls[method] = self.db.calls.get(method, 0) + 1
+        time.sleep(self.db.latency)
+
+        if self.rows is None:
+            start, end = self.bounds
+            return SimpleNamespace(data=sorted(self.db.rows.values(), key=lambda row: row['domain'])[start:end + 1])
+
+        for row in self.rows:
+            self.db.rows[row['domain']] = dict(row)
+        return SimpleNamespace(data=self.rows)
+
+
+def _discovery_class(engine: str):
+    """Discovery engine bound to a FakeAdminService instead of Google clients"""
+    base = AsyncGA4PropertyDiscovery if engine == 'async' else GA4PropertyDiscovery
+
+    class FakeDiscovery(base):
+        def __init__(self, service: FakeAdminService, **kwargs):
+            self.service = service
+            super().__init__(credentials=object(), **kwargs)
+
+        def _create_client(self):
+            return None if engine == 'async' else self.service.client()
+
+        def _create_async_client(self):
+            return self.service.async_client()
+
+    return FakeDiscovery
+
+
+def _load_grant_module():
+    """Import grant-ga4-access.py (hyphenated, so not importable by name)"""
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'grant-ga4-access.py')
+    spec = importlib.util.spec_from_file_location('grant_ga4_access', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _run_discovery(scenario: str, service: FakeAdminService, scheduler: RequestScheduler,
+                   args: argparse.Namespace) -> int:
+    engine, strategy = scenario.split('-')
+    if engine == 'async':
+        discovery = _discovery_class('async')(service, concurrency=args.concurrency,
+                                              strategy=strategy, scheduler=scheduler)
+    else:
+        discovery = _discovery_class('sync')(service, workers=args.workers,
+                                             strategy=strategy, scheduler=scheduler)
+    return sum(1 for _ in discovery.iter_properties())
+
+
+def _run_grant(scenario: str, service: FakeAdminService, scheduler: RequestScheduler,
+               args: argparse.Namespace) -> int:
+    grant = _load_grant_module()
+    client = service.client()
+    plan = grant.plan_access_grants(client, [GRANT_EMAIL], scheduler, args.workers,
+                                    admin_types=FAKE_ADMIN_TYPES)
+    if scenario == 'grant-apply':
+        grant.apply_access_grants(client, plan, scheduler, args.workers, admin_types=FAKE_ADMIN_TYPES)
+    return len(plan)
+
+
+def _run_writer(scenario: str, props: List[PropertyRecord], args: argparse.Namespace,
+                supabase: Optional[FakeSupabase]) -> int:
+    if scenario == 'supabase':
+        insert_to_supabase(props, '', '', args.supabase_batch_size, client=supabase)
+        return len(props)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if scenario == 'csv':
+            writer = CsvFileWriter(os.path.join(workdir, 'properties.csv'))
+        else:
+            writer = create_sql_writer(os.path.join(workdir, 'properties.sql'),
+                                       scenario.split('-', 1)[1], args.sql_batch_size)
+        for prop in props:
+            writer.write(prop)
+        writer.close(True)
+
+    return len(props)
+
+
+def _measure(run: Callable[[], int]) -> Dict:
+    """Run ``run`` with stdout silenced, returning wall time, peak heap and its result"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+            items = run()
+    finally:
+        wall = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {'items': items, 'wall_seconds': round(wall, 3), 'peak_mb': round(peak / 1024 / 1024, 2)}
+
+
+def run_scenario(scenario: str, fleet: SimpleNamespace, args: argparse.Namespace) -> Dict:
+    """Run one scenario against a fresh fake API and return its measurements"""
+    service = FakeAdminService(fleet, latency=args.latency_ms / 1000, error_rate=args.error_rate,
+                               seed=args.seed)
+    scheduler = RequestScheduler(qps=args.qps, max_retries=args.max_retries,
+                                 base_delay=args.retry_delay, max_delay=args.retry_delay * 8)
+    supabase = FakeSupabase(latency=args.latency_ms / 1000)
+
+    if scenario in DISCOVERY_SCENARIOS:
+        result = _measure(lambda: _run_discovery(scenario, service, scheduler, args))
+    elif scenario in GRANT_SCENARIOS:
+        result = _measure(lambda: _run_grant(scenario, service, scheduler, args))
+    else:
+        props = property_records(fleet)
+        result = _measure(lambda: _run_writer(scenario, props, args, supabase))
+
+    calls = dict(service.calls)
+    calls.update({f"supabase_{method}": count for method, count in supabase.calls.items()})
+
+    result.update({
+        'scenario': scenario,
+        'fleet': fleet.property_count,
+        'api_calls': sum(calls.values()),
+        'calls_by_method': calls,
+        'retries': sum(counters['retries'] for counters in scheduler.stats.values()),
+        'errors': sum(counters['errors'] for counters in scheduler.stats.values()),
+    })
+    return result
+
+
+def print_results(results: List[Dict]):
+    """Print one table row per scenario"""
+    print(f"\n{'Scenario':<18} {'Fleet':>7} {'Items':>7} {'Wall s':>9} {'API calls':>10} "
+          f"{'Retries':>8} {'Errors':>7} {'Peak MB':>8}")
+    print('-' * 82)
+    for result in results:
+        print(f"{result['scenario']:<18} {result['fleet']:>7} {result['items']:>7} "
+              f"{result['wall_seconds']:>9.2f} {result['api_calls']:>10} {result['retries']:>8} "
+              f"{result['errors']:>7} {result['peak_mb']:>8.2f}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog='python -m ga4_discovery.benchmark',
+        description='Benchmark discovery, grants and writers against a local fake Admin API'
+    )
+    parser.add_argument('--fleet', type=int, nargs='+', default=DEFAULT_FLEET_SIZES,
+                        help='Fleet sizes in properties, e.g. 400 4000 40000 (default: 400)')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS),
+                        help='Scenarios to run (default: all)')
+    parser.add_argument('--latency-ms', type=float, default=50.0,
+                        help='Latency of each fake API or Supabase request (default: 50)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Probability that a fake Admin API request fails with 429 (default: 0)')
+    parser.add_argument('--workers', type=int, default=16,
+                        help='Threads for the sync engine and the grant flow (default: 16)')
+    parser.add_argument('--concurrency', type=int, default=64,
+                        help='Requests in flight for the async engine (default: 64)')
+    parser.add_argument('--qps', type=float, default=0,
+                        help='Scheduler rate limit, 0 = unlimited (default: 0)')
+    parser.add_argument('--max-retries', type=int, default=5,
+                        help='Scheduler retries for injected errors (default: 5)')
+    parser.add_argument('--retry-delay', type=float, default=0.05,
+                        help='Scheduler base backoff in seconds (default: 0.05)')
+    parser.add_argument('--sql-batch-size', type=int, default=SQL_MULTIROW_BATCH_SIZE,
+                        help=f'Rows per statement for sql-multirow (default: {SQL_MULTIROW_BATCH_SIZE})')
+    parser.add_argument('--supabase-batch-size', type=int, default=SUPABASE_BATCH_SIZE,
+                        help=f'Rows per upsert for the supabase scenario (default: {SUPABASE_BATCH_SIZE})')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for fleet shape and injected errors')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.fleet:
+        fleet = build_fleet(size, args.seed)
+        print(f"\nFleet of {fleet.property_count} properties in {len(fleet.accounts)} accounts "
+              f"({len(fleet.properties[fleet.accounts[0].name])} in {LARGE_ACCOUNT_NAME})")
+
+        for scenario in args.scenarios:
+            print(f"  running {scenario}...", flush=True)
+            try:
+                results.append(run_scenario(scenario, fleet, args))
+            except ImportError as e:
+                print(f"  ⚠ Skipping {scenario}: {e}")
+
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'generated': datetime.now().isoformat(), 'args': vars(args), 'results': results},
+                      f, indent=2)
+        print(f"\n✓ Results saved to: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Auto-categorization of discovered properties
+
+Rules come from a JSON file (category_rules.json next to this module by
+default):
+
+    {
+      "default": "website",
+      "rules": [
+        {"category": "blog", "keywords": ["blog"]},
+        {"category": "ecommerce", "keywords": ["shop", "store", "ecommerce"]}
+      ]
+    }
+
+Keywords are matched case-insensitively as substrings of the display name and
+the domain; the first rule with any match wins. All keywords are compiled into
+one regex, and results are memoized per display name and per domain, so
+categorizing a large fleet where domains and names repeat is cheap.
+"""
+
+import os
+import re
+import json
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'category_rules.json')
+
+DEFAULT_CATEGORY = 'website'
+
+
+class CategoryRules:
+    """Ordered keyword rules compiled into a single matcher"""
+
+    def __init__(self, rules: Sequence[Tuple[str, Sequence[str]]], default: str = DEFAULT_CATEGORY):
+        """
+        Args:
+            rules: (category, keywords) pairs in priority order
+            default: Category for properties no rule matches
+        """
+        self.rules = [(category, tuple(keyword.lower() for keyword in keywords if keyword))
+                      for category, keywords in rules]
+        self.default = default
+
+        # Alternatives are listed in rule order, so at each position the
+        # highest-priority keyword starting there is the one captured; the
+        # lookahead makes matches overlap, so no later keyword is skipped
+        self.priority: Dict[str, int] = {}
+        for index, (_, keywords) in enumerate(self.rules):
+            for keyword in keywords:
+                self.priority.setdefault(keyword, index)
+
+        alternatives = '|'.join(re.escape(keyword) for keyword in self.priority)
+        self.pattern = re.compile(f"(?=({alternatives}))") if alternatives else None
+
+        # Best rule index per text (None = no match); names and domains repeat
+        # across a fleet (one domain, many properties) so most lookups are hits
+        self.cache: Dict[str, Optional[int]] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str) -> 'CategoryRules':
+        """Load rules from a JSON config file
+
+        Raises:
+            ValueError: If the file does not have the expected layout
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+        try:
+            rules = [(rule['category'], rule['keywords']) for rule in config['rules']]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid category rules in {path}: each rule needs 'category' and 'keywords'") from e
+
+        for category, keywords in rules:
+            if not isinstance(category, str) or isinstance(keywords, str):
+                raise ValueError(f"Invalid category rules in {path}: bad rule for {category!r}")
+
+        return cls(rules, config.get('default', DEFAULT_CATEGORY))
+
+    def _best_rule(self, text: str) -> Optional[int]:
+        """Index of the highest-priority rule with a keyword in ``text``"""
+        best = self.cache.get(text, -1)
+        if best != -1:
+            return best
+
+        best = None
+        if self.pattern is not None:
+            for match in self.pattern.finditer(text.lower()):
+                index = self.priority[match.group(1)]
+                if best is None or index < best:
+                    best = index
+                    if best == 0:
+                        break
+
+        with self.lock:
+            self.cache[text] = best
+        return best
+
+    def categorize(self, display_name: str, domain: str) -> str:
+        matches = [index for index in (self._best_rule(display_name), self._best_rule(domain))
+                   if index is not None]
+        return self.rules[min(matches)][0] if matches else self.default
+
+    def categorize_all(self, properties: Iterable[Dict]) -> List[str]:
+        """Categories for a batch of property dictionaries, in order"""
+        return [self.categorize(prop['display_name'], prop['domain']) for prop in properties]
+
+
+_rules: Optional[CategoryRules] = None
+
+
+def load_category_rules(path: Optional[str] = None) -> CategoryRules:
+    """Load a rules file and make it the one categorize_property uses
+
+    Args:
+        path: JSON rules file (default: category_rules.json in this package)
+    """
+    global _rules
+    _rules = CategoryRules.from_file(path or DEFAULT_RULES_FILE)
+    return _rules
+
+
+def get_category_rules() -> CategoryRules:
+    """The active rules, loading the default file on first use"""
+    return _rules or load_category_rules()
+
+
+def categorize_property(prop: Dict) -> str:
+    """Auto-categorize property based on domain or name"""
+    return get_category_rules().categorize(prop['display_name'], prop['domain'])
+
+
+def categorize_properties(properties: Iterable[Dict]) -> List[str]:
+    """Categorize a batch of properties in one pass"""
+    return get_category_rules().categorize_all(properties)
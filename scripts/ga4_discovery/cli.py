@@ -0,0 +1,544 @@
+"""
+Command-line interface for GA4 property discovery
+
+Run as ``python -m ga4_discovery``; see --help for options.
+"""
+
+import os
+import sys
+import argparse
+from typing import Dict, List, Optional
+
+from .categories import load_category_rules, DEFAULT_RULES_FILE
+from .discovery import (
+    AsyncGA4PropertyDiscovery, GA4PropertyDiscovery, PropertySnapshot,
+    DISCOVERY_STRATEGIES, DEFAULT_SNAPSHOT_FILE, DEFAULT_JOURNAL_FILE,
+)
+from .domains import DomainIndex, DOMAIN_WINNER_RULES
+from .journal import RunJournal
+from .loaders import (
+    fetch_current_properties, insert_to_supabase, is_available, load_to_postgres, stream_to_supabase,
+    SUPABASE_BATCH_SIZE, SUPABASE_CONCURRENCY,
+)
+from .metrics import ApiMetrics, write_metrics
+from .pipeline import DatabasePipeline, DEFAULT_QUEUE_SIZE
+from .records import as_record
+from .scheduler import RequestScheduler, DEFAULT_QPS, DEFAULT_MAX_RETRIES
+from .sharding import ShardedDiscovery
+from .writers import CsvFileWriter, create_sql_writer, SQL_FORMATS, SQL_MULTIROW_BATCH_SIZE
+
+
+def main(argv: Optional[List[str]] = None):
+    # Set UTF-8 encoding for Windows console
+    if sys.platform == 'win32':
+        sys.stdout.reconfigure(encoding='utf-8')
+
+    parser = argparse.ArgumentParser(
+        prog='python -m ga4_discovery',
+        description='Auto-discover GA4 properties and populate database',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Generate SQL file
+  python -m ga4_discovery --output sql --sql-file properties.sql
+
+  # Generate CSV file
+  python -m ga4_discovery --output csv --csv-file properties.csv
+
+  # Insert directly to Supabase
+  python -m ga4_discovery --insert-to-supabase
+
+  # Write to the database while discovery is still running
+  python -m ga4_discovery --load-to-postgres --pipeline
+
+  # Resolve data streams with 16 concurrent workers
+  python -m ga4_discovery --workers 16
+
+  # List properties from account summaries (fewer API calls)
+  python -m ga4_discovery --strategy summaries --workers 16
+
+  # Async engine with up to 64 requests in flight
+  python -m ga4_discovery --engine async --concurrency 64
+
+  # Only re-resolve properties that are new or changed since the last run
+  python -m ga4_discovery --incremental --snapshot-file snapshot.json
+
+  # Continue a run that was interrupted
+  python -m ga4_discovery --resume
+
+  # Compact SQL: one multi-row upsert per 500 properties, or COPY data + merge script
+  python -m ga4_discovery --sql-format multirow
+  python -m ga4_discovery --sql-format copy
+
+  # Only the INSERTs/UPDATEs/deactivations that differ from the current table
+  python -m ga4_discovery --sql-format diff --postgres-dsn postgresql://...
+
+  # Keep the oldest property for shared domains and report every collision
+  python -m ga4_discovery --domain-winner oldest --collision-report collisions.csv
+
+  # Per-method call counts and latency histograms for monitoring
+  python -m ga4_discovery --metrics-json metrics.json --metrics-prom /var/lib/node_exporter/ga4.prom
+
+  # Use specific credentials file
+  python -m ga4_discovery --credentials /path/to/service-account.json --output sql
+
+  # Shard the run across two service accounts (one worker process each)
+  python -m ga4_discovery --credentials sa-1.json --credentials sa-2.json
+
+Environment Variables:
+  GA4_SERVICE_ACCOUNT_CREDENTIALS  - Service account JSON (as string)
+  GA4_CREDENTIALS_PATH             - Path to service account JSON file
+  SUPABASE_URL                     - Supabase project URL
+  SUPABASE_ANON_KEY                - Supabase anon key
+  DATABASE_URL                     - PostgreSQL connection string for --load-to-postgres
+        """
+    )
+
+    parser.add_argument(
+        '--credentials',
+        action='append',
+        help='Path to service account JSON file (or use GA4_CREDENTIALS_PATH env var); '
+             'repeat to shard discovery across several service accounts'
+    )
+    parser.add_argument(
+        '--output',
+        choices=['sql', 'csv', 'both'],
+        default='sql',
+        help='Output format (default: sql)'
+    )
+    parser.add_argument(
+        '--sql-file',
+        default='discovered-ga4-properties.sql',
+        help='Output SQL file path (default: discovered-ga4-properties.sql)'
+    )
+    parser.add_argument(
+        '--sql-format',
+        choices=SQL_FORMATS,
+        default='statements',
+        help='SQL layout: one upsert per property, multi-row upserts, COPY TSV + merge script, '
+             'or only the changes against the current ga4_properties rows (default: statements)'
+    )
+    parser.add_argument(
+        '--sql-batch-size',
+        type=int,
+        default=SQL_MULTIROW_BATCH_SIZE,
+        help=f'Rows per INSERT with --sql-format multirow or diff (default: {SQL_MULTIROW_BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '--csv-file',
+        default='discovered-ga4-properties.csv',
+        help='Output CSV file path (default: discovered-ga4-properties.csv)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Concurrent data stream lookups (default: 1, serial)'
+    )
+    parser.add_argument(
+        '--strategy',
+        choices=DISCOVERY_STRATEGIES,
+        default='accounts',
+        help='Property listing strategy: per-account list_properties or account summaries (default: accounts)'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=['sync', 'async'],
+        default='sync',
+        help='Discovery engine: thread-based sync client or asyncio client (default: sync)'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=32,
+        help='Maximum Admin API requests in flight with --engine async (default: 32)'
+    )
+    parser.add_argument(
+        '--qps',
+        type=float,
+        default=DEFAULT_QPS,
+        help=f'Admin API requests per second across all workers, 0 = unlimited (default: {DEFAULT_QPS:g})'
+    )
+    parser.add_argument(
+        '--max-retries',
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=f'Retries for transient Admin API errors (default: {DEFAULT_MAX_RETRIES})'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Reuse the snapshot for unchanged properties and report added/removed/modified ones '
+             '(needs --strategy accounts)'
+    )
+    parser.add_argument(
+        '--snapshot-file',
+        default=DEFAULT_SNAPSHOT_FILE,
+        help=f'Snapshot file used by --incremental (default: {DEFAULT_SNAPSHOT_FILE})'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted run: accounts and properties in the journal are not fetched again'
+    )
+    parser.add_argument(
+        '--journal-file',
+        default=DEFAULT_JOURNAL_FILE,
+        help=f'Journal of completed work, written on every run (default: {DEFAULT_JOURNAL_FILE})'
+    )
+    parser.add_argument(
+        '--category-rules',
+        default=DEFAULT_RULES_FILE,
+        help='JSON file with the keyword rules used to categorize properties (default: ga4_discovery/category_rules.json)'
+    )
+    parser.add_argument(
+        '--domain-winner',
+        choices=DOMAIN_WINNER_RULES,
+        default='root-path',
+        help='Which property keeps a domain shared by several properties (default: root-path)'
+    )
+    parser.add_argument(
+        '--keep-duplicate-domains',
+        action='store_true',
+        help='Write every property, even when domains repeat, and keep none in memory. Otherwise '
+             'each domain\'s first property is written as it is discovered, every property is kept '
+             'in memory until discovery ends (about 0.7 KB each, ~70 MB per 100k properties), and '
+             'shared domains are then rewritten with their --domain-winner property'
+    )
+    parser.add_argument(
+        '--collision-report',
+        help='Write the duplicate-domain report to this CSV file'
+    )
+    parser.add_argument(
+        '--insert-to-supabase',
+        action='store_true',
+        help='Insert directly into Supabase database'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=SUPABASE_BATCH_SIZE,
+        help=f'Rows per Supabase bulk upsert request (default: {SUPABASE_BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '--supabase-url',
+        help='Supabase URL (or use SUPABASE_URL env var)'
+    )
+    parser.add_argument(
+        '--supabase-key',
+        help='Supabase anon key (or use SUPABASE_ANON_KEY env var)'
+    )
+    parser.add_argument(
+        '--load-to-postgres',
+        action='store_true',
+        help='COPY properties straight into PostgreSQL and merge them into ga4_properties'
+    )
+    parser.add_argument(
+        '--postgres-dsn',
+        help='PostgreSQL connection string (or use DATABASE_URL env var)'
+    )
+    parser.add_argument(
+        '--pipeline',
+        action='store_true',
+        help='With --insert-to-supabase / --load-to-postgres, write rows while discovery runs '
+             'instead of after it'
+    )
+    parser.add_argument(
+        '--pipeline-queue-size',
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help=f'Properties buffered per database before --pipeline discovery waits for it '
+             f'(default: {DEFAULT_QUEUE_SIZE})'
+    )
+    parser.add_argument(
+        '--supabase-concurrency',
+        type=int,
+        default=SUPABASE_CONCURRENCY,
+        help=f'Supabase upserts in flight at once with --pipeline (default: {SUPABASE_CONCURRENCY})'
+    )
+    parser.add_argument(
+        '--keep-missing-active',
+        action='store_true',
+        help='With --load-to-postgres or --sql-format diff, leave rows for properties no longer discovered active'
+    )
+    parser.add_argument(
+        '--metrics-json',
+        help='Write per-method call counts and latency histograms to this JSON file'
+    )
+    parser.add_argument(
+        '--metrics-prom',
+        help='Write the same metrics as a Prometheus textfile (node_exporter textfile collector)'
+    )
+
+    args = parser.parse_args(argv)
+
+    # Get credentials; GA4_CREDENTIALS_PATH may list several files separated by os.pathsep
+    creds_paths = args.credentials or [path for path in os.getenv('GA4_CREDENTIALS_PATH', '').split(os.pathsep) if path]
+    creds_path = creds_paths[0] if creds_paths else None
+    creds_json = os.getenv('GA4_SERVICE_ACCOUNT_CREDENTIALS')
+
+    if not creds_path and not creds_json:
+        print("ERROR: Must provide credentials via --credentials flag or environment variables")
+        print("  Set GA4_CREDENTIALS_PATH or GA4_SERVICE_ACCOUNT_CREDENTIALS")
+        sys.exit(1)
+
+    sharded = len(creds_paths) > 1
+    if sharded and args.incremental:
+        print("ERROR: --incremental is not supported with several --credentials files")
+        sys.exit(1)
+    if args.incremental and args.strategy == 'summaries':
+        # Property summaries carry no update_time, so changes could not be detected
+        print("ERROR: --incremental needs --strategy accounts (property summaries have no update_time)")
+        sys.exit(1)
+
+    # Admin API, Supabase and PostgreSQL requests are all recorded here
+    metrics = ApiMetrics()
+
+    try:
+        # Initialize discovery
+        print("Initializing GA4 property discovery...")
+        if sharded:
+            print(f"Using {len(creds_paths)} credentials files: {', '.join(creds_paths)}")
+        elif creds_path:
+            print(f"Using credentials file: {creds_path}")
+            creds_kwargs = {'credentials_path': creds_path}
+        else:
+            print("Using credentials from environment variable")
+            creds_kwargs = {'credentials_json': creds_json}
+
+        snapshot = None
+        if args.incremental:
+            snapshot = PropertySnapshot(args.snapshot_file)
+            print(f"Incremental mode: {len(snapshot.previous)} properties in {args.snapshot_file}")
+
+        scheduler = RequestScheduler(qps=args.qps, max_retries=args.max_retries, metrics=metrics)
+
+        # Load the rules now so a broken rules file fails before discovery
+        load_category_rules(args.category_rules)
+
+        journal = None
+        if sharded:
+            # Each worker process has its own scheduler (qps is per credential)
+            # and journal (<journal-file stem>.<n>.jsonl)
+            discovery = ShardedDiscovery(
+                creds_paths, args.engine,
+                discovery_kwargs={'strategy': args.strategy,
+                                  **({'concurrency': args.concurrency} if args.engine == 'async'
+                                     else {'workers': args.workers})},
+                scheduler_kwargs={'qps': args.qps, 'max_retries': args.max_retries},
+                metrics=metrics, journal_file=args.journal_file, resume=args.resume,
+            )
+        else:
+            # Settings that change which properties are listed must match to resume
+            journal = RunJournal(args.journal_file, {'command': 'discovery', 'strategy': args.strategy},
+                                 resume=args.resume)
+
+            if args.engine == 'async':
+                discovery = AsyncGA4PropertyDiscovery(**creds_kwargs, concurrency=args.concurrency,
+                                                      strategy=args.strategy, snapshot=snapshot,
+                                                      scheduler=scheduler, journal=journal)
+            else:
+                discovery = GA4PropertyDiscovery(**creds_kwargs, workers=args.workers,
+                                                 strategy=args.strategy, snapshot=snapshot,
+                                                 scheduler=scheduler, journal=journal)
+
+        supabase_url = args.supabase_url or os.getenv('SUPABASE_URL')
+        supabase_key = args.supabase_key or os.getenv('SUPABASE_ANON_KEY')
+        postgres_dsn = args.postgres_dsn or os.getenv('DATABASE_URL')
+
+        # Check Supabase settings before spending time on discovery
+        if args.insert_to_supabase:
+            if not supabase_url or not supabase_key:
+                print("\nERROR: Supabase credentials not provided")
+                print("  Set --supabase-url and --supabase-key")
+                print("  OR set SUPABASE_URL and SUPABASE_ANON_KEY environment variables")
+                sys.exit(1)
+            if not is_available('supabase'):
+                print("\nERROR: Supabase package not installed. Install with: pip install supabase")
+                sys.exit(1)
+
+        if args.pipeline and not (args.insert_to_supabase or args.load_to_postgres):
+            print("\nERROR: --pipeline needs --insert-to-supabase or --load-to-postgres")
+            sys.exit(1)
+
+        if args.load_to_postgres:
+            if not postgres_dsn:
+                print("\nERROR: PostgreSQL connection string not provided")
+                print("  Set --postgres-dsn OR set the DATABASE_URL environment variable")
+                sys.exit(1)
+            if not is_available('psycopg'):
+                print("\nERROR: psycopg package not installed. Install with: pip install \"psycopg[binary]\"")
+                sys.exit(1)
+
+        # The diff format compares against the table as it is now, read in one pass
+        existing = None
+        if args.output in ['sql', 'both'] and args.sql_format == 'diff':
+            if postgres_dsn and is_available('psycopg'):
+                print("Reading current ga4_properties rows from PostgreSQL...")
+                existing = fetch_current_properties(dsn=postgres_dsn, metrics=metrics)
+            elif supabase_url and supabase_key and is_available('supabase'):
+                print("Reading current ga4_properties rows from Supabase...")
+                existing = fetch_current_properties(supabase_url=supabase_url, supabase_key=supabase_key,
+                                                    metrics=metrics)
+            else:
+                print("\nERROR: --sql-format diff needs the current ga4_properties rows")
+                print("  Set --postgres-dsn or DATABASE_URL (requires psycopg)")
+                print("  OR set Supabase credentials (requires supabase)")
+                sys.exit(1)
+            print(f"✓ {len(existing)} existing rows")
+
+        # Output files are written as properties are discovered
+        writers = []
+        if args.output in ['sql', 'both']:
+            writers.append(create_sql_writer(args.sql_file, args.sql_format, args.sql_batch_size,
+                                             existing, deactivate_missing=not args.keep_missing_active,
+                                             listing_failures=discovery.listing_failures))
+        if args.output in ['csv', 'both']:
+            writers.append(CsvFileWriter(args.csv_file))
+
+        # Without --keep-duplicate-domains, each domain's first property is
+        # written as it arrives and every property is indexed, so shared
+        # domains can be settled from all their candidates once discovery ends
+        domain_index = None if args.keep_duplicate_domains else DomainIndex(args.domain_winner)
+
+        # Database loads either need the full set (duplicate domains, diff
+        # against the table) or, with --pipeline, stream rows while discovering
+        collected = None
+        pipeline = None
+        if args.pipeline:
+            loaders = {}
+            if args.insert_to_supabase:
+                loaders['supabase'] = lambda props, superseded: stream_to_supabase(
+                    props, supabase_url, supabase_key, args.batch_size, args.supabase_concurrency,
+                    superseded, metrics=metrics)
+            if args.load_to_postgres:
+                loaders['postgres'] = lambda props, superseded: load_to_postgres(
+                    props, postgres_dsn, deactivate_missing=not args.keep_missing_active, metrics=metrics,
+                    superseded=superseded, listing_failures=discovery.listing_failures)
+            pipeline = DatabasePipeline(loaders, args.pipeline_queue_size, domain_index)
+            print(f"Pipelined database writes: {', '.join(loaders)} (queue of {args.pipeline_queue_size})")
+        elif args.insert_to_supabase or args.load_to_postgres:
+            collected = []
+
+        def emit(prop: Dict):
+            for writer in writers:
+                writer.write(prop)
+            if collected is not None:
+                collected.append(prop)
+
+        # Discover properties
+        print("\nDiscovering GA4 properties...\n")
+        discovered = 0
+        complete = False
+        try:
+            for prop in discovery.iter_properties():
+                discovered += 1
+                if pipeline is not None:
+                    # Also adds to domain_index
+                    first = pipeline.add(prop)
+                else:
+                    first = domain_index is None or domain_index.add(prop)
+                if first:
+                    emit(prop)
+            complete = True
+        finally:
+            if journal is not None:
+                # Accounts that failed to list are not journaled, so --resume retries them
+                if complete and not discovery.listing_failures:
+                    journal.finish()
+                else:
+                    journal.close()
+            if not complete:
+                print(f"\n⚠ Discovery interrupted; rerun with --resume to continue from {args.journal_file}")
+            elif discovery.listing_failures:
+                print(f"\n⚠ {len(discovery.listing_failures)} accounts could not be listed; missing properties "
+                      f"will not be deactivated")
+                if journal is not None:
+                    print(f"  Rerun with --resume to retry them from {args.journal_file}")
+            print("\nGenerating outputs...\n")
+            try:
+                if domain_index is not None:
+                    # Domains won by a property after the one already written
+                    superseded = set()
+                    for streamed, winner in domain_index.replacements():
+                        superseded.add(streamed.property_id)
+                        for writer in writers:
+                            writer.replace(streamed, winner)
+                        if collected is not None:
+                            collected.append(winner)
+                    if collected is not None and superseded:
+                        collected[:] = [prop for prop in collected
+                                        if as_record(prop).property_id not in superseded]
+            finally:
+                try:
+                    for writer in writers:
+                        writer.close(complete)
+                finally:
+                    if pipeline is not None:
+                        print("\nWaiting for pipelined database writes...")
+                        pipeline.finish(complete)
+
+        scheduler.print_summary()
+        if discovery.resumed:
+            print(f"  - Properties resumed from journal: {discovery.resumed}")
+
+        if not discovered:
+            print("\n⚠ No GA4 properties found. Check that:")
+            print("  1. Service account has Analytics Viewer access")
+            print("  2. Service account email is added to GA4 properties")
+            print("  3. You're using the correct credentials")
+            sys.exit(1)
+
+        if domain_index is not None:
+            domain_index.print_report()
+            if args.collision_report:
+                domain_index.write_report(args.collision_report)
+
+        if snapshot is not None:
+            changes = snapshot.changes()
+            print("\nChanges since last snapshot:")
+            print(f"  - Reused without API calls: {snapshot.reused}")
+            for kind in ('added', 'removed', 'modified'):
+                print(f"  - {kind.capitalize()}: {len(changes[kind])}")
+                for property_id in changes[kind]:
+                    entry = snapshot.current.get(property_id) or snapshot.previous[property_id]
+                    print(f"      {property_id}  {entry['info']['display_name']}")
+            snapshot.save()
+            print(f"✓ Snapshot saved to: {args.snapshot_file}")
+
+        # Insert to Supabase if requested (already done with --pipeline)
+        if args.insert_to_supabase:
+            if pipeline is None:
+                print("\nInserting to Supabase...\n")
+                insert_to_supabase(collected, supabase_url, supabase_key, args.batch_size, metrics=metrics)
+            metrics.print_summary('supabase', 'Supabase requests')
+
+        if args.load_to_postgres:
+            if pipeline is None:
+                print("\nLoading to PostgreSQL...\n")
+                load_to_postgres(collected, postgres_dsn, deactivate_missing=not args.keep_missing_active,
+                                 metrics=metrics, listing_failures=discovery.listing_failures)
+            metrics.print_summary('postgres', 'PostgreSQL steps')
+
+        print("\n✓ Discovery complete!")
+        print("\nNext steps:")
+        if args.output in ['sql', 'both']:
+            print("  1. Review {args.sql_file}")
+            print("  2. Run in Supabase SQL Editor or psql")
+        if args.insert_to_supabase:
+            print("  1. Verify data in Supabase dashboard")
+            print("  2. Run first GA4 sync")
+        if args.load_to_postgres:
+            print("  1. Verify: SELECT COUNT(*) FROM ga4_properties WHERE is_active;")
+            print("  2. Run first GA4 sync")
+
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+    finally:
+        # Written on failure too, so a slow or broken run can still be diagnosed
+        write_metrics(metrics, args.metrics_json, args.metrics_prom)
+
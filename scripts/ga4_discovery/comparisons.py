@@ -0,0 +1,146 @@
+"""
+Columnar previous-month, trend and change columns for ga4_monthly_metrics_v2
+
+Each ga4_monthly_metrics_v2 row carries, for the 7 core metrics, the previous
+month's value, a trend and a percent change: 21 columns derived from two
+months of core metrics. monthly_metrics_row() derives them one row at a time
+with reports.compare(). derive_month() does it for a whole month of properties
+at once: the core metrics go into one array per column, and the 21 columns are
+computed with NumPy array operations. The results are identical to compare(),
+because the same float64 operations run in the same order.
+
+This needs only stored rows, not the Data API, so a month's comparison columns
+can be recomputed offline (python -m ga4_discovery.monthly
+--recompute-comparisons) and written back in one bulk write. Without NumPy the
+same functions fall back to compare() per value.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .loaders import is_available
+from .reports import CORE_COLUMNS, TREND_THRESHOLD, compare
+
+DERIVED_COLUMNS = (
+    tuple(f'previous_month_{column}' for column in CORE_COLUMNS)
+    + tuple(f'{column}_trend' for column in CORE_COLUMNS)
+    + tuple(f'{column}_change' for column in CORE_COLUMNS)
+)
+
+# The numeric derived columns are INTEGER or DECIMAL(n,2) in
+# database/ga4-new-schema.sql, so stored values come back at this scale
+COLUMN_SCALE = Decimal('0.01')
+
+TRENDS = ('down', 'neutral', 'up')
+
+
+def _compare_numpy(current, previous) -> Tuple[List, List]:
+    """compare() over whole arrays (any shape): percent changes and trends as nested lists"""
+    import numpy as np
+
+    current = np.asarray(current, dtype=np.float64)
+    previous = np.asarray(previous, dtype=np.float64)
+    zero = previous == 0
+    grew = current > 0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = (current - previous) / np.where(zero, 1.0, previous) * 100
+    change[zero] = np.where(grew[zero], 100.0, 0.0)
+
+    # Trend as an index into TRENDS: 0 down, 1 neutral, 2 up
+    codes = np.ones(change.shape, dtype=np.intp)
+    codes[change > TREND_THRESHOLD] = 2
+    codes[change < -TREND_THRESHOLD] = 0
+    codes[zero] = np.where(grew[zero], 2, 1)
+    return change.tolist(), np.array(TRENDS, dtype=object)[codes].tolist()
+
+
+def compare_columns(current: Sequence[float], previous: Sequence[float]) -> Tuple[List[float], List[str]]:
+    """Percent changes and trends of two equal-length columns, as compare() per pair"""
+    if len(current) != len(previous):
+        raise ValueError(f"Column lengths differ: {len(current)} and {len(previous)}")
+    if is_available('numpy'):
+        return _compare_numpy(current, previous)
+
+    results = [compare(value, before) for value, before in zip(current, previous)]
+    return [change for change, _ in results], [trend for _, trend in results]
+
+
+def derive_columns(current: Dict[str, Sequence[float]],
+                   previous: Dict[str, Sequence[float]]) -> Dict[str, List]:
+    """The 21 derived columns from core metric columns of a month and the month before
+
+    With NumPy the 7 columns are stacked into one 7 × N array per month and
+    compared in a single pass.
+
+    Args:
+        current: Core column name -> values, one per property
+        previous: Core column name -> the same properties' previous-month values
+
+    Returns:
+        Derived column name (see DERIVED_COLUMNS) -> values
+    """
+    if is_available('numpy'):
+        changes, trends = _compare_numpy([current[column] for column in CORE_COLUMNS],
+                                         [previous[column] for column in CORE_COLUMNS])
+    else:
+        pairs = [compare_columns(current[column], previous[column]) for column in CORE_COLUMNS]
+        changes = [change for change, _ in pairs]
+        trends = [trend for _, trend in pairs]
+
+    derived = {}
+    for index, column in enumerate(CORE_COLUMNS):
+        derived[f'previous_month_{column}'] = list(previous[column])
+        derived[f'{column}_trend'] = trends[index]
+        derived[f'{column}_change'] = changes[index]
+    return derived
+
+
+def derive_month(rows: Sequence[Dict], previous_rows: Dict[str, Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """Recompute the derived columns of one month of ga4_monthly_metrics_v2 rows
+
+    Args:
+        rows: The month's rows (core columns and the stored derived columns)
+        previous_rows: Property ID -> that property's row for the month before
+
+    A property without a previous-month row keeps its stored previous_month_*
+    values (they came from the Data API when the row was fetched), so only
+    the trend and change columns are recomputed for it.
+
+    Returns:
+        (rows with the derived columns replaced, the subset whose values changed)
+    """
+    if not rows:
+        return [], []
+
+    def previous_value(row: Dict, column: str) -> float:
+        before: Optional[Dict] = previous_rows.get(row['property_id'])
+        value = before[column] if before is not None else row[f'previous_month_{column}']
+        return float(value or 0)
+
+    current = {column: [float(row[column] or 0) for row in rows] for column in CORE_COLUMNS}
+    previous = {column: [previous_value(row, column) for row in rows] for column in CORE_COLUMNS}
+    derived = derive_columns(current, previous)
+
+    updated = []
+    changed = []
+    for index, row in enumerate(rows):
+        new_row = dict(row)
+        for column in DERIVED_COLUMNS:
+            new_row[column] = derived[column][index]
+        if any(_differs(row.get(column), new_row[column]) for column in DERIVED_COLUMNS):
+            changed.append(new_row)
+        updated.append(new_row)
+    return updated, changed
+
+
+def to_column_scale(value) -> Decimal:
+    """``value`` rounded as PostgreSQL stores it in a DECIMAL(n,2) column (half up)"""
+    return Decimal(str(value)).quantize(COLUMN_SCALE, rounding=ROUND_HALF_UP)
+
+
+def _differs(stored, computed) -> bool:
+    if isinstance(computed, str) or stored is None:
+        return stored != computed
+    # Stored values are rounded to the column scale, so compare at that scale
+    return to_column_scale(stored) != to_column_scale(computed)
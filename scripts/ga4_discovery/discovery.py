@@ -0,0 +1,759 @@
+"""
+GA4 property discovery through the Google Analytics Admin API
+
+GA4PropertyDiscovery lists accounts and properties with the sync client and
+resolves data streams on a thread pool; AsyncGA4PropertyDiscovery does the same
+on the asyncio client. Both yield the same property records in the same order.
+
+The Admin API client library is imported the first time a discovery object is
+created, so importing this module (or printing the CLI help) stays fast.
+"""
+
+import os
+import json
+import asyncio
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from types import SimpleNamespace
+from typing import AsyncIterator, Callable, Collection, Dict, Iterable, Iterator, List, Optional
+
+from .journal import RunJournal
+from .records import PropertyRecord, DEFAULT_CURRENCY_CODE, DEFAULT_TIME_ZONE
+from .scheduler import RequestScheduler
+
+
+def _import_admin_api() -> SimpleNamespace:
+    """Import the Admin API client and credentials modules on first use"""
+    try:
+        from google.analytics.admin import AnalyticsAdminServiceClient, AnalyticsAdminServiceAsyncClient
+        from google.oauth2 import service_account
+    except ImportError as e:
+        raise ImportError("Missing required packages. Install with: "
+                          "pip install google-analytics-admin google-auth") from e
+
+    return SimpleNamespace(
+        AnalyticsAdminServiceClient=AnalyticsAdminServiceClient,
+        AnalyticsAdminServiceAsyncClient=AnalyticsAdminServiceAsyncClient,
+        service_account=service_account,
+    )
+
+
+# Property listing strategies: one list_properties call per account, or the
+# account summaries tree fetched in a few large pages
+DISCOVERY_STRATEGIES = ('accounts', 'summaries')
+
+# Largest page size accepted by ListAccountSummaries
+ACCOUNT_SUMMARIES_PAGE_SIZE = 200
+
+# How often the async engine's helper thread checks that its consumer is still reading, in seconds
+_PUT_POLL_INTERVAL = 0.1
+
+
+def _ordered_map(fn: Callable, items: Iterable, workers: int) -> Iterator:
+    """Lazily map ``fn`` over ``items`` on a thread pool, yielding in order
+
+    Unlike Executor.map, items are pulled from ``items`` only as results are
+    consumed, with at most ``workers * 2`` calls pending at any time.
+    """
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+# Default location of the journal used by --resume
+DEFAULT_JOURNAL_FILE = '.ga4-discovery-journal.jsonl'
+
+# Journal key for the property listing of the summaries strategy
+SUMMARIES_LISTING_KEY = 'account_summaries'
+
+# Property attributes kept in the journal, so resumed listings can be resolved
+# without listing the account again
+JOURNAL_PROPERTY_FIELDS = ('name', 'display_name', 'parent', 'currency_code', 'time_zone')
+JOURNAL_PROPERTY_TIMES = ('create_time', 'update_time')
+
+
+def _property_record(prop) -> Dict:
+    """JSON-serializable copy of the property attributes discovery uses"""
+    record = {field: getattr(prop, field) for field in JOURNAL_PROPERTY_FIELDS if hasattr(prop, field)}
+    for field in JOURNAL_PROPERTY_TIMES:
+        if hasattr(prop, field):
+            record[field] = getattr(prop, field).isoformat()
+    return record
+
+
+def _property_from_record(record: Dict) -> SimpleNamespace:
+    """Property-like object rebuilt from a journal record"""
+    prop = SimpleNamespace(**{field: value for field, value in record.items() if field in JOURNAL_PROPERTY_FIELDS})
+    for field in JOURNAL_PROPERTY_TIMES:
+        if field in record:
+            setattr(prop, field, datetime.fromisoformat(record[field]))
+    return prop
+
+
+# Default location of the snapshot used by --incremental
+DEFAULT_SNAPSHOT_FILE = '.ga4-discovery-snapshot.json'
+
+
+class PropertySnapshot:
+    """Persisted property metadata from the previous discovery run
+
+    Each property is stored with its ``update_time`` and display name next to
+    the property that was resolved for it. During a run, properties whose
+    metadata is unchanged reuse the stored record instead of listing data
+    streams again, and every property seen is recorded for the next snapshot.
+
+    Note that adding or editing a data stream does not bump the property's
+    ``update_time``; run without --incremental to force a full re-resolve.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.previous: Dict[str, Dict] = {}
+        self.current: Dict[str, Dict] = {}
+        self.reused = 0
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.previous = json.load(f).get('properties', {})
+
+    @staticmethod
+    def _fingerprint(prop) -> Dict:
+        """Metadata that marks a property as changed when it differs"""
+        return {
+            'update_time': prop.update_time.isoformat() if hasattr(prop, 'update_time') else None,
+            'display_name': prop.display_name,
+        }
+
+    def lookup(self, prop) -> Optional[PropertyRecord]:
+        """Return the stored property record if the property is unchanged"""
+        entry = self.previous.get(prop.name.split('/')[-1])
+        if entry is None or entry['fingerprint'] != self._fingerprint(prop):
+            return None
+
+        # Snapshots written before default_uri was recorded need a fresh lookup
+        if 'default_uri' not in entry['info']:
+            return None
+
+        self.reused += 1
+        return PropertyRecord.from_dict(entry['info'])
+
+    def record(self, prop, info: PropertyRecord):
+        """Remember the property record resolved for ``prop`` in this run"""
+        self.current[info.property_id] = {
+            'fingerprint': self._fingerprint(prop),
+            'info': info.to_dict(),
+        }
+
+    def changes(self) -> Dict[str, List[str]]:
+        """Property IDs added, removed and modified since the previous snapshot"""
+        return {
+            'added': sorted(pid for pid in self.current if pid not in self.previous),
+            'removed': sorted(pid for pid in self.previous if pid not in self.current),
+            'modified': sorted(
+                pid for pid, entry in self.current.items()
+                if pid in self.previous and entry != self.previous[pid]
+            ),
+        }
+
+    def save(self):
+        """Write this run's properties as the new snapshot"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'generated': datetime.now().isoformat(),
+                'properties': self.current,
+            }, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class GA4PropertyDiscovery:
+    """Discover all GA4 properties accessible by service account"""
+
+    def __init__(self, credentials_path: Optional[str] = None, credentials_json: Optional[str] = None,
+                 workers: int = 1, strategy: str = 'accounts',
+                 snapshot: Optional[PropertySnapshot] = None,
+                 scheduler: Optional[RequestScheduler] = None, credentials=None,
+                 journal: Optional[RunJournal] = None,
+                 shard: Optional[Dict[str, Collection[str]]] = None):
+        """Initialize with service account credentials
+
+        Args:
+            credentials_path: Path to service account JSON file
+            credentials_json: JSON string of service account credentials
+            workers: Number of threads used to resolve data streams (1 = serial)
+            strategy: How properties are listed, 'accounts' or 'summaries'
+            snapshot: Previous run's snapshot; unchanged properties skip stream lookups
+                (strategy 'accounts' only: summaries have no update_time)
+            scheduler: Rate limiter / retry policy shared by all Admin API calls
+            credentials: Already-loaded credentials, used instead of a path or JSON
+            journal: Records listed accounts and resolved properties; entries
+                already in it (from an interrupted run) are not fetched again
+            shard: Only discover these properties, as {account name: property
+                names}; other accounts are not listed (see sharding.py)
+        """
+        if strategy not in DISCOVERY_STRATEGIES:
+            raise ValueError(f"Unknown discovery strategy: {strategy}")
+        if snapshot is not None and strategy == 'summaries':
+            raise ValueError("A snapshot needs the 'accounts' strategy; property summaries have no update_time")
+
+        if credentials is not None:
+            self.credentials = credentials
+        elif credentials_path:
+            self.credentials = _import_admin_api().service_account.Credentials.from_service_account_file(
+                credentials_path,
+                scopes=['https://www.googleapis.com/auth/analytics.readonly']
+            )
+        elif credentials_json:
+            creds_dict = json.loads(credentials_json)
+            self.credentials = _import_admin_api().service_account.Credentials.from_service_account_info(
+                creds_dict,
+                scopes=['https://www.googleapis.com/auth/analytics.readonly']
+            )
+        else:
+            raise ValueError("Must provide either credentials_path or credentials_json")
+
+        self.client = self._create_client()
+        self.workers = max(1, workers)
+        self.strategy = strategy
+        self.snapshot = snapshot
+        self.scheduler = scheduler or RequestScheduler()
+        self.journal = journal
+        self.shard = shard
+        self.resumed = 0
+        # Accounts whose properties could not be listed: the run then does not
+        # have the whole fleet, so nothing may be deactivated for being missing
+        self.listing_failures: List[str] = []
+
+    def _create_client(self):
+        """Create the Admin API client used for discovery"""
+        return _import_admin_api().AnalyticsAdminServiceClient(credentials=self.credentials)
+
+    def discover_all_properties(self) -> List[PropertyRecord]:
+        """Discover all GA4 properties accessible to the service account
+
+        Returns:
+            PropertyRecord per property, with id, name, domain, etc.
+        """
+        return list(self.iter_properties())
+
+    def iter_properties(self) -> Iterator[PropertyRecord]:
+        """Yield property records as soon as each one is resolved
+
+        Properties are listed and resolved lazily, so memory stays flat however
+        large the fleet is and callers can write each record as it arrives.
+        """
+        if self.strategy == 'summaries':
+            try:
+                ga4_props = self._list_properties_by_summaries()
+            except Exception as e:
+                print(f"  ⚠ Warning: Account summaries failed ({e}), falling back to per-account listing")
+                ga4_props = self._iter_properties_by_account()
+        else:
+            ga4_props = self._iter_properties_by_account()
+
+        count = 0
+        for property_info in self._resolve_properties(ga4_props):
+            count += 1
+            yield property_info
+
+        print(f"\n✓ Total GA4 properties discovered: {count}")
+
+    def _iter_properties_by_account(self) -> Iterator:
+        """Yield GA4 properties with one list_properties call per account"""
+        try:
+            # List all accounts
+            accounts = self.scheduler.list('list_accounts', self.client.list_accounts)
+        except Exception as e:
+            print(f"ERROR: Failed to list accounts: {e}")
+            raise
+
+        for account in accounts:
+            if not self._in_shard(account.name):
+                continue
+            print(f"Scanning account: {account.display_name} ({account.name})")
+
+            account_properties = self._journaled_listing(account.name)
+            if account_properties is not None:
+                yield from self._shard_filter(account.name, account_properties)
+                continue
+
+            # List properties for this account
+            try:
+                account_properties = self.scheduler.list(
+                    'list_properties', self.client.list_properties,
+                    filter=f"parent:{account.name}"
+                )
+            except Exception as e:
+                print(f"  ⚠ Warning: Could not list properties for {account.display_name}: {e}")
+                self.listing_failures.append(account.name)
+                continue
+
+            # Only include GA4 properties (not Universal Analytics)
+            ga4_props = [prop for prop in account_properties
+                         if prop.property_type.name == 'PROPERTY_TYPE_ORDINARY']
+            self._journal_listing(account.name, ga4_props)
+            yield from self._shard_filter(account.name, ga4_props)
+
+    def _list_properties_by_summaries(self) -> List:
+        """List GA4 properties from the account summaries tree
+
+        A single paginated ListAccountSummaries walk returns every account with
+        its property summaries, so empty accounts cost nothing. Summaries carry
+        no currency, time zone or create time; _extract_property_info falls back
+        to its defaults for those fields.
+        """
+        ga4_props = self._journaled_listing(SUMMARIES_LISTING_KEY)
+        if ga4_props is not None:
+            return self._shard_filter_by_parent(ga4_props)
+
+        ga4_props = []
+
+        summaries = self.scheduler.list(
+            'list_account_summaries', self.client.list_account_summaries,
+            request={'page_size': ACCOUNT_SUMMARIES_PAGE_SIZE}
+        )
+
+        for summary in summaries:
+            print(f"Scanning account: {summary.display_name} ({summary.account})"
+                  f" - {len(summary.property_summaries)} properties")
+
+            for prop_summary in summary.property_summaries:
+                # Only include GA4 properties (not Universal Analytics)
+                if prop_summary.property_type.name == 'PROPERTY_TYPE_ORDINARY':
+                    ga4_props.append(SimpleNamespace(
+                        name=prop_summary.property,
+                        display_name=prop_summary.display_name,
+                        parent=prop_summary.parent or summary.account,
+                    ))
+
+        self._journal_listing(SUMMARIES_LISTING_KEY, ga4_props)
+        return self._shard_filter_by_parent(ga4_props)
+
+    def _in_shard(self, account_name: str) -> bool:
+        return self.shard is None or account_name in self.shard
+
+    def _shard_filter(self, account_name: str, props: List) -> List:
+        """The properties of one account that belong to this shard"""
+        if self.shard is None:
+            return props
+        names = self.shard.get(account_name, ())
+        return [prop for prop in props if prop.name in names]
+
+    def _shard_filter_by_parent(self, props: List) -> List:
+        if self.shard is None:
+            return props
+        return [prop for prop in props if prop.name in self.shard.get(prop.parent, ())]
+
+    def _journaled_listing(self, key: str) -> Optional[List]:
+        """Properties listed for ``key`` (an account, or all summaries) by an earlier run"""
+        if self.journal is None:
+            return None
+
+        records = self.journal.get('listing', key)
+        if records is None:
+            return None
+        return [_property_from_record(record) for record in records]
+
+    def _journal_listing(self, key: str, props: List):
+        if self.journal is not None:
+            self.journal.record('listing', key, [_property_record(prop) for prop in props])
+
+    def _resolve_properties(self, props: Iterable) -> Iterator[PropertyRecord]:
+        """Resolve data streams and yield property info for each property
+
+        With workers > 1 the list_data_streams calls run on a thread pool that
+        shares this instance's client. Results keep the order of ``props`` and
+        a failure on one property never affects the others.
+        """
+        if self.workers > 1:
+            print(f"\nResolving data streams with {self.workers} workers...")
+
+        for property_info in _ordered_map(self._safe_extract_property_info, props, self.workers):
+            if property_info is None:
+                continue
+            print(f"  ✓ Found GA4 property: {property_info.display_name} ({property_info.property_id})")
+            yield property_info
+
+    def _safe_extract_property_info(self, prop) -> Optional[PropertyRecord]:
+        """Extract property info, returning None instead of raising"""
+        property_info = self._cached_property_info(prop)
+        if property_info is not None:
+            return property_info
+
+        try:
+            property_info = self._extract_property_info(prop)
+        except Exception as e:
+            print(f"  ⚠ Warning: Could not read property {prop.name}: {e}")
+            return None
+
+        self._record_property_info(prop, property_info)
+        return property_info
+
+    def _cached_property_info(self, prop) -> Optional[PropertyRecord]:
+        """Reuse the property from the journal, or the snapshot's for an unchanged property"""
+        property_info = None
+
+        if self.journal is not None:
+            journaled = self.journal.get('property', prop.name.split('/')[-1])
+            if journaled is not None:
+                property_info = PropertyRecord.from_dict(journaled)
+                self.resumed += 1
+
+        if property_info is None and self.snapshot is not None:
+            property_info = self.snapshot.lookup(prop)
+
+        if property_info is not None and self.snapshot is not None:
+            self.snapshot.record(prop, property_info)
+        return property_info
+
+    def _record_property_info(self, prop, property_info: PropertyRecord):
+        if self.snapshot is not None:
+            self.snapshot.record(prop, property_info)
+        if self.journal is not None:
+            self.journal.record('property', property_info.property_id, property_info.to_dict())
+
+    def _extract_property_info(self, prop, streams: Optional[List] = None) -> PropertyRecord:
+        """Extract relevant information from a property object
+
+        Args:
+            prop: Property (or property summary) object
+            streams: Already-listed data streams; fetched from the API if None
+        """
+        # Extract property ID from resource name (format: properties/123456789)
+        property_id = prop.name.split('/')[-1]
+
+        # Try to extract domain from property display name or website URL
+        if streams is None:
+            streams = self._list_data_streams(prop)
+
+        return PropertyRecord(
+            property_id=property_id,
+            display_name=prop.display_name,
+            domain=self._domain_from_streams(prop, streams),
+            default_uri=self._web_stream_uri(streams),
+            currency_code=prop.currency_code if hasattr(prop, 'currency_code') else DEFAULT_CURRENCY_CODE,
+            time_zone=prop.time_zone if hasattr(prop, 'time_zone') else DEFAULT_TIME_ZONE,
+            account=prop.parent,
+            create_time=prop.create_time.isoformat() if hasattr(prop, 'create_time') else None,
+        )
+
+    def _list_data_streams(self, prop) -> List:
+        """List a property's data streams, or nothing if the call fails"""
+        try:
+            return self.scheduler.list('list_data_streams', self.client.list_data_streams,
+                                       parent=prop.name)
+        except Exception as e:
+            print(f"  ⚠ Warning: Could not list data streams for {prop.display_name}, "
+                  f"using display name: {e}")
+            return []
+
+    @staticmethod
+    def _web_stream_uri(streams: List) -> Optional[str]:
+        """Default URI of the property's first web data stream"""
+        for stream in streams:
+            if hasattr(stream, 'web_stream_data'):
+                return stream.web_stream_data.default_uri
+        return None
+
+    @classmethod
+    def _domain_from_streams(cls, prop, streams: List) -> str:
+        """Pick a domain from a property's data streams or its display name"""
+        # Method 1: Website URL from the web data stream
+        url = cls._web_stream_uri(streams)
+        if url is not None:
+            # Extract domain from URL
+            domain = url.replace('https://', '').replace('http://', '').split('/')[0]
+            return domain
+
+        # Method 2: Use display name (often contains domain)
+        display_name = prop.display_name.lower()
+
+        # Remove common prefixes/suffixes
+        domain = display_name.replace(' ', '-')
+
+        # If it looks like a domain, use it
+        if '.' in domain and not domain.startswith('ga4'):
+            return domain
+
+        # Method 3: Fallback to sanitized display name
+        return domain.replace(' ', '-').lower()
+
+
+class AsyncGA4PropertyDiscovery(GA4PropertyDiscovery):
+    """Discover GA4 properties with the asyncio Admin API client
+
+    Account listing, property listing and data stream resolution are pipelined
+    over a sliding window: accounts are listed a window ahead of the records
+    being consumed, and each property's streams as soon as its account listing
+    finishes. A single semaphore caps the number of requests in flight.
+    Returns the same property records as the synchronous engine, in the same
+    order.
+    """
+
+    def __init__(self, credentials_path: Optional[str] = None, credentials_json: Optional[str] = None,
+                 concurrency: int = 32, strategy: str = 'accounts',
+                 snapshot: Optional[PropertySnapshot] = None,
+                 scheduler: Optional[RequestScheduler] = None, credentials=None,
+                 journal: Optional[RunJournal] = None,
+                 shard: Optional[Dict[str, Collection[str]]] = None):
+        """Initialize with service account credentials
+
+        Args:
+            credentials_path: Path to service account JSON file
+            credentials_json: JSON string of service account credentials
+            concurrency: Maximum number of Admin API requests in flight
+            strategy: How properties are listed, 'accounts' or 'summaries'
+            snapshot: Previous run's snapshot; unchanged properties skip stream lookups
+                (strategy 'accounts' only: summaries have no update_time)
+            scheduler: Rate limiter / retry policy shared by all Admin API calls
+            credentials: Already-loaded credentials, used instead of a path or JSON
+            journal: Records listed accounts and resolved properties for --resume
+            shard: Only discover these properties, as {account name: property names}
+        """
+        super().__init__(credentials_path, credentials_json, strategy=strategy, snapshot=snapshot,
+                         scheduler=scheduler, credentials=credentials, journal=journal, shard=shard)
+        self.concurrency = max(1, concurrency)
+
+    def _create_client(self):
+        # The async client is bound to the running event loop, so it is
+        # created in aiter_properties instead
+        return None
+
+    def _create_async_client(self):
+        """Create the asyncio Admin API client; called inside the event loop"""
+        return _import_admin_api().AnalyticsAdminServiceAsyncClient(credentials=self.credentials)
+
+    def discover_all_properties(self) -> List[PropertyRecord]:
+        """Discover all GA4 properties accessible to the service account
+
+        Returns:
+            PropertyRecord per property, with id, name, domain, etc.
+        """
+        return asyncio.run(self.discover_all_properties_async())
+
+    def iter_properties(self) -> Iterator[PropertyRecord]:
+        """Yield property records as the async engine resolves them
+
+        The event loop runs in a helper thread and hands records over through
+        a bounded queue, so a slow consumer applies backpressure.
+        """
+        results = queue.Queue(maxsize=self.concurrency)
+        done = object()
+        # Set when the consumer stops reading, so the helper thread never blocks on a full queue
+        stopped = threading.Event()
+
+        def put(item) -> bool:
+            """Queue ``item`` for the consumer; False once it has stopped reading"""
+            while not stopped.is_set():
+                try:
+                    results.put(item, timeout=_PUT_POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        async def pump():
+            loop = asyncio.get_running_loop()
+            async for property_info in self.aiter_properties():
+                if not await loop.run_in_executor(None, put, property_info):
+                    return
+
+        def run():
+            try:
+                asyncio.run(pump())
+                put(done)
+            except BaseException as e:
+                put(e)
+
+        threading.Thread(target=run, name='ga4-async-discovery', daemon=True).start()
+
+        try:
+            while True:
+                item = results.get()
+                if item is done:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # The consumer stopped early (interrupt, error, break): let the
+            # event loop cancel its tasks and exit
+            stopped.set()
+
+    async def discover_all_properties_async(self) -> List[PropertyRecord]:
+        """Async variant of discover_all_properties for use inside an event loop"""
+        return [property_info async for property_info in self.aiter_properties()]
+
+    async def aiter_properties(self) -> AsyncIterator[PropertyRecord]:
+        """Async generator of property records, in listing order
+
+        Properties are pulled from the listing only as records are consumed:
+        at most ``concurrency * 2`` stream lookups (and as many account
+        listings) exist as tasks at any time, however large the fleet is.
+        """
+        client = self._create_async_client()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        window = self.concurrency * 2
+
+        listed = self._aiter_listed_properties(client, semaphore, window)
+        pending = deque()
+        exhausted = False
+        count = 0
+        try:
+            while pending or not exhausted:
+                if not exhausted and len(pending) < window:
+                    try:
+                        prop = await listed.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                    else:
+                        pending.append(asyncio.create_task(self._resolve_property_async(client, semaphore, prop)))
+                    continue
+
+                property_info = await pending.popleft()
+                if property_info is None:
+                    continue
+                count += 1
+                print(f"  ✓ Found GA4 property: {property_info.display_name} ({property_info.property_id})")
+                yield property_info
+        finally:
+            for task in pending:
+                task.cancel()
+            await listed.aclose()
+
+        print(f"\n✓ Total GA4 properties discovered: {count}")
+
+    async def _aiter_listed_properties(self, client, semaphore, window: int) -> AsyncIterator:
+        """Async generator of the properties to resolve, with the listing strategy's fallback"""
+        if self.strategy == 'summaries':
+            try:
+                props = await self._list_properties_by_summaries_async(client, semaphore)
+            except Exception as e:
+                print(f"  ⚠ Warning: Account summaries failed ({e}), falling back to per-account listing")
+            else:
+                for prop in props:
+                    yield prop
+                return
+
+        async for prop in self._aiter_properties_by_account_async(client, semaphore, window):
+            yield prop
+
+    async def _aiter_properties_by_account_async(self, client, semaphore, window: int) -> AsyncIterator:
+        """List every account's properties, at most ``window`` accounts ahead of the consumer"""
+        try:
+            async with semaphore:
+                accounts = await self.scheduler.list_async('list_accounts', client.list_accounts)
+        except Exception as e:
+            print(f"ERROR: Failed to list accounts: {e}")
+            raise
+
+        listings = deque()
+        try:
+            for account in accounts:
+                if not self._in_shard(account.name):
+                    continue
+                print(f"Scanning account: {account.display_name} ({account.name})")
+                listings.append(asyncio.create_task(
+                    self._list_account_properties_async(client, semaphore, account)
+                ))
+                if len(listings) >= window:
+                    for prop in await listings.popleft():
+                        yield prop
+
+            while listings:
+                for prop in await listings.popleft():
+                    yield prop
+        finally:
+            for task in listings:
+                task.cancel()
+
+    async def _list_account_properties_async(self, client, semaphore, account) -> List:
+        """List one account's GA4 properties in this shard"""
+        ga4_props = self._journaled_listing(account.name)
+
+        if ga4_props is None:
+            try:
+                async with semaphore:
+                    account_properties = await self.scheduler.list_async(
+                        'list_properties', client.list_properties,
+                        request={'filter': f"parent:{account.name}", 'show_deleted': False}
+                    )
+            except Exception as e:
+                print(f"  ⚠ Warning: Could not list properties for {account.display_name}: {e}")
+                self.listing_failures.append(account.name)
+                return []
+
+            # Only include GA4 properties (not Universal Analytics)
+            ga4_props = [prop for prop in account_properties
+                         if prop.property_type.name == 'PROPERTY_TYPE_ORDINARY']
+            self._journal_listing(account.name, ga4_props)
+
+        return self._shard_filter(account.name, ga4_props)
+
+    async def _list_properties_by_summaries_async(self, client, semaphore) -> List:
+        """Walk account summaries, returning the GA4 properties in this shard"""
+        journaled = self._journaled_listing(SUMMARIES_LISTING_KEY)
+        if journaled is not None:
+            return self._shard_filter_by_parent(journaled)
+
+        async with semaphore:
+            summaries = await self.scheduler.list_async(
+                'list_account_summaries', client.list_account_summaries,
+                request={'page_size': ACCOUNT_SUMMARIES_PAGE_SIZE}
+            )
+
+        ga4_props = []
+        for summary in summaries:
+            print(f"Scanning account: {summary.display_name} ({summary.account})"
+                  f" - {len(summary.property_summaries)} properties")
+
+            for prop_summary in summary.property_summaries:
+                # Only include GA4 properties (not Universal Analytics)
+                if prop_summary.property_type.name == 'PROPERTY_TYPE_ORDINARY':
+                    ga4_props.append(SimpleNamespace(
+                        name=prop_summary.property,
+                        display_name=prop_summary.display_name,
+                        parent=prop_summary.parent or summary.account,
+                    ))
+
+        self._journal_listing(SUMMARIES_LISTING_KEY, ga4_props)
+        return self._shard_filter_by_parent(ga4_props)
+
+    async def _resolve_property_async(self, client, semaphore, prop) -> Optional[PropertyRecord]:
+        """Resolve one property's data streams, returning None instead of raising"""
+        property_info = self._cached_property_info(prop)
+        if property_info is not None:
+            return property_info
+
+        try:
+            async with semaphore:
+                streams = await self.scheduler.list_async(
+                    'list_data_streams', client.list_data_streams, parent=prop.name
+                )
+        except Exception as e:
+            print(f"  ⚠ Warning: Could not list data streams for {prop.display_name}, "
+                  f"using display name: {e}")
+            streams = []
+
+        try:
+            property_info = self._extract_property_info(prop, streams)
+        except Exception as e:
+            print(f"  ⚠ Warning: Could not read property {prop.name}: {e}")
+            return None
+
+        self._record_property_info(prop, property_info)
+        return property_info
+
@@ -0,0 +1,153 @@
+"""
+Duplicate-domain resolution for discovered properties
+
+Domains are normalized when a PropertyRecord is created (records.normalize_domain).
+"""
+
+import csv
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .records import PropertyRecord, as_record
+
+
+# Rules for choosing which property keeps a domain shared by several properties
+DOMAIN_WINNER_RULES = ('root-path', 'oldest', 'newest', 'lowest-id')
+
+# Collision entries printed to the console; the CSV report has all of them
+COLLISION_REPORT_PREVIEW = 20
+
+COLLISION_REPORT_FIELDNAMES = ['domain', 'status', 'property_id', 'display_name', 'default_uri', 'create_time']
+
+
+def _uri_path_depth(uri: Optional[str]) -> int:
+    """Number of path segments in a data stream URI (0 for the site root)"""
+    path = uri.split('://', 1)[-1].partition('/')[2]
+    path = path.split('?')[0].split('#')[0]
+    return len([segment for segment in path.split('/') if segment])
+
+
+def _create_timestamp(prop: PropertyRecord) -> Optional[float]:
+    create_time = prop.create_time
+    return datetime.fromisoformat(create_time).timestamp() if create_time else None
+
+
+class DomainIndex:
+    """Discovered properties keyed by normalized domain
+
+    ga4_properties.domain is unique, so properties that share a site (several
+    GA4 properties on one domain, www. and bare variants, ...) overwrite each
+    other in upserts in whatever order discovery returned them, and a multi-row
+    upsert containing both fails outright. The index keeps every property and
+    picks one winner per domain with a deterministic rule:
+
+    - root-path: prefer a web stream at the site root over one on a sub-path,
+      and any web stream over a domain guessed from the display name
+    - oldest / newest: earliest / latest property create time
+    - lowest-id: smallest property ID
+
+    Ties always fall back to the lowest property ID, so the result does not
+    depend on discovery order or engine.
+
+    Output is not held back for this: the first property seen for a domain
+    can be written right away (add() returns True for it), and replacements()
+    lists the domains whose winner turned out to be a later property.
+    """
+
+    def __init__(self, rule: str = 'root-path'):
+        if rule not in DOMAIN_WINNER_RULES:
+            raise ValueError(f"Unknown domain winner rule: {rule}")
+
+        self.rule = rule
+        self.properties: Dict[str, List[PropertyRecord]] = {}
+
+    def add(self, prop: PropertyRecord) -> bool:
+        """Index a property; True if it is the first one seen for its domain"""
+        prop = as_record(prop)
+        props = self.properties.setdefault(prop.domain, [])
+        props.append(prop)
+        return len(props) == 1
+
+    def _rank(self, prop: PropertyRecord):
+        """Sort key for a property; the smallest key wins its domain"""
+        property_id = (len(prop.property_id), prop.property_id)
+        created = _create_timestamp(prop)
+
+        if self.rule == 'root-path':
+            uri = prop.default_uri
+            has_stream = uri is not None
+            depth = _uri_path_depth(uri) if has_stream else 0
+            return (not has_stream, depth, created is None, created or 0.0, property_id)
+        if self.rule == 'oldest':
+            return (created is None, created or 0.0, property_id)
+        if self.rule == 'newest':
+            return (created is None, -(created or 0.0), property_id)
+        return (property_id,)
+
+    def winners(self) -> Iterator[PropertyRecord]:
+        """One property per domain, in the order domains were first discovered"""
+        for props in self.properties.values():
+            yield min(props, key=self._rank)
+
+    def replacements(self) -> Iterator[Tuple[PropertyRecord, PropertyRecord]]:
+        """(first property seen, winner) for each domain won by a later property"""
+        for props in self.properties.values():
+            if len(props) < 2:
+                continue
+
+            winner = min(props, key=self._rank)
+            if winner is not props[0]:
+                yield props[0], winner
+
+    def collisions(self) -> List[Dict]:
+        """Domains shared by several properties, with the winner and the dropped ones"""
+        collisions = []
+        for domain, props in self.properties.items():
+            if len(props) < 2:
+                continue
+
+            ranked = sorted(props, key=self._rank)
+            collisions.append({'domain': domain, 'winner': ranked[0], 'dropped': ranked[1:]})
+
+        return collisions
+
+    def print_report(self):
+        """Print a summary of the domain collisions"""
+        collisions = self.collisions()
+        if not collisions:
+            print("\n✓ No duplicate domains")
+            return
+
+        dropped = sum(len(collision['dropped']) for collision in collisions)
+        print(f"\n⚠ {len(collisions)} domains shared by several properties "
+              f"({dropped} properties dropped, winner rule: {self.rule}):")
+
+        for collision in collisions[:COLLISION_REPORT_PREVIEW]:
+            winner = collision['winner']
+            print(f"  - {collision['domain']}: kept {winner.property_id} ({winner.display_name}), "
+                  f"dropped {', '.join(prop.property_id for prop in collision['dropped'])}")
+
+        if len(collisions) > COLLISION_REPORT_PREVIEW:
+            print(f"  ... and {len(collisions) - COLLISION_REPORT_PREVIEW} more")
+
+    def write_report(self, output_file: str) -> str:
+        """Write every collision as CSV rows, one per property involved"""
+        with open(output_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=COLLISION_REPORT_FIELDNAMES)
+            writer.writeheader()
+
+            for collision in self.collisions():
+                entries = [('kept', collision['winner'])] + [('dropped', prop) for prop in collision['dropped']]
+                for status, prop in entries:
+                    writer.writerow({
+                        'domain': collision['domain'],
+                        'status': status,
+                        'property_id': prop.property_id,
+                        'display_name': prop.display_name,
+                        'default_uri': prop.default_uri or '',
+                        'create_time': prop.create_time or '',
+                    })
+
+        print(f"✓ Domain collision report saved to: {output_file}")
+        return output_file
+
@@ -0,0 +1,125 @@
+"""
+Append-only journal of finished work, for resuming interrupted runs
+
+Each completed unit (an account's property listing, a resolved property, a
+granted property) is appended to a JSON-lines file and flushed right away, so
+a run killed by a network error, an expired token or Ctrl-C loses at most the
+request in flight. Started with resume=True, the journal is read back and the
+caller skips everything already recorded, reusing the stored results instead of
+calling the API again.
+
+The first line holds the run parameters; a journal written with different
+parameters (e.g. other grant emails), or by a run that finished, is not resumed.
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class RunJournal:
+    """Thread-safe, append-only record of completed (kind, key) work items"""
+
+    def __init__(self, path: str, params: Optional[Dict] = None, resume: bool = False):
+        """Open the journal, loading it when resuming
+
+        Args:
+            path: Journal file (JSON lines)
+            params: Run parameters that must match for a resume to apply
+            resume: Load and keep existing entries instead of starting over
+        """
+        self.path = path
+        self.params = params or {}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+        if resume and os.path.exists(path) and self._load():
+            self.file = open(path, 'a', encoding='utf-8')
+            if self.file.tell() and not self._ends_with_newline():
+                # Terminate a line cut short by a crash before appending
+                self.file.write('\n')
+        else:
+            if resume and not os.path.exists(path):
+                print(f"  ⚠ No journal at {path}; starting from the beginning")
+            self.file = open(path, 'w', encoding='utf-8')
+            self._append({'kind': 'run', 'key': 'params', 'data': self.params,
+                          'at': datetime.now().isoformat()})
+
+    def _load(self) -> bool:
+        """Read back an interrupted run's entries; False if it cannot be resumed"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+
+        entries: Dict[str, Dict[str, Any]] = {}
+        params = None
+        finished = False
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # The last line is cut short when the process died mid-write
+                continue
+
+            if entry['kind'] == 'run':
+                if entry['key'] == 'params':
+                    params = entry['data']
+                elif entry['key'] == 'finished':
+                    finished = True
+                continue
+            entries.setdefault(entry['kind'], {})[entry['key']] = entry.get('data')
+
+        if params != self.params:
+            print(f"  ⚠ Journal {self.path} was written with different settings; starting over")
+            return False
+        if finished:
+            print(f"  ⚠ Journal {self.path} is from a run that finished; starting over")
+            return False
+
+        self.entries = entries
+        completed = ', '.join(f"{len(items)} {kind}" for kind, items in sorted(entries.items())) or 'nothing'
+        print(f"Resuming from {self.path}: {completed} already done")
+        return True
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def _append(self, entry: Dict):
+        if self.file.closed:
+            # Late results from workers still running after an interrupted run
+            return
+        self.file.write(json.dumps(entry) + '\n')
+        self.file.flush()
+
+    def record(self, kind: str, key: str, data: Any = None):
+        """Mark (kind, key) as done, storing ``data`` for later runs"""
+        with self.lock:
+            self.entries.setdefault(kind, {})[key] = data
+            self._append({'kind': kind, 'key': key, 'data': data})
+
+    def done(self, kind: str, key: str) -> bool:
+        with self.lock:
+            return key in self.entries.get(kind, {})
+
+    def get(self, kind: str, key: str) -> Any:
+        """Stored data for (kind, key), or None if it is not done"""
+        with self.lock:
+            return self.entries.get(kind, {}).get(key)
+
+    def count(self, kind: str) -> int:
+        with self.lock:
+            return len(self.entries.get(kind, {}))
+
+    def finish(self):
+        """Mark the run as complete and close the file; a later --resume starts over"""
+        with self.lock:
+            self._append({'kind': 'run', 'key': 'finished', 'at': datetime.now().isoformat()})
+            self.file.close()
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
@@ -0,0 +1,754 @@
+"""
+Direct database loading of discovered properties
+
+Supabase (REST bulk upserts) and PostgreSQL (COPY + staging merge) clients are
+optional and only imported when a load is actually requested.
+"""
+
+import importlib.util
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Collection, Dict, Iterable, List, Optional
+
+from .metrics import ApiMetrics
+from .records import PropertyRecord, as_record
+from .reports import MONTHLY_TABLES
+from .writers import (
+    PROPERTY_ROW_COLUMNS, SQL_INSERT_COLUMNS, STAGING_COLUMNS, STAGING_SELECT_SQL, STAGING_TABLE_SQL,
+    property_row, property_values,
+)
+
+
+def is_available(module: str) -> bool:
+    """Whether an optional package is installed, without importing it"""
+    return importlib.util.find_spec(module) is not None
+
+
+# Rows sent per bulk upsert request
+SUPABASE_BATCH_SIZE = 500
+
+# Rows fetched per page when reading existing ga4_properties rows
+SUPABASE_PAGE_SIZE = 1000
+
+# Upsert requests in flight at once when streaming to Supabase
+SUPABASE_CONCURRENCY = 4
+
+# Columns written by insert_to_supabase and compared to classify each row
+SUPABASE_PROPERTY_COLUMNS = PROPERTY_ROW_COLUMNS
+
+
+def insert_to_supabase(properties: List[PropertyRecord], supabase_url: str, supabase_key: str,
+                       batch_size: int = SUPABASE_BATCH_SIZE, client=None,
+                       metrics: Optional[ApiMetrics] = None) -> Optional[Dict]:
+    """Insert properties directly into Supabase database
+
+    Existing rows are read once (paginated) so each property can be classified
+    as inserted, updated or unchanged. Unchanged rows are not written; the rest
+    are sent as chunked bulk upserts. A failing chunk is bisected and retried
+    until the bad rows are isolated, so one invalid row never sinks a batch.
+
+    Args:
+        properties: PropertyRecords (or property dicts)
+        supabase_url: Supabase project URL
+        supabase_key: Supabase anon key
+        batch_size: Maximum rows per upsert request
+        client: Already-created Supabase client; supabase_url and supabase_key
+            are ignored when given
+        metrics: Records each Supabase request's latency and outcome
+
+    Returns:
+        Dict with inserted/updated/unchanged/errors/requests counts, or None if
+        Supabase is unavailable
+    """
+    if client is None and not is_available('supabase'):
+        print("ERROR: Supabase package not installed. Install with: pip install supabase")
+        return None
+
+    try:
+        if client is None:
+            from supabase import create_client
+            client = create_client(supabase_url, supabase_key)
+        supabase = client
+        metrics = metrics or ApiMetrics()
+
+        stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'errors': 0, 'requests': 0}
+
+        existing = _fetch_existing_properties(supabase, stats, metrics)
+
+        # Later properties win on duplicate domains, as with one-by-one upserts;
+        # a bulk upsert cannot touch the same conflict key twice
+        rows = {}
+        for prop in properties:
+            prop = as_record(prop)
+            rows[prop.domain] = prop
+
+        duplicates = len(properties) - len(rows)
+        if duplicates:
+            print(f"  ⚠ {duplicates} properties share a domain with a later property and were superseded")
+
+        # Payload dicts are only built for the rows that are actually sent
+        pending = []
+        for domain, prop in rows.items():
+            current = existing.get(domain)
+            if current is None:
+                pending.append(('inserted', property_row(prop)))
+            elif any(current.get(col) != value
+                     for col, value in zip(SUPABASE_PROPERTY_COLUMNS, property_values(prop))):
+                pending.append(('updated', property_row(prop)))
+            else:
+                stats['unchanged'] += 1
+
+        batch_size = max(1, batch_size)
+        for start in range(0, len(pending), batch_size):
+            _upsert_chunk(supabase, pending[start:start + batch_size], stats, metrics)
+
+        print("\n✓ Supabase insertion complete:")
+        print(f"  - Inserted: {stats['inserted']}")
+        print(f"  - Updated: {stats['updated']}")
+        print(f"  - Unchanged: {stats['unchanged']}")
+        print(f"  - Errors: {stats['errors']}")
+        print(f"  - Requests: {stats['requests']}")
+
+        return stats
+
+    except Exception as e:
+        print(f"ERROR: Failed to connect to Supabase: {e}")
+        return None
+
+
+def stream_to_supabase(properties: Iterable[PropertyRecord], supabase_url: str, supabase_key: str,
+                       batch_size: int = SUPABASE_BATCH_SIZE, concurrency: int = SUPABASE_CONCURRENCY,
+                       superseded: Optional[Collection[str]] = None, client=None,
+                       metrics: Optional[ApiMetrics] = None) -> Optional[Dict]:
+    """Upsert properties into Supabase as they arrive, with several requests in flight
+
+    The pipelined counterpart of insert_to_supabase: ``properties`` may be a
+    stream that is still being discovered (see pipeline.DatabasePipeline).
+    Rows are classified against the existing table as they come in. They are
+    sent in chunks of ``batch_size`` with up to ``concurrency`` upserts in
+    flight. A chunk never goes out while an earlier chunk with one of its
+    domains is still in flight, so a later property always wins its domain.
+
+    Once the stream ends, the rows of ``superseded`` property IDs (streamed
+    before losing their domain to a later property) are put back as they were
+    before the run: deleted if this run inserted them, restored if it changed them.
+
+    Raises:
+        pipeline.PipelineAborted: If discovery was interrupted; rows already
+            upserted stay in the table
+
+    Returns:
+        Dict with inserted/updated/unchanged/retracted/errors/requests counts,
+        or None if Supabase is unavailable
+    """
+    if client is None and not is_available('supabase'):
+        print("ERROR: Supabase package not installed. Install with: pip install supabase")
+        return None
+
+    if client is None:
+        from supabase import create_client
+        client = create_client(supabase_url, supabase_key)
+    supabase = client
+    metrics = metrics or ApiMetrics()
+    batch_size = max(1, batch_size)
+
+    stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'retracted': 0, 'errors': 0, 'requests': 0}
+    existing = _fetch_existing_properties(supabase, stats, metrics)
+
+    # Values and property ID last sent for each domain, and what this run did per property ID
+    sent: Dict[str, tuple] = {}
+    senders: Dict[str, str] = {}
+    written: Dict[str, tuple] = {}
+    inflight: Dict = {}
+    chunk: List = []
+
+    def upsert(rows: List) -> Dict:
+        chunk_stats = dict.fromkeys(stats, 0)
+        _upsert_chunk(supabase, rows, chunk_stats, metrics)
+        return chunk_stats
+
+    def collect(futures):
+        for future in futures:
+            inflight.pop(future)
+            for key, count in future.result().items():
+                stats[key] += count
+
+    def submit(rows: List):
+        domains = {row['domain'] for _, row in rows}
+        overlapping = [future for future, busy in inflight.items() if busy & domains]
+        if overlapping:
+            wait(overlapping)
+            collect(overlapping)
+        while len(inflight) >= max(1, concurrency):
+            done, _ = wait(list(inflight), return_when=FIRST_COMPLETED)
+            collect(done)
+        inflight[executor.submit(upsert, rows)] = domains
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        try:
+            for prop in properties:
+                prop = as_record(prop)
+                values = property_values(prop)
+                current = sent.get(prop.domain)
+                if current is None and prop.domain in existing:
+                    current = tuple(existing[prop.domain].get(col) for col in SUPABASE_PROPERTY_COLUMNS)
+
+                if current == values:
+                    stats['unchanged'] += 1
+                    written[prop.property_id] = (prop.domain, 'unchanged')
+                    continue
+
+                if any(row['domain'] == prop.domain for _, row in chunk):
+                    # One upsert cannot touch the same domain twice
+                    submit(chunk)
+                    chunk = []
+
+                kind = 'inserted' if prop.domain not in existing and prop.domain not in sent else 'updated'
+                chunk.append((kind, property_row(prop)))
+                sent[prop.domain] = values
+                senders[prop.domain] = prop.property_id
+                written[prop.property_id] = (prop.domain, 'inserted' if prop.domain not in existing else 'updated')
+
+                if len(chunk) >= batch_size:
+                    submit(chunk)
+                    chunk = []
+
+            if chunk:
+                submit(chunk)
+        finally:
+            wait(list(inflight))
+            collect(list(inflight))
+
+    _retract_superseded(supabase, superseded or (), written, senders, existing, stats, metrics)
+
+    print("\n✓ Supabase streaming insertion complete:")
+    print(f"  - Inserted: {stats['inserted']}")
+    print(f"  - Updated: {stats['updated']}")
+    print(f"  - Unchanged: {stats['unchanged']}")
+    print(f"  - Retracted: {stats['retracted']}")
+    print(f"  - Errors: {stats['errors']}")
+    print(f"  - Requests: {stats['requests']}")
+
+    return stats
+
+
+def _retract_superseded(supabase, superseded: Collection[str], written: Dict[str, tuple],
+                        senders: Dict[str, str], existing: Dict[str, Dict], stats: Dict, metrics: ApiMetrics):
+    """Undo the rows written for properties that later lost their domain"""
+    deletes = []
+    restores = []
+    for property_id in superseded:
+        domain, kind = written.get(property_id, (None, 'unchanged'))
+        if kind == 'unchanged' or senders.get(domain) != property_id:
+            # Nothing was written, or the winner has since overwritten the same domain
+            continue
+        if kind == 'inserted':
+            deletes.append(domain)
+        else:
+            restores.append(('retracted', {col: existing[domain].get(col) for col in SUPABASE_PROPERTY_COLUMNS}))
+
+    if deletes:
+        try:
+            with metrics.timed('supabase', 'delete_ga4_properties'):
+                supabase.table('ga4_properties').delete().in_('domain', deletes).execute()
+            stats['retracted'] += len(deletes)
+        except Exception as e:
+            stats['errors'] += len(deletes)
+            print(f"  ✗ Error removing {len(deletes)} superseded rows: {e}")
+        stats['requests'] += 1
+    if restores:
+        _upsert_chunk(supabase, restores, stats, metrics)
+
+
+def _fetch_existing_properties(supabase, stats: Dict, metrics: ApiMetrics) -> Dict[str, Dict]:
+    """Read all ga4_properties rows, keyed by domain"""
+    existing = {}
+    start = 0
+
+    while True:
+        with metrics.timed('supabase', 'select_ga4_properties'):
+            result = (
+                supabase.table('ga4_properties')
+                .select(', '.join(SUPABASE_PROPERTY_COLUMNS))
+                .order('domain')
+                .range(start, start + SUPABASE_PAGE_SIZE - 1)
+                .execute()
+            )
+        stats['requests'] += 1
+
+        for row in result.data or []:
+            existing[row['domain']] = row
+
+        if len(result.data or []) < SUPABASE_PAGE_SIZE:
+            return existing
+        start += SUPABASE_PAGE_SIZE
+
+
+def _upsert_chunk(supabase, chunk: List, stats: Dict, metrics: ApiMetrics):
+    """Bulk upsert (kind, row) pairs, bisecting on failure to isolate bad rows"""
+    try:
+        with metrics.timed('supabase', 'upsert_ga4_properties'):
+            supabase.table('ga4_properties').upsert(
+                [data for _, data in chunk], on_conflict='domain'
+            ).execute()
+        stats['requests'] += 1
+    except Exception as e:
+        stats['requests'] += 1
+
+        if len(chunk) == 1:
+            stats['errors'] += 1
+            print(f"  ✗ Error inserting {chunk[0][1]['domain']}: {e}")
+            return
+
+        mid = len(chunk) // 2
+        _upsert_chunk(supabase, chunk[:mid], stats, metrics)
+        _upsert_chunk(supabase, chunk[mid:], stats, metrics)
+        return
+
+    for kind, data in chunk:
+        stats[kind] += 1
+    print(f"  ✓ Upserted {len(chunk)} rows")
+
+
+# Merge staged rows, only touching rows whose values actually change;
+# xmax = 0 identifies freshly inserted rows in RETURNING
+POSTGRES_MERGE_SQL = f"""{SQL_INSERT_COLUMNS}
+{STAGING_SELECT_SQL}
+ON CONFLICT (domain) DO UPDATE SET
+    property_id = EXCLUDED.property_id,
+    description = EXCLUDED.description,
+    category = EXCLUDED.category,
+    is_active = EXCLUDED.is_active,
+    updated_at = NOW()
+WHERE (ga4_properties.property_id, ga4_properties.description, ga4_properties.category, ga4_properties.is_active)
+    IS DISTINCT FROM (EXCLUDED.property_id, EXCLUDED.description, EXCLUDED.category, EXCLUDED.is_active)
+RETURNING (xmax = 0) AS inserted"""
+
+POSTGRES_DEACTIVATE_SQL = """UPDATE ga4_properties
+SET is_active = false, updated_at = NOW()
+WHERE is_active
+  AND NOT EXISTS (
+      SELECT 1 FROM ga4_properties_staging s WHERE s.domain = ga4_properties.domain
+  )"""
+
+
+def fetch_current_properties(dsn: Optional[str] = None, supabase_url: Optional[str] = None,
+                             supabase_key: Optional[str] = None,
+                             metrics: Optional[ApiMetrics] = None) -> Dict[str, Dict]:
+    """Read the current ga4_properties rows, keyed by domain
+
+    Uses one SELECT over a direct PostgreSQL connection when ``dsn`` is given,
+    otherwise paginated Supabase reads. Used by the 'diff' SQL format.
+
+    Raises:
+        ImportError: If the needed client package is not installed
+    """
+    metrics = metrics or ApiMetrics()
+
+    if dsn:
+        import psycopg
+
+        with metrics.timed('postgres', 'select_ga4_properties'):
+            with psycopg.connect(dsn) as conn, conn.cursor() as cur:
+                cur.execute(f"SELECT {', '.join(PROPERTY_ROW_COLUMNS)} FROM ga4_properties")
+                return {row[0]: dict(zip(PROPERTY_ROW_COLUMNS, row)) for row in cur.fetchall()}
+
+    from supabase import create_client
+    stats = {'requests': 0}
+    return _fetch_existing_properties(create_client(supabase_url, supabase_key), stats, metrics)
+
+
+def fetch_monthly_coverage(first_month: str, last_month: str, dsn: Optional[str] = None,
+                           supabase_url: Optional[str] = None, supabase_key: Optional[str] = None,
+                           metrics: Optional[ApiMetrics] = None) -> List[tuple]:
+    """(domain, property_id, metric_month, is_stale) of every ga4_monthly_metrics_v2 row in a month range
+
+    Months are YYYY-MM-DD strings, inclusive. Only these four columns are
+    read: one SELECT over PostgreSQL when ``dsn`` is given, otherwise
+    paginated Supabase reads. Used by the backfill planner.
+
+    Raises:
+        ImportError: If the needed client package is not installed
+    """
+    metrics = metrics or ApiMetrics()
+
+    if dsn:
+        import psycopg
+
+        with metrics.timed('postgres', 'select_monthly_coverage'):
+            with psycopg.connect(dsn) as conn, conn.cursor() as cur:
+                cur.execute("SELECT domain, property_id, metric_month::text, COALESCE(is_stale, false) "
+                            "FROM ga4_monthly_metrics_v2 WHERE metric_month BETWEEN %s AND %s",
+                            (first_month, last_month))
+                return cur.fetchall()
+
+    from supabase import create_client
+    supabase = create_client(supabase_url, supabase_key)
+    rows = []
+    start = 0
+    while True:
+        with metrics.timed('supabase', 'select_monthly_coverage'):
+            result = (
+                supabase.table('ga4_monthly_metrics_v2')
+                .select('domain, property_id, metric_month, is_stale')
+                .gte('metric_month', first_month)
+                .lte('metric_month', last_month)
+                .order('id')
+                .range(start, start + SUPABASE_PAGE_SIZE - 1)
+                .execute()
+            )
+        page = result.data or []
+        rows.extend((row['domain'], row['property_id'], row['metric_month'], bool(row.get('is_stale')))
+                    for row in page)
+        if len(page) < SUPABASE_PAGE_SIZE:
+            return rows
+        start += SUPABASE_PAGE_SIZE
+
+
+def fetch_monthly_metrics(first_month: str, last_month: str, dsn: Optional[str] = None,
+                          supabase_url: Optional[str] = None, supabase_key: Optional[str] = None,
+                          metrics: Optional[ApiMetrics] = None) -> List[Dict]:
+    """Every ga4_monthly_metrics_v2 row in a month range, as dicts of MONTHLY_METRICS_COLUMNS
+
+    Months are YYYY-MM-DD strings, inclusive; metric_month comes back as a
+    YYYY-MM-DD string. Used to recompute the comparison columns offline.
+
+    Raises:
+        ImportError: If the needed client package is not installed
+    """
+    metrics = metrics or ApiMetrics()
+    columns = MONTHLY_TABLES['ga4_monthly_metrics_v2'][0]
+
+    if dsn:
+        import psycopg
+
+        select = ', '.join('metric_month::text' if column == 'metric_month' else column for column in columns)
+        with metrics.timed('postgres', 'select_monthly_metrics'):
+            with psycopg.connect(dsn) as conn, conn.cursor() as cur:
+                cur.execute(f"SELECT {select} FROM ga4_monthly_metrics_v2 "
+                            "WHERE metric_month BETWEEN %s AND %s", (first_month, last_month))
+                return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    from supabase import create_client
+    supabase = create_client(supabase_url, supabase_key)
+    rows = []
+    start = 0
+    while True:
+        with metrics.timed('supabase', 'select_monthly_metrics'):
+            result = (
+                supabase.table('ga4_monthly_metrics_v2')
+                .select(', '.join(columns))
+                .gte('metric_month', first_month)
+                .lte('metric_month', last_month)
+                .order('id')
+                .range(start, start + SUPABASE_PAGE_SIZE - 1)
+                .execute()
+            )
+        page = result.data or []
+        rows.extend({column: row.get(column) for column in columns} for row in page)
+        if len(page) < SUPABASE_PAGE_SIZE:
+            return rows
+        start += SUPABASE_PAGE_SIZE
+
+
+def load_to_postgres(properties: Iterable[PropertyRecord], dsn: str, deactivate_missing: bool = True,
+                     metrics: Optional[ApiMetrics] = None,
+                     superseded: Optional[Collection[str]] = None,
+                     listing_failures: Optional[Collection[str]] = None) -> Optional[Dict]:
+    """Load properties into ga4_properties over a direct PostgreSQL connection
+
+    Rows are streamed with COPY into a temporary staging table, then merged
+    with one INSERT ... SELECT ... ON CONFLICT statement. Properties that are
+    in the table but were not discovered can be marked inactive in the same
+    transaction. Nothing is committed if any step fails.
+
+    ``properties`` may be a stream that is still being discovered (see
+    pipeline.DatabasePipeline): rows are copied as they arrive, and the load
+    is rolled back if the stream is aborted.
+
+    Args:
+        properties: PropertyRecords (or property dicts)
+        dsn: PostgreSQL connection string
+        deactivate_missing: Set is_active = false on rows not discovered this run
+        metrics: Records the duration of each load step
+        superseded: Property IDs to drop from the staging table before the
+            merge (streamed properties that later lost their domain)
+        listing_failures: Accounts discovery could not list (its
+            ``listing_failures``); if any, nothing is deactivated, since their
+            properties are missing from staging. Read once every property has
+            been staged, so a pipelined load sees the final list.
+
+    Returns:
+        Dict with staged/inserted/updated/unchanged/deactivated counts, or None
+        if psycopg is unavailable or the load failed
+    """
+    if not is_available('psycopg'):
+        print("ERROR: psycopg package not installed. Install with: pip install \"psycopg[binary]\"")
+        return None
+
+    import psycopg
+
+    metrics = metrics or ApiMetrics()
+
+    try:
+        with metrics.timed('postgres', 'connect'):
+            conn = psycopg.connect(dsn)
+
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(STAGING_TABLE_SQL)
+
+                staged = 0
+                with metrics.timed('postgres', 'copy_staging'):
+                    with cur.copy(f"COPY ga4_properties_staging ({STAGING_COLUMNS}) FROM STDIN") as copy:
+                        for prop in properties:
+                            staged += 1
+                            copy.write_row((staged,) + property_values(as_record(prop)))
+
+                if superseded:
+                    cur.execute("DELETE FROM ga4_properties_staging WHERE property_id = ANY(%s)",
+                                (list(superseded),))
+                    staged -= cur.rowcount
+
+                cur.execute("SELECT COUNT(DISTINCT domain) FROM ga4_properties_staging")
+                distinct = cur.fetchone()[0]
+
+                with metrics.timed('postgres', 'merge'):
+                    cur.execute(POSTGRES_MERGE_SQL)
+                    merged = [row[0] for row in cur.fetchall()]
+
+                deactivated = 0
+                if deactivate_missing and listing_failures:
+                    print(f"  ⚠ {len(listing_failures)} accounts could not be listed; "
+                          f"not deactivating missing properties")
+                elif deactivate_missing:
+                    with metrics.timed('postgres', 'deactivate_missing'):
+                        cur.execute(POSTGRES_DEACTIVATE_SQL)
+                    deactivated = cur.rowcount
+
+        stats = {
+            'staged': staged,
+            'inserted': sum(1 for inserted in merged if inserted),
+            'updated': sum(1 for inserted in merged if not inserted),
+            'unchanged': distinct - len(merged),
+            'deactivated': deactivated,
+        }
+
+        print("\n✓ PostgreSQL load complete:")
+        print(f"  - Staged rows: {stats['staged']}")
+        print(f"  - Inserted: {stats['inserted']}")
+        print(f"  - Updated: {stats['updated']}")
+        print(f"  - Unchanged: {stats['unchanged']}")
+        print(f"  - Deactivated: {stats['deactivated']}")
+
+        return stats
+
+    except Exception as e:
+        print(f"ERROR: PostgreSQL load failed (no changes committed): {e}")
+        return None
+
+
+
+# Property-months staged per COPY round when loading monthly metrics
+MONTHLY_COPY_CHUNK = 500
+
+# Breakdown tables are replaced per (property_id, metric_month), like the Node sync
+MONTHLY_BREAKDOWNS = (('ga4_traffic_sources', 'traffic_sources'), ('ga4_key_events', 'key_events'))
+
+
+def _monthly_merge_statements(table: str) -> List[str]:
+    """Statements moving <table>_staging into <table>"""
+    columns, key = MONTHLY_TABLES[table]
+    column_list = ', '.join(columns)
+
+    if table == 'ga4_monthly_metrics_v2':
+        updates = ',\n    '.join(f"{column} = EXCLUDED.{column}" for column in columns if column not in key)
+        return [f"""INSERT INTO {table} ({column_list})
+SELECT {column_list} FROM {table}_staging
+ON CONFLICT ({', '.join(key)}) DO UPDATE SET
+    {updates}"""]
+
+    return [
+        f"""DELETE FROM {table} t
+USING (SELECT DISTINCT property_id, metric_month FROM {table}_staging) s
+WHERE t.property_id = s.property_id AND t.metric_month = s.metric_month""",
+        f"""INSERT INTO {table} ({column_list})
+SELECT {column_list} FROM {table}_staging""",
+    ]
+
+
+def load_monthly_metrics_to_postgres(reports: Iterable, dsn: str,
+                                     metrics: Optional[ApiMetrics] = None) -> Optional[Dict]:
+    """Load monthly reports (monthly.MonthlyReport) into the three metrics tables
+
+    Rows are copied into temporary staging tables in rounds of
+    MONTHLY_COPY_CHUNK reports as ``reports`` yields them, so a generator
+    that is still fetching can be passed. At the end one transaction upserts
+    ga4_monthly_metrics_v2. For ga4_traffic_sources and ga4_key_events, the
+    rows of each loaded (property, month) are replaced; a report whose
+    breakdown came back empty or was not fetched leaves that breakdown alone.
+
+    Returns:
+        Dict with reports and per-table row counts, or None if psycopg is
+        unavailable or the load failed (nothing is committed then)
+    """
+    if not is_available('psycopg'):
+        print("ERROR: psycopg package not installed. Install with: pip install \"psycopg[binary]\"")
+        return None
+
+    import psycopg
+
+    metrics = metrics or ApiMetrics()
+    stats = dict.fromkeys(['reports'] + list(MONTHLY_TABLES), 0)
+
+    try:
+        with metrics.timed('postgres', 'connect'):
+            conn = psycopg.connect(dsn)
+
+        with conn:
+            with conn.cursor() as cur:
+                for table, (columns, _) in MONTHLY_TABLES.items():
+                    cur.execute(f"CREATE TEMP TABLE {table}_staging ON COMMIT DROP AS "
+                                f"SELECT {', '.join(columns)} FROM {table} WITH NO DATA")
+
+                def copy_rows(buffers: Dict[str, List]):
+                    with metrics.timed('postgres', 'copy_staging'):
+                        for table, rows in buffers.items():
+                            if not rows:
+                                continue
+                            columns = MONTHLY_TABLES[table][0]
+                            with cur.copy(f"COPY {table}_staging ({', '.join(columns)}) FROM STDIN") as copy:
+                                for row in rows:
+                                    copy.write_row(tuple(row[column] for column in columns))
+                            stats[table] += len(rows)
+                            rows.clear()
+
+                buffers = {table: [] for table in MONTHLY_TABLES}
+                pending = 0
+                for report in reports:
+                    buffers['ga4_monthly_metrics_v2'].append(report.metrics)
+                    for table, kind in MONTHLY_BREAKDOWNS:
+                        buffers[table].extend(report.breakdown_rows(kind))
+                    stats['reports'] += 1
+                    pending += 1
+                    if pending >= MONTHLY_COPY_CHUNK:
+                        copy_rows(buffers)
+                        pending = 0
+                copy_rows(buffers)
+
+                with metrics.timed('postgres', 'merge'):
+                    for table in MONTHLY_TABLES:
+                        for statement in _monthly_merge_statements(table):
+                            cur.execute(statement)
+
+        print("\n✓ PostgreSQL monthly metrics load complete:")
+        print(f"  - Property-months: {stats['reports']}")
+        for table in MONTHLY_TABLES:
+            print(f"  - {table}: {stats[table]} rows")
+
+        return stats
+
+    except Exception as e:
+        print(f"ERROR: PostgreSQL monthly metrics load failed (no changes committed): {e}")
+        return None
+
+
+def insert_monthly_metrics_to_supabase(reports: Iterable, supabase_url: str, supabase_key: str,
+                                       batch_size: int = SUPABASE_BATCH_SIZE, client=None,
+                                       metrics: Optional[ApiMetrics] = None) -> Optional[Dict]:
+    """Write monthly reports (monthly.MonthlyReport) through Supabase in bulk
+
+    For every ``batch_size`` reports: one upsert of the ga4_monthly_metrics_v2
+    rows, then, per month, bulk upserts of the breakdown rows on their natural
+    key. Only once every upsert of a month succeeded are that month's older
+    rows (fetched before this run, e.g. a traffic source that no longer
+    appears) deleted, so a failed request never loses stored rows. Failed
+    requests are counted and reported, and the remaining chunks are still
+    written.
+
+    Returns:
+        Dict with reports, per-table row counts, errors and requests, or None
+        if Supabase is unavailable
+    """
+    if client is None and not is_available('supabase'):
+        print("ERROR: Supabase package not installed. Install with: pip install supabase")
+        return None
+
+    if client is None:
+        from supabase import create_client
+        client = create_client(supabase_url, supabase_key)
+    metrics = metrics or ApiMetrics()
+    batch_size = max(1, batch_size)
+    stats = dict.fromkeys(['reports'] + list(MONTHLY_TABLES) + ['errors', 'requests'], 0)
+
+    def request(method: str, description: str, build) -> bool:
+        stats['requests'] += 1
+        try:
+            with metrics.timed('supabase', method):
+                build().execute()
+            return True
+        except Exception as e:
+            stats['errors'] += 1
+            print(f"  ✗ Error {description}: {e}")
+            return False
+
+    def write_chunk(chunk: List):
+        errors = stats['errors']
+        table = 'ga4_monthly_metrics_v2'
+        if request(f'upsert_{table}', f"upserting {len(chunk)} monthly rows",
+                   lambda: client.table(table).upsert([report.metrics for report in chunk],
+                                                      on_conflict=','.join(MONTHLY_TABLES[table][1]))):
+            stats[table] += len(chunk)
+
+        for table, kind in MONTHLY_BREAKDOWNS:
+            by_month: Dict[str, List] = {}
+            for report in chunk:
+                if getattr(report, kind):
+                    by_month.setdefault(report.month.isoformat(), []).append(report)
+
+            for month, month_reports in by_month.items():
+                rows = [row for report in month_reports for row in report.breakdown_rows(kind)]
+                written = True
+                for start in range(0, len(rows), batch_size):
+                    rows_chunk = rows[start:start + batch_size]
+                    if request(f'upsert_{table}', f"upserting {len(rows_chunk)} {table} rows",
+                               lambda: client.table(table).upsert(
+                                   rows_chunk, on_conflict=','.join(MONTHLY_TABLES[table][1]))):
+                        stats[table] += len(rows_chunk)
+                    else:
+                        written = False
+                if not written:
+                    print(f"  ⚠ Kept the older {table} rows for {month}; rerun to replace them")
+                    continue
+
+                property_ids = [report.property_id for report in month_reports]
+                fetched_at = min(report.metrics['fetched_at'] for report in month_reports)
+                request(f'delete_{table}', f"clearing older {table} rows for {month}",
+                        lambda: client.table(table).delete()
+                        .in_('property_id', property_ids).eq('metric_month', month).lt('fetched_at', fetched_at))
+
+        if stats['errors'] > errors:
+            print(f"  ⚠ Wrote {len(chunk)} property-months; {stats['errors'] - errors} requests failed")
+        else:
+            print(f"  ✓ Wrote {len(chunk)} property-months")
+
+    chunk = []
+    for report in reports:
+        chunk.append(report)
+        stats['reports'] += 1
+        if len(chunk) >= batch_size:
+            write_chunk(chunk)
+            chunk = []
+    if chunk:
+        write_chunk(chunk)
+
+    if stats['errors']:
+        print("\n⚠ Supabase monthly metrics write finished with errors:")
+    else:
+        print("\n✓ Supabase monthly metrics write complete:")
+    print(f"  - Property-months: {stats['reports']}")
+    for table in MONTHLY_TABLES:
+        print(f"  - {table}: {stats[table]} rows")
+    print(f"  - Errors: {stats['errors']}")
+    print(f"  - Requests: {stats['requests']}")
+
+    return stats
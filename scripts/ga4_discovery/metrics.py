@@ -0,0 +1,240 @@
+"""
+Per-method request accounting for Admin API and Supabase calls
+
+ApiMetrics records, for every (service, method) pair, how many requests were
+made, how many were retried or failed, and a latency histogram. One instance
+is shared by everything in a run (the RequestScheduler records Admin API calls,
+insert_to_supabase records Supabase requests) and written at the end as a
+console summary, a JSON file or a Prometheus textfile.
+
+Usage:
+    metrics = ApiMetrics()
+    scheduler = RequestScheduler(metrics=metrics)
+    ...
+    metrics.print_summary()
+    metrics.write_prometheus('/var/lib/node_exporter/ga4_discovery.prom')
+"""
+
+import os
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_PREFIX = 'ga4'
+
+
+def _new_counters() -> Dict:
+    return {
+        'calls': 0,
+        'retries': 0,
+        'errors': 0,
+        'latency_sum': 0.0,
+        'latency_max': 0.0,
+        # One count per bucket plus the overflow (+Inf) bucket; not cumulative
+        'buckets': [0] * (len(LATENCY_BUCKETS) + 1),
+    }
+
+
+def _quantile(counters: Dict, q: float) -> Optional[float]:
+    """Upper bound of the bucket holding the q-quantile (max for the overflow bucket)"""
+    observed = sum(counters['buckets'])
+    if not observed:
+        return None
+
+    rank = q * observed
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS, counters['buckets']):
+        seen += count
+        if seen >= rank:
+            return min(bound, counters['latency_max'])
+    return counters['latency_max']
+
+
+def _round(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds, 6)
+
+
+def _format_seconds(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return '-'
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+
+class ApiMetrics:
+    """Thread-safe call, retry, error and latency accounting per service and method"""
+
+    def __init__(self):
+        self.methods: Dict[Tuple[str, str], Dict] = {}
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    def counters(self, service: str, method: str) -> Dict:
+        with self.lock:
+            return self.methods.setdefault((service, method), _new_counters())
+
+    def count(self, service: str, method: str, key: str):
+        """Increment the calls, retries or errors counter of a method"""
+        counters = self.counters(service, method)
+        with self.lock:
+            counters[key] += 1
+
+    def observe(self, service: str, method: str, seconds: float):
+        """Record the latency of one request attempt"""
+        counters = self.counters(service, method)
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+
+        with self.lock:
+            counters['latency_sum'] += seconds
+            counters['latency_max'] = max(counters['latency_max'], seconds)
+            counters['buckets'][index] += 1
+
+    @contextmanager
+    def timed(self, service: str, method: str):
+        """Count one request and record its latency; failures count as errors"""
+        self.count(service, method, 'calls')
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.count(service, method, 'errors')
+            raise
+        finally:
+            self.observe(service, method, time.perf_counter() - started)
+
+    def merge(self, methods: Dict[Tuple[str, str], Dict]):
+        """Add counters recorded elsewhere (e.g. ``other.methods`` from a worker process)"""
+        for key, other in methods.items():
+            counters = self.counters(*key)
+            with self.lock:
+                for name in ('calls', 'retries', 'errors', 'latency_sum'):
+                    counters[name] += other[name]
+                counters['latency_max'] = max(counters['latency_max'], other['latency_max'])
+                counters['buckets'] = [a + b for a, b in zip(counters['buckets'], other['buckets'])]
+
+    def service_stats(self, service: str) -> Dict[str, Dict]:
+        """Counters of one service's methods, keyed by method name"""
+        with self.lock:
+            return {method: counters for (svc, method), counters in self.methods.items() if svc == service}
+
+    def print_summary(self, service: Optional[str] = None, title: Optional[str] = None):
+        """Print per-method counts and latency for one service, or all of them"""
+        services = [service] if service else sorted({svc for svc, _ in self.methods})
+
+        for svc in services:
+            stats = self.service_stats(svc)
+            print(f"\n{title or svc.replace('_', ' ').title() + ' calls'}:")
+            if not stats:
+                print("  (none)")
+                continue
+
+            for method in sorted(stats):
+                counters = stats[method]
+                observed = sum(counters['buckets'])
+                average = counters['latency_sum'] / observed if observed else None
+                print(f"  - {method}: {counters['calls']} calls, "
+                      f"{counters['retries']} retries, {counters['errors']} errors"
+                      f" | avg {_format_seconds(average)}, p50 {_format_seconds(_quantile(counters, 0.5))}, "
+                      f"p95 {_format_seconds(_quantile(counters, 0.95))}, "
+                      f"max {_format_seconds(counters['latency_max'] if observed else None)}, "
+                      f"total {_format_seconds(counters['latency_sum'])}")
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable snapshot of every method's counters"""
+        with self.lock:
+            methods = [
+                {
+                    'service': service,
+                    'method': method,
+                    'calls': counters['calls'],
+                    'retries': counters['retries'],
+                    'errors': counters['errors'],
+                    'latency_seconds': {
+                        'sum': round(counters['latency_sum'], 6),
+                        'max': round(counters['latency_max'], 6),
+                        'p50': _round(_quantile(counters, 0.5)),
+                        'p95': _round(_quantile(counters, 0.95)),
+                        'buckets': {
+                            str(bound): count
+                            for bound, count in zip(list(LATENCY_BUCKETS) + ['+Inf'], counters['buckets'])
+                        },
+                    },
+                }
+                for (service, method), counters in sorted(self.methods.items())
+            ]
+
+        return {
+            'started': datetime.fromtimestamp(self.started).isoformat(),
+            'finished': datetime.now().isoformat(),
+            'wall_seconds': round(time.time() - self.started, 3),
+            'methods': methods,
+        }
+
+    def write_json(self, output_file: str) -> str:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+        print(f"✓ Metrics saved to: {output_file}")
+        return output_file
+
+    def prometheus_lines(self, job: str) -> List[str]:
+        """Metrics in the Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            items = sorted(self.methods.items())
+
+        for name, key, help_text in (
+            ('requests_total', 'calls', 'Requests attempted, including retries'),
+            ('retries_total', 'retries', 'Requests retried after a transient error'),
+            ('errors_total', 'errors', 'Requests that failed and were not retried'),
+        ):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} counter")
+            for (service, method), counters in items:
+                lines.append(f'{METRIC_PREFIX}_{name}{{job="{job}",service="{service}",method="{method}"}} '
+                             f'{counters[key]}')
+
+        histogram = f"{METRIC_PREFIX}_request_duration_seconds"
+        lines.append(f"# HELP {histogram} Request latency")
+        lines.append(f"# TYPE {histogram} histogram")
+        for (service, method), counters in items:
+            labels = f'job="{job}",service="{service}",method="{method}"'
+            cumulative = 0
+            for bound, count in zip(list(LATENCY_BUCKETS) + ['+Inf'], counters['buckets']):
+                cumulative += count
+                lines.append(f'{histogram}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{histogram}_sum{{{labels}}} {counters['latency_sum']:.6f}")
+            lines.append(f"{histogram}_count{{{labels}}} {cumulative}")
+
+        lines.append(f"# HELP {METRIC_PREFIX}_last_run_timestamp_seconds When the run finished")
+        lines.append(f"# TYPE {METRIC_PREFIX}_last_run_timestamp_seconds gauge")
+        lines.append(f'{METRIC_PREFIX}_last_run_timestamp_seconds{{job="{job}"}} {time.time():.0f}')
+        return lines
+
+    def write_prometheus(self, output_file: str, job: str = 'ga4_discovery') -> str:
+        """Write a node_exporter textfile; replaced atomically so it is never read half-written"""
+        tmp_path = f"{output_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.prometheus_lines(job)) + '\n')
+        os.replace(tmp_path, output_file)
+
+        print(f"✓ Prometheus metrics saved to: {output_file}")
+        return output_file
+
+
+def write_metrics(metrics: ApiMetrics, json_file: Optional[str] = None, prometheus_file: Optional[str] = None,
+                  job: str = 'ga4_discovery'):
+    """Write whichever machine-readable outputs were requested, never raising"""
+    for output_file, write in ((json_file, metrics.write_json),
+                               (prometheus_file, lambda path: metrics.write_prometheus(path, job))):
+        if not output_file:
+            continue
+        try:
+            write(output_file)
+        except OSError as e:
+            print(f"  ⚠ Warning: Could not write metrics to {output_file}: {e}")
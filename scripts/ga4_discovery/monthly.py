@@ -0,0 +1,534 @@
+"""
+Bulk monthly metrics sync with the GA4 Data API batch endpoint
+
+The Node sync (api/analytics/sync-monthly-data.js) makes six runReport calls
+per property and month, one at a time: core metrics, traffic sources and key
+events, for the month and again for the month before. This engine reads the
+discovered properties from ga4_properties (or a discovery CSV) and packs the
+reports into batchRunReports requests. One request covers two months of a
+property: a core report with every needed month as a date range, plus a
+traffic sources and a key events report per month. The requests run on a
+thread pool behind the shared RequestScheduler, and the rows are written in
+bulk to ga4_monthly_metrics_v2, ga4_traffic_sources and ga4_key_events.
+
+A one-month fleet sync is one request per property instead of six.
+
+Usage:
+    python -m ga4_discovery.monthly --load-to-postgres                # previous month
+    python -m ga4_discovery.monthly --month 2025-10 --insert-to-supabase
+    python -m ga4_discovery.monthly --start-month 2025-01 --end-month 2025-10 --workers 16
+    python -m ga4_discovery.monthly --start-month 2024-01 --backfill --load-to-postgres
+    python -m ga4_discovery.monthly --start-month 2024-01 --cache .ga4-report-cache.sqlite
+    python -m ga4_discovery.monthly --month 2025-10 --recompute-comparisons --load-to-postgres
+    python -m ga4_discovery.monthly --start-month 2025-01 --adaptive --max-workers 32 --load-to-postgres
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+from typing import Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .backfill import plan_backfill
+from .comparisons import derive_month
+from .discovery import _ordered_map
+from .loaders import (
+    fetch_current_properties, fetch_monthly_coverage, fetch_monthly_metrics, insert_monthly_metrics_to_supabase,
+    is_available, load_monthly_metrics_to_postgres, SUPABASE_BATCH_SIZE,
+)
+from .metrics import ApiMetrics, write_metrics
+from .reports import (
+    MONTHS_PER_BATCH, REPORT_SETS, build_batch_request, empty_core_metrics, monthly_metrics_row, months_between,
+    parse_core, parse_key_events, parse_month, parse_traffic_sources, previous_month,
+)
+from .quota import DEFAULT_MAX_WORKERS, QuotaTracker, is_quota_error
+from .report_cache import DEFAULT_MAX_BYTES, DEFAULT_SETTLE_DAYS, ReportCache
+from .scheduler import RequestScheduler, DEFAULT_QPS, DEFAULT_MAX_RETRIES, is_retryable
+
+DEFAULT_WORKERS = 8
+
+# Deferred requests listed at the end of a run (all of them are counted)
+DEFERRED_REPORT_PREVIEW = 20
+
+
+def _import_data_api() -> SimpleNamespace:
+    """Import the Data API client and credentials modules on first use"""
+    try:
+        from google.analytics.data_v1beta import BetaAnalyticsDataClient
+        from google.oauth2 import service_account
+    except ImportError as e:
+        raise ImportError("Missing required packages. Install with: "
+                          "pip install google-analytics-data google-auth") from e
+
+    return SimpleNamespace(BetaAnalyticsDataClient=BetaAnalyticsDataClient, service_account=service_account)
+
+
+class MonthlyReport:
+    """Rows fetched for one property and month
+
+    traffic_sources and key_events are None when only the core report could
+    be fetched; the breakdown tables are then left as they are.
+    """
+
+    __slots__ = ('domain', 'property_id', 'month', 'metrics', 'traffic_sources', 'key_events')
+
+    def __init__(self, domain: str, property_id: str, month: date, metrics: Dict,
+                 traffic_sources: Optional[List[Dict]], key_events: Optional[List[Dict]]):
+        self.domain = domain
+        self.property_id = property_id
+        self.month = month
+        self.metrics = metrics
+        self.traffic_sources = traffic_sources
+        self.key_events = key_events
+
+    def breakdown_rows(self, kind: str) -> List[Dict]:
+        """'traffic_sources' or 'key_events' rows with their table keys filled in"""
+        rows = getattr(self, kind) or []
+        base = {'domain': self.domain, 'property_id': self.property_id, 'metric_month': self.month.isoformat(),
+                'fetched_at': self.metrics['fetched_at']}
+        return [{**base, **row} for row in rows]
+
+
+class MonthlyMetricsEngine:
+    """Fetch monthly metrics for many properties with batched Data API requests"""
+
+    def __init__(self, credentials_path: Optional[str] = None, credentials_json: Optional[str] = None,
+                 workers: int = DEFAULT_WORKERS, scheduler: Optional[RequestScheduler] = None,
+                 credentials=None, client=None, cache: Optional[ReportCache] = None,
+                 quota: Optional[QuotaTracker] = None):
+        """Initialize with service account credentials
+
+        Args:
+            credentials_path: Path to service account JSON file
+            credentials_json: JSON string of service account credentials
+            workers: batchRunReports requests in flight at once
+            scheduler: Rate limiter and retry policy for Data API calls
+            credentials: Already-loaded credentials, used instead of a path or JSON
+            client: Already-created Data API client (credentials are then ignored)
+            cache: Report cache; settled reports found there are not requested again
+            quota: Quota tracker; requests then ask for property quota, the
+                tracker sets how many run at once (workers is ignored) and
+                properties low on tokens are deferred
+        """
+        if client is None:
+            data_api = _import_data_api()
+            scopes = ['https://www.googleapis.com/auth/analytics.readonly']
+            if credentials is None and credentials_path:
+                credentials = data_api.service_account.Credentials.from_service_account_file(
+                    credentials_path, scopes=scopes)
+            elif credentials is None and credentials_json:
+                credentials = data_api.service_account.Credentials.from_service_account_info(
+                    json.loads(credentials_json), scopes=scopes)
+            elif credentials is None:
+                raise ValueError("Must provide either credentials_path or credentials_json")
+            client = data_api.BetaAnalyticsDataClient(credentials=credentials)
+
+        self.client = client
+        self.workers = max(1, workers)
+        self.scheduler = scheduler or RequestScheduler(service='data_api')
+        self.cache = cache
+        self.quota = quota
+        self.fetched_at = datetime.now(timezone.utc).isoformat()
+        self.failures: List[Tuple[str, str, List[date], Exception]] = []
+        # Batches still deferred for quota, with the reason
+        self.deferred: List[Tuple[Tuple[str, str, List[date]], str]] = []
+        self.fetched = 0
+        self.degraded = 0
+        self.cached = 0
+
+    def fetch(self, properties: Iterable[Tuple[str, str]], months: Sequence[date]) -> Iterator[MonthlyReport]:
+        """Yield a MonthlyReport per (property, month), newest month first
+
+        Every property is requested for the newest months before any for
+        older ones, so a property's requests are spread over the run (and,
+        with a quota tracker, its quota is known before its next request).
+
+        Args:
+            properties: (domain, property_id) pairs
+            months: First days of the months to fetch
+
+        Failed batches are skipped and kept in ``failures``.
+        """
+        properties = list(properties)
+        months = sorted(set(months), reverse=True)
+        groups = [months[start:start + MONTHS_PER_BATCH] for start in range(0, len(months), MONTHS_PER_BATCH)]
+        return self.fetch_batches((domain, property_id, group)
+                                  for group in groups for domain, property_id in properties)
+
+    def fetch_batches(self, batches: Iterable[Tuple[str, str, List[date]]]) -> Iterator[MonthlyReport]:
+        """Yield the MonthlyReports of explicit (domain, property_id, months) batches, in order
+
+        Each batch is one batchRunReports request, so it may hold at most
+        MONTHS_PER_BATCH months (see backfill.plan_backfill). With a quota
+        tracker, batches deferred for quota are not retried in this run: the
+        budgets they ran low on only reset after an hour or a day. They are
+        kept in ``deferred`` for a later run (a --backfill run finds their
+        months missing).
+        """
+        workers = self.quota.max_workers if self.quota is not None else self.workers
+        for reports in _ordered_map(self._fetch_batch, batches, workers):
+            self.fetched += len(reports)
+            yield from reports
+
+    def _fetch_batch(self, task: Tuple[str, str, List[date]]) -> List[MonthlyReport]:
+        domain, property_id, months = task
+        label = ', '.join(month.strftime('%Y-%m') for month in months)
+
+        reason = self.quota.defer_reason(property_id) if self.quota is not None else None
+        if reason:
+            print(f"  ⚠ {domain} ({label}): deferred, {reason}")
+            self.deferred.append((task, reason))
+            return []
+
+        error = None
+        for report_set in REPORT_SETS:
+            request = build_batch_request(property_id, months, report_set)
+            try:
+                response, from_cache = self._run_batch(property_id, request)
+            except Exception as e:
+                error = e
+                if is_retryable(e):
+                    # Quota or availability, already retried: a smaller batch will not help
+                    break
+                continue
+
+            if report_set != 'full':
+                self.degraded += 1
+                print(f"  ⚠ {domain} ({label}): fetched with the '{report_set}' reports: {error}")
+            else:
+                print(f"  ✓ {domain} ({label}){' from cache' if from_cache else ''}")
+            return self._parse(domain, property_id, months, response, report_set)
+
+        print(f"  ✗ {domain} ({label}): {error}")
+        self.failures.append((domain, property_id, months, error))
+        return []
+
+    def _run_batch(self, property_id: str, request: Dict) -> Tuple[object, bool]:
+        """batchRunReports response, and whether it came entirely from the cache
+
+        Cached reports are taken from disk and only the others are requested;
+        the fetched ones are stored if their months are settled.
+        """
+        reports = request['requests']
+        results = self.cache.lookup(property_id, reports) if self.cache is not None else [None] * len(reports)
+        missing = [index for index, result in enumerate(results) if result is None]
+        if not missing:
+            self.cached += 1
+            return SimpleNamespace(reports=results), True
+
+        sent = [reports[index] for index in missing]
+        if self.quota is None:
+            response = self.scheduler.call('batch_run_reports', self._send, {**request, 'requests': sent})
+        else:
+            # The flag is left out of the cache keys: it does not change the rows
+            sent = [{**report, 'return_property_quota': True} for report in sent]
+            with self.quota.slot():
+                response = self.scheduler.call('batch_run_reports', self._send, {**request, 'requests': sent})
+            self.quota.record(property_id, [getattr(report, 'property_quota', None) for report in response.reports])
+
+        for index, result in zip(missing, response.reports):
+            if self.cache is not None:
+                self.cache.put(property_id, reports[index], result)
+            results[index] = result
+        return SimpleNamespace(reports=results), False
+
+    def _send(self, request: Dict):
+        try:
+            return self.client.batch_run_reports(request=request)
+        except Exception as e:
+            # Seen on every attempt, including the ones the scheduler retries
+            if self.quota is not None and is_quota_error(e):
+                self.quota.throttled()
+            raise
+
+    def _parse(self, domain: str, property_id: str, months: List[date], response,
+               report_set: str) -> List[MonthlyReport]:
+        reports = list(response.reports)
+        core = parse_core(reports[0])
+
+        results = []
+        for index, month in enumerate(months):
+            current = core.get(month.isoformat()) or empty_core_metrics()
+            previous = core.get(previous_month(month).isoformat()) or empty_core_metrics()
+            traffic_sources = key_events = None
+            if report_set != 'core':
+                traffic_sources = parse_traffic_sources(reports[1 + 2 * index])
+                key_events = parse_key_events(reports[2 + 2 * index])
+
+            row = monthly_metrics_row(domain, property_id, month, current, previous, self.fetched_at)
+            results.append(MonthlyReport(domain, property_id, month, row, traffic_sources, key_events))
+        return results
+
+
+def read_properties_csv(path: str) -> List[Tuple[str, str]]:
+    """(domain, property_id) pairs from a discovery CSV (--output csv)"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return [(row['domain'], row['property_id']) for row in csv.DictReader(f)]
+
+
+def load_active_properties(dsn: Optional[str] = None, supabase_url: Optional[str] = None,
+                           supabase_key: Optional[str] = None,
+                           metrics: Optional[ApiMetrics] = None) -> List[Tuple[str, str]]:
+    """(domain, property_id) pairs of the active ga4_properties rows, by domain"""
+    rows = fetch_current_properties(dsn=dsn, supabase_url=supabase_url, supabase_key=supabase_key,
+                                    metrics=metrics)
+    return sorted((row['domain'], row['property_id']) for row in rows.values() if row.get('is_active'))
+
+
+def default_month(today: Optional[date] = None) -> date:
+    """The last complete month"""
+    return previous_month((today or date.today()).replace(day=1))
+
+
+def recompute_comparisons(months: Sequence[date], property_ids: Optional[Collection[str]] = None,
+                          dsn: Optional[str] = None, supabase_url: Optional[str] = None,
+                          supabase_key: Optional[str] = None,
+                          metrics: Optional[ApiMetrics] = None) -> List[MonthlyReport]:
+    """Recompute the comparison columns of stored ga4_monthly_metrics_v2 rows, without the Data API
+
+    The months and the month before the first are read in one query; each
+    month is then derived in one columnar pass (comparisons.derive_month).
+
+    Returns:
+        MonthlyReports of the rows whose comparison columns changed (no
+        breakdowns, so writing them leaves the breakdown tables alone)
+    """
+    months = sorted(set(months))
+    rows = fetch_monthly_metrics(previous_month(months[0]).isoformat(), months[-1].isoformat(), dsn=dsn,
+                                 supabase_url=supabase_url, supabase_key=supabase_key, metrics=metrics)
+    by_month: Dict[str, List[Dict]] = {}
+    for row in rows:
+        if property_ids is None or row['property_id'] in property_ids:
+            by_month.setdefault(row['metric_month'][:10], []).append(row)
+
+    reports = []
+    for month in months:
+        previous_rows = {row['property_id']: row for row in by_month.get(previous_month(month).isoformat(), [])}
+        started = time.perf_counter()
+        updated, changed = derive_month(by_month.get(month.isoformat(), []), previous_rows)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"  {month:%Y-%m}: {len(updated)} rows in {elapsed:.1f}ms, {len(changed)} changed")
+        reports.extend(MonthlyReport(row['domain'], row['property_id'], month, row, None, None) for row in changed)
+    return reports
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog='python -m ga4_discovery.monthly',
+        description='Fetch monthly GA4 metrics for every discovered property with batched Data API requests',
+    )
+    parser.add_argument('--credentials',
+                        help='Path to service account JSON file (or use GA4_CREDENTIALS_PATH env var)')
+    parser.add_argument('--month', action='append',
+                        help='Month to sync as YYYY-MM, repeatable (default: the previous month)')
+    parser.add_argument('--start-month', help='First month of a range to sync (YYYY-MM)')
+    parser.add_argument('--end-month', help='Last month of the range (default: the previous month)')
+    parser.add_argument('--property-id', action='append',
+                        help='Only sync this property, repeatable')
+    parser.add_argument('--properties-csv',
+                        help='Read properties from a discovery CSV instead of ga4_properties')
+    parser.add_argument('--backfill', action='store_true',
+                        help='Only fetch property-months that are missing or stale in ga4_monthly_metrics_v2, '
+                             'newest first')
+    parser.add_argument('--recompute-comparisons', action='store_true',
+                        help='Recompute the previous-month, trend and change columns of stored rows '
+                             'instead of fetching (no Data API calls)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'batchRunReports requests in flight at once (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Ask for property quota with each request and adjust requests in flight to it, '
+                             'starting at --workers; properties low on tokens are deferred')
+    parser.add_argument('--max-workers', type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f'Upper bound on requests in flight with --adaptive (default: {DEFAULT_MAX_WORKERS})')
+    parser.add_argument('--qps', type=float, default=DEFAULT_QPS,
+                        help=f'Maximum Data API requests per second (default: {DEFAULT_QPS:g})')
+    parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES,
+                        help=f'Retries per request for transient errors (default: {DEFAULT_MAX_RETRIES})')
+    parser.add_argument('--cache',
+                        help='Keep settled reports in this SQLite file and reuse them on later runs')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help=f'Size limit of the report cache (default: {DEFAULT_MAX_BYTES // (1024 * 1024)})')
+    parser.add_argument('--cache-settle-days', type=int, default=DEFAULT_SETTLE_DAYS,
+                        help='Days after a month ends before its reports are cached '
+                             f'(default: {DEFAULT_SETTLE_DAYS})')
+    parser.add_argument('--load-to-postgres', action='store_true',
+                        help='COPY the rows into PostgreSQL and merge them')
+    parser.add_argument('--postgres-dsn', help='PostgreSQL connection string (or use DATABASE_URL env var)')
+    parser.add_argument('--insert-to-supabase', action='store_true', help='Write the rows through Supabase')
+    parser.add_argument('--supabase-url', help='Supabase URL (or use SUPABASE_URL env var)')
+    parser.add_argument('--supabase-key', help='Supabase anon key (or use SUPABASE_ANON_KEY env var)')
+    parser.add_argument('--batch-size', type=int, default=SUPABASE_BATCH_SIZE,
+                        help=f'Rows per Supabase request (default: {SUPABASE_BATCH_SIZE})')
+    parser.add_argument('--metrics-json',
+                        help='Write per-method call counts and latency histograms to this JSON file')
+    parser.add_argument('--metrics-prom', help='Write the same metrics as a Prometheus textfile')
+    args = parser.parse_args(argv)
+
+    if args.month and args.start_month:
+        parser.error('--month and --start-month cannot be combined')
+    try:
+        if args.start_month:
+            end = parse_month(args.end_month) if args.end_month else default_month()
+            months = months_between(parse_month(args.start_month), end)
+        else:
+            months = sorted({parse_month(month) for month in args.month or []}) or [default_month()]
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.recompute_comparisons and args.backfill:
+        parser.error('--recompute-comparisons and --backfill cannot be combined')
+
+    creds_path = args.credentials or os.getenv('GA4_CREDENTIALS_PATH')
+    creds_json = os.getenv('GA4_SERVICE_ACCOUNT_CREDENTIALS')
+    if not creds_path and not creds_json and not args.recompute_comparisons:
+        print("ERROR: Must provide credentials via --credentials flag or environment variables")
+        print("  Set GA4_CREDENTIALS_PATH or GA4_SERVICE_ACCOUNT_CREDENTIALS")
+        sys.exit(1)
+
+    supabase_url = args.supabase_url or os.getenv('SUPABASE_URL')
+    supabase_key = args.supabase_key or os.getenv('SUPABASE_ANON_KEY')
+    postgres_dsn = args.postgres_dsn or os.getenv('DATABASE_URL')
+    use_postgres = bool(postgres_dsn) and is_available('psycopg')
+    use_supabase = bool(supabase_url and supabase_key) and is_available('supabase')
+
+    if args.load_to_postgres and (not postgres_dsn or not is_available('psycopg')):
+        print("ERROR: --load-to-postgres needs --postgres-dsn or DATABASE_URL, and psycopg installed")
+        sys.exit(1)
+    if args.insert_to_supabase and (not supabase_url or not supabase_key or not is_available('supabase')):
+        print("ERROR: --insert-to-supabase needs Supabase credentials and the supabase package")
+        sys.exit(1)
+    if (args.backfill or args.recompute_comparisons) and not use_postgres and not use_supabase:
+        option = '--backfill' if args.backfill else '--recompute-comparisons'
+        print(f"ERROR: {option} reads ga4_monthly_metrics_v2, so it needs PostgreSQL or Supabase settings")
+        sys.exit(1)
+
+    metrics = ApiMetrics()
+    cache = None
+    try:
+        print("=" * 70)
+        print("GA4 Monthly Metrics Sync (batchRunReports)")
+        print("=" * 70)
+
+        if args.recompute_comparisons:
+            print(f"\nRecomputing comparison columns ({months[0]:%Y-%m} to {months[-1]:%Y-%m})...")
+            source = {'dsn': postgres_dsn} if use_postgres else {'supabase_url': supabase_url,
+                                                                 'supabase_key': supabase_key}
+            reports = recompute_comparisons(months, set(args.property_id) if args.property_id else None,
+                                            metrics=metrics, **source)
+            if not reports:
+                print("\n✓ Comparison columns are up to date")
+            elif not args.load_to_postgres and not args.insert_to_supabase:
+                print(f"\n{len(reports)} rows would change; pass --load-to-postgres / --insert-to-supabase to write")
+            if reports and args.load_to_postgres:
+                load_monthly_metrics_to_postgres(reports, postgres_dsn, metrics=metrics)
+            if reports and args.insert_to_supabase:
+                insert_monthly_metrics_to_supabase(reports, supabase_url, supabase_key, args.batch_size,
+                                                   metrics=metrics)
+            return
+
+        if args.properties_csv:
+            properties = read_properties_csv(args.properties_csv)
+        elif use_postgres:
+            properties = load_active_properties(dsn=postgres_dsn, metrics=metrics)
+        elif use_supabase:
+            properties = load_active_properties(supabase_url=supabase_url, supabase_key=supabase_key,
+                                                metrics=metrics)
+        else:
+            print("ERROR: No property source: pass --properties-csv, or database settings to read ga4_properties")
+            sys.exit(1)
+
+        if args.property_id:
+            wanted = set(args.property_id)
+            properties = [prop for prop in properties if prop[1] in wanted]
+        if not properties:
+            print("⚠ No properties to sync")
+            sys.exit(1)
+
+        if args.backfill:
+            print(f"\nReading ga4_monthly_metrics_v2 coverage ({months[0]:%Y-%m} to {months[-1]:%Y-%m})...")
+            if use_postgres:
+                rows = fetch_monthly_coverage(months[0].isoformat(), months[-1].isoformat(),
+                                              dsn=postgres_dsn, metrics=metrics)
+            else:
+                rows = fetch_monthly_coverage(months[0].isoformat(), months[-1].isoformat(),
+                                              supabase_url=supabase_url, supabase_key=supabase_key,
+                                              metrics=metrics)
+            matrix, planned = plan_backfill(properties, months, rows)
+            matrix.print_report(planned)
+            batches = len(planned)
+            if not planned:
+                print("\n✓ Nothing to backfill")
+                return
+            print()
+        else:
+            batches = len(properties) * -(-len(months) // MONTHS_PER_BATCH)
+            print(f"\n{len(properties)} properties × {len(months)} months "
+                  f"({months[0]:%Y-%m} to {months[-1]:%Y-%m}): {batches} batchRunReports requests\n")
+
+        scheduler = RequestScheduler(qps=args.qps, max_retries=args.max_retries, metrics=metrics,
+                                     service='data_api')
+        if args.cache:
+            cache = ReportCache(args.cache, max_bytes=args.cache_max_mb * 1024 * 1024,
+                                settle_days=args.cache_settle_days)
+        quota = QuotaTracker(args.workers, max_workers=args.max_workers) if args.adaptive else None
+        engine = MonthlyMetricsEngine(credentials_path=creds_path, credentials_json=creds_json,
+                                      workers=args.workers, scheduler=scheduler, cache=cache, quota=quota)
+
+        # With a single target the rows are written while later batches are
+        # still being fetched; two targets both need the full list
+        reports = engine.fetch_batches(planned) if args.backfill else engine.fetch(properties, months)
+        if args.load_to_postgres and args.insert_to_supabase:
+            reports = list(reports)
+
+        if args.load_to_postgres:
+            print("Loading to PostgreSQL as reports arrive...\n")
+            load_monthly_metrics_to_postgres(reports, postgres_dsn, metrics=metrics)
+        if args.insert_to_supabase:
+            print("Writing to Supabase as reports arrive...\n")
+            insert_monthly_metrics_to_supabase(reports, supabase_url, supabase_key, args.batch_size,
+                                               metrics=metrics)
+        if not args.load_to_postgres and not args.insert_to_supabase:
+            print("No --load-to-postgres / --insert-to-supabase: fetching only\n")
+            for _ in reports:
+                pass
+
+        print(f"\n✓ Fetched {engine.fetched} property-months with "
+              f"{batches - len(engine.failures) - len(engine.deferred)} of {batches} requests")
+        if engine.cached:
+            print(f"  ✓ {engine.cached} requests served entirely from the report cache")
+        if engine.degraded:
+            print(f"  ⚠ {engine.degraded} requests fell back to fewer reports")
+        if engine.deferred:
+            print(f"  ⚠ {len(engine.deferred)} requests deferred for quota; run again later (e.g. with --backfill):")
+            for (domain, _, months), reason in engine.deferred[:DEFERRED_REPORT_PREVIEW]:
+                print(f"    - {domain} ({', '.join(month.strftime('%Y-%m') for month in months)}): {reason}")
+            if len(engine.deferred) > DEFERRED_REPORT_PREVIEW:
+                print(f"    ... and {len(engine.deferred) - DEFERRED_REPORT_PREVIEW} more")
+        if engine.failures:
+            print(f"  ✗ {len(engine.failures)} requests failed")
+        scheduler.print_summary('Data API calls')
+        if quota is not None:
+            quota.print_summary()
+        if cache is not None:
+            cache.print_summary()
+        if args.load_to_postgres:
+            metrics.print_summary('postgres', 'PostgreSQL steps')
+        if args.insert_to_supabase:
+            metrics.print_summary('supabase', 'Supabase requests')
+
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        sys.exit(1)
+
+    finally:
+        if cache is not None:
+            cache.close()
+        write_metrics(metrics, args.metrics_json, args.metrics_prom, job='ga4_monthly_metrics')
+
+
+if __name__ == '__main__':
+    main()
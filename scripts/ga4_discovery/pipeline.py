@@ -0,0 +1,170 @@
+"""
+Pipelined database loading: write properties while discovery is still running
+
+Without a pipeline a run discovers everything, then writes files, then loads
+the database, so its duration is the sum of the phases and every property is
+held in memory until the end. DatabasePipeline instead hands each property to
+one background loader thread per target (Supabase, PostgreSQL) through a
+bounded queue. Database writes overlap with the Admin API scan, and nothing
+is collected for a load at the end: a slow database blocks discovery once its
+queue is full (backpressure) instead of letting rows pile up in memory.
+
+Domain collisions (see domains.DomainIndex) are only fully known when discovery
+ends, so a property is streamed when its domain is first seen. At the end, the
+winner of a shared domain is streamed after the property that went first. The
+one that went first is reported to the loaders as superseded, and they undo its
+row.
+"""
+
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional, Set
+
+from .domains import DomainIndex
+from .records import PropertyRecord, as_record
+
+# Properties buffered per loader before discovery has to wait for it
+DEFAULT_QUEUE_SIZE = 1000
+
+# How often a blocked producer checks that its loader is still alive, in seconds
+_PUT_POLL_INTERVAL = 0.1
+
+_END = object()
+_ABORT = object()
+
+
+class PipelineAborted(Exception):
+    """Raised inside a loader when discovery did not finish"""
+
+
+class QueueFeed:
+    """Iterable that another thread fills through a bounded queue
+
+    The consumer iterates until the producer calls close(). If the producer
+    calls abort() instead, iteration raises PipelineAborted, so a loader can
+    roll back instead of committing a partial load.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_QUEUE_SIZE):
+        self.queue: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+        # Set by the consumer when it stops reading, so put() never blocks forever
+        self.stopped = threading.Event()
+
+    def put(self, item) -> bool:
+        """Queue ``item``, blocking while the queue is full; False if the consumer has stopped"""
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=_PUT_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def close(self):
+        self.put(_END)
+
+    def abort(self):
+        self.put(_ABORT)
+
+    def __iter__(self) -> Iterator:
+        while True:
+            item = self.queue.get()
+            if item is _END:
+                return
+            if item is _ABORT:
+                raise PipelineAborted("discovery did not finish")
+            yield item
+
+
+class DatabasePipeline:
+    """Stream discovered properties to database loaders running in background threads
+
+    Each loader is called as ``loader(properties, superseded)`` in its own
+    thread. ``properties`` is an iterable that yields PropertyRecords as
+    discovery produces them. ``superseded`` is a set of property IDs that
+    were streamed but then lost their domain. The set is complete once
+    ``properties`` is exhausted.
+
+    Usage:
+        pipeline = DatabasePipeline({'postgres': load}, domain_index=DomainIndex())
+        for prop in discovery.iter_properties():
+            pipeline.add(prop)
+        results = pipeline.finish()
+    """
+
+    def __init__(self, loaders: Dict[str, Callable], queue_size: int = DEFAULT_QUEUE_SIZE,
+                 domain_index: Optional[DomainIndex] = None):
+        """
+        Args:
+            loaders: Name -> loader callable; the loader's return value is its result
+            queue_size: Properties buffered per loader before add() blocks
+            domain_index: Index that add() fills and finish() uses to settle
+                shared domains, or None to stream every property
+                (--keep-duplicate-domains)
+        """
+        self.domain_index = domain_index
+        self.superseded: Set[str] = set()
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.feeds = {name: QueueFeed(queue_size) for name in loaders}
+        self.threads = [
+            threading.Thread(target=self._run, args=(name, loader), name=f"pipeline-{name}", daemon=True)
+            for name, loader in loaders.items()
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def _run(self, name: str, loader: Callable):
+        feed = self.feeds[name]
+        try:
+            self.results[name] = loader(feed, self.superseded)
+        except BaseException as e:
+            self.errors[name] = e
+        finally:
+            feed.stopped.set()
+
+    def _put(self, prop: PropertyRecord):
+        for feed in self.feeds.values():
+            feed.put(prop)
+
+    def add(self, prop) -> bool:
+        """Stream one discovered property (blocks while a loader's queue is full)
+
+        Returns:
+            True if it was streamed, False if its domain was already streamed
+        """
+        prop = as_record(prop)
+        if self.domain_index is None or self.domain_index.add(prop):
+            self._put(prop)
+            return True
+        return False
+
+    def finish(self, complete: bool = True) -> Dict[str, Any]:
+        """Settle shared domains, end the streams and wait for the loaders
+
+        Args:
+            complete: False when discovery was interrupted; loaders then see
+                PipelineAborted instead of the end of their stream
+
+        Returns:
+            Loader name -> result (loaders that raised are left out and reported)
+        """
+        if complete and self.domain_index is not None:
+            for streamed, winner in self.domain_index.replacements():
+                self.superseded.add(streamed.property_id)
+                self._put(winner)
+
+        for feed in self.feeds.values():
+            if complete:
+                feed.close()
+            else:
+                feed.abort()
+        for thread in self.threads:
+            thread.join()
+
+        for name, error in self.errors.items():
+            if isinstance(error, PipelineAborted):
+                print(f"⚠ {name} load stopped: {error}")
+            else:
+                print(f"ERROR: {name} load failed: {error}")
+        return self.results
@@ -0,0 +1,211 @@
+"""
+Adaptive Data API concurrency driven by property quota feedback
+
+The Data API charges every report in tokens against per-property budgets
+(tokens per day, per hour, per project per hour, concurrent requests) and a
+per-project budget of server errors per hour. A fixed --workers / --qps pace is
+either too slow for a healthy fleet or too fast for a busy property, and in the
+second case it turns into a run of 429s that the scheduler can only back off
+from.
+
+Requests sent with ``return_property_quota`` get the remaining budgets back in
+the response. QuotaTracker keeps the latest figures per property, and the
+project-wide ones, and uses them in two ways:
+
+- Concurrency: requests in flight are capped by an adjustable limit. It grows
+  by one after ``limit`` throttle-free responses, is halved on a quota error,
+  and drops to the minimum when the project's server-error budget runs low
+  (additive increase, multiplicative decrease).
+- Deferral: a property whose remaining daily, hourly or project-hourly
+  tokens would not cover a few more requests of the size it last used is
+  skipped, and its requests are left for a later run (see
+  MonthlyMetricsEngine.fetch_batches).
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Per-property budgets in QuotaStatus form (consumed by the request, remaining)
+PROPERTY_QUOTAS = ('tokens_per_day', 'tokens_per_hour', 'tokens_per_project_per_hour', 'concurrent_requests')
+
+# Budgets shared by every property of the Cloud project
+PROJECT_QUOTAS = ('server_errors_per_project_per_hour', 'potentially_thresholded_requests_per_hour')
+
+DEFAULT_MIN_WORKERS = 1
+DEFAULT_MAX_WORKERS = 32
+
+# A property is deferred when its hourly tokens would not cover this many more
+# requests of its last request's cost
+DEFAULT_RESERVE_REQUESTS = 3
+
+# Concurrency drops to the minimum when fewer server errors than this are left
+PROJECT_SERVER_ERROR_RESERVE = 3
+
+
+def is_quota_error(error: Exception) -> bool:
+    """Whether an API error means a quota ran out (429 / RESOURCE_EXHAUSTED)"""
+    if type(error).__name__ in ('TooManyRequests', 'ResourceExhausted'):
+        return True
+    status = getattr(error, 'grpc_status_code', None)
+    return getattr(status, 'name', None) == 'RESOURCE_EXHAUSTED' or getattr(error, 'code', None) == 429
+
+
+def quota_statuses(property_quota) -> Dict[str, tuple]:
+    """Quota name -> (consumed, remaining) from a response's property_quota, {} if absent"""
+    if not property_quota:
+        return {}
+
+    statuses = {}
+    for name in PROPERTY_QUOTAS + PROJECT_QUOTAS:
+        status = getattr(property_quota, name, None)
+        if status:
+            statuses[name] = (int(status.consumed), int(status.remaining))
+    return statuses
+
+
+class PropertyBudget:
+    """Latest remaining quota of one property and the token cost of its last request"""
+
+    __slots__ = ('remaining', 'cost')
+
+    def __init__(self):
+        self.remaining: Dict[str, int] = {}
+        self.cost = 0
+
+
+class QuotaTracker:
+    """Thread-safe quota bookkeeping and adaptive concurrency limit"""
+
+    def __init__(self, initial: int, min_workers: int = DEFAULT_MIN_WORKERS,
+                 max_workers: int = DEFAULT_MAX_WORKERS, reserve_requests: int = DEFAULT_RESERVE_REQUESTS):
+        """
+        Args:
+            initial: Requests in flight to start with
+            min_workers: Lower bound of the limit
+            max_workers: Upper bound of the limit (size the worker pool to this)
+            reserve_requests: Requests' worth of tokens a property must have
+                left to be sent more work
+        """
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        self.limit = min(self.max_workers, max(self.min_workers, initial))
+        self.reserve_requests = reserve_requests
+        self.properties: Dict[str, PropertyBudget] = {}
+        self.project: Dict[str, int] = {}
+        self.tokens_used = 0
+        self.charged = set()
+        self.in_flight = 0
+        self.successes = 0
+        self.peak = self.limit
+        self.increases = 0
+        self.decreases = 0
+        # Bumped on every decrease; a quota error from a request sent before
+        # the last decrease does not halve the limit again
+        self.epoch = 0
+        self.local = threading.local()
+        self.condition = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the ``limit`` in-flight slots for the duration of a request"""
+        with self.condition:
+            while self.in_flight >= self.limit:
+                self.condition.wait()
+            self.in_flight += 1
+            self.local.epoch = self.epoch
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.in_flight -= 1
+                self.condition.notify_all()
+
+    def _set_limit(self, limit: int):
+        # Called with the condition held
+        limit = min(self.max_workers, max(self.min_workers, limit))
+        if limit > self.limit:
+            self.increases += 1
+        elif limit < self.limit:
+            self.decreases += 1
+            self.epoch += 1
+        self.limit = limit
+        self.peak = max(self.peak, limit)
+        self.successes = 0
+        self.condition.notify_all()
+
+    def record(self, property_id: str, property_quotas) -> int:
+        """Take in the property_quota of each report of a response; returns the tokens charged"""
+        cost = 0
+        remaining: Dict[str, int] = {}
+        for property_quota in property_quotas:
+            for name, (consumed, left) in quota_statuses(property_quota).items():
+                if name == 'tokens_per_hour':
+                    cost += consumed
+                remaining[name] = min(left, remaining.get(name, left))
+        if not remaining:
+            return 0
+
+        with self.condition:
+            budget = self.properties.setdefault(property_id, PropertyBudget())
+            budget.cost = cost
+            for name in PROPERTY_QUOTAS:
+                if name in remaining:
+                    budget.remaining[name] = remaining[name]
+            for name in PROJECT_QUOTAS:
+                if name in remaining:
+                    self.project[name] = remaining[name]
+            self.tokens_used += cost
+            self.charged.add(property_id)
+
+            server_errors = self.project.get('server_errors_per_project_per_hour')
+            if server_errors is not None and server_errors < PROJECT_SERVER_ERROR_RESERVE:
+                if self.limit > self.min_workers:
+                    self._set_limit(self.min_workers)
+                return cost
+
+            if remaining.get('concurrent_requests', 1) < 1:
+                # The property is at its concurrent request limit: hold, do not grow
+                return cost
+
+            self.successes += 1
+            if self.successes >= self.limit:
+                self._set_limit(self.limit + 1)
+        return cost
+
+    def throttled(self):
+        """A request hit a quota limit (429 / RESOURCE_EXHAUSTED): halve the limit
+
+        Call from the thread holding the request's slot().
+        """
+        with self.condition:
+            if getattr(self.local, 'epoch', self.epoch) == self.epoch:
+                self._set_limit(self.limit // 2)
+            else:
+                self.successes = 0
+
+    def defer_reason(self, property_id: str) -> Optional[str]:
+        """Why ``property_id`` should wait for a later run, or None to send it now"""
+        with self.condition:
+            budget = self.properties.get(property_id)
+            if budget is None or not budget.cost:
+                return None
+
+            cost = budget.cost
+            remaining = budget.remaining
+            if remaining.get('tokens_per_day', cost) < cost:
+                return 'daily tokens exhausted'
+            reserve = cost * self.reserve_requests
+            if remaining.get('tokens_per_hour', reserve) < reserve:
+                return f"{remaining['tokens_per_hour']} hourly tokens left"
+            if remaining.get('tokens_per_project_per_hour', reserve) < reserve:
+                return f"{remaining['tokens_per_project_per_hour']} hourly project tokens left"
+            return None
+
+    def print_summary(self):
+        print("\nData API quota:")
+        print(f"  - Concurrency: ended at {self.limit}, peak {self.peak} "
+              f"({self.increases} increases, {self.decreases} decreases)")
+        print(f"  - Tokens used: {self.tokens_used} across {len(self.charged)} properties")
+        for name, remaining in self.project.items():
+            print(f"  - {name}: {remaining} left")
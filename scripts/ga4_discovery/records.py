@@ -0,0 +1,114 @@
+"""
+Compact record type for discovered properties
+
+A PropertyRecord is a slotted object instead of a dict: no per-instance
+__dict__, and the strings shared by many properties of an organization
+(account, currency, time zone) are interned, so memory per property stays
+small and flat across multi-thousand-property scans. Its category is
+computed once and kept on the record, so writers and loaders do not
+categorize the same property again.
+
+Records still support read-only dict-style access (``prop['domain']``,
+``prop.get('default_uri')``) for code written against the old property dicts;
+to_dict() gives a plain dict for JSON.
+"""
+
+import sys
+from typing import Dict, Iterator, Optional, Tuple
+
+from .categories import get_category_rules
+
+DEFAULT_CURRENCY_CODE = 'USD'
+DEFAULT_TIME_ZONE = 'America/Los_Angeles'
+
+
+def normalize_domain(domain: str) -> str:
+    """Canonical form of a domain, used to detect properties sharing one site"""
+    domain = domain.strip().lower()
+    for scheme in ('https://', 'http://'):
+        if domain.startswith(scheme):
+            domain = domain[len(scheme):]
+
+    domain = domain.split('/')[0].split(':')[0].rstrip('.')
+    if domain.startswith('www.'):
+        domain = domain[len('www.'):]
+    return domain
+
+
+class PropertyRecord:
+    """One discovered GA4 property
+
+    The domain is normalized on creation (see normalize_domain), so the
+    domain index, the writers and the loaders all key on the same value.
+    """
+
+    FIELDS: Tuple[str, ...] = (
+        'property_id', 'display_name', 'domain', 'default_uri',
+        'currency_code', 'time_zone', 'account', 'create_time',
+    )
+
+    __slots__ = FIELDS + ('_category',)
+
+    def __init__(self, property_id: str, display_name: str, domain: str, default_uri: Optional[str] = None,
+                 currency_code: str = DEFAULT_CURRENCY_CODE, time_zone: str = DEFAULT_TIME_ZONE,
+                 account: Optional[str] = None, create_time: Optional[str] = None):
+        self.property_id = property_id
+        self.display_name = display_name
+        self.domain = normalize_domain(domain)
+        self.default_uri = default_uri
+        self.currency_code = sys.intern(currency_code)
+        self.time_zone = sys.intern(time_zone)
+        self.account = sys.intern(account) if account is not None else None
+        self.create_time = create_time
+        self._category: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PropertyRecord':
+        """Build a record from a property dict (snapshot, journal or caller data)"""
+        return cls(**{field: data[field] for field in cls.FIELDS if field in data})
+
+    @property
+    def category(self) -> str:
+        """Category under the active rules, computed on first use"""
+        if self._category is None:
+            self._category = get_category_rules().categorize(self.display_name, self.domain)
+        return self._category
+
+    def to_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    # Read-only mapping access, for code written against property dicts
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PropertyRecord):
+            return all(getattr(self, field) == getattr(other, field) for field in self.FIELDS)
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PropertyRecord({self.property_id!r}, {self.display_name!r}, {self.domain!r})"
+
+
+def as_record(prop) -> PropertyRecord:
+    """Return ``prop`` as a PropertyRecord, converting a plain property dict"""
+    return prop if isinstance(prop, PropertyRecord) else PropertyRecord.from_dict(prop)
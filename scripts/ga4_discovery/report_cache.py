@@ -0,0 +1,172 @@
+"""
+On-disk cache of Data API report results for closed months
+
+GA4 keeps processing a month's data for a few days after it ends; after that
+the numbers no longer change. Re-syncing history (a backfill, a re-run after a
+schema change, a new database) still re-queried every property, spending quota
+and time on answers that were already known.
+
+ReportCache stores each report of a batchRunReports response in a SQLite file,
+keyed by property and the report definition itself (date ranges, metrics,
+dimensions, ordering, limit). Only reports whose date ranges all ended more
+than ``settle_days`` ago are stored or served, so an open or just-closed month
+is always fetched fresh. The file is bounded by ``max_bytes``; the least
+recently used reports are evicted first.
+
+Only the row values are kept (dimension and metric value strings), which is
+all the parsers in reports.py read.
+"""
+
+import os
+import json
+import zlib
+import sqlite3
+import hashlib
+import threading
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+# Days after a month ends before its reports are cached
+DEFAULT_SETTLE_DAYS = 3
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Bump when the stored format or the meaning of a report changes
+CACHE_VERSION = 1
+
+
+def report_key(property_id: str, report: Dict) -> str:
+    """Cache key of one report request for a property"""
+    canonical = json.dumps({'v': CACHE_VERSION, 'property': property_id, 'report': report},
+                           sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _encode(report) -> bytes:
+    rows = [
+        [[value.value for value in row.dimension_values], [value.value for value in row.metric_values]]
+        for row in report.rows
+    ]
+    return zlib.compress(json.dumps(rows, separators=(',', ':')).encode('utf-8'))
+
+
+def _value(value: str) -> SimpleNamespace:
+    return SimpleNamespace(value=value)
+
+
+def _decode(blob: bytes) -> SimpleNamespace:
+    rows = json.loads(zlib.decompress(blob).decode('utf-8'))
+    return SimpleNamespace(rows=[
+        SimpleNamespace(dimension_values=[_value(value) for value in dimensions],
+                        metric_values=[_value(value) for value in values])
+        for dimensions, values in rows
+    ])
+
+
+class ReportCache:
+    """Thread-safe, size-bounded SQLite cache of settled report results"""
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, settle_days: int = DEFAULT_SETTLE_DAYS,
+                 today: Optional[date] = None):
+        """Open (or create) the cache file
+
+        Args:
+            path: SQLite file
+            max_bytes: Size budget for stored reports; older entries are evicted beyond it
+            settle_days: Days after its last date range ends before a report is cached
+            today: Reference date for the settle period (default: today)
+        """
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.settled_before = ((today or date.today()) - timedelta(days=settle_days)).isoformat()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS reports ('
+            ' key TEXT PRIMARY KEY, property_id TEXT NOT NULL, data BLOB NOT NULL,'
+            ' size INTEGER NOT NULL, accessed INTEGER NOT NULL)'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS reports_accessed ON reports (accessed)')
+        self.conn.commit()
+        self.size, self.clock = self.conn.execute(
+            'SELECT COALESCE(SUM(size), 0), COALESCE(MAX(accessed), 0) FROM reports').fetchone()
+        # A smaller --cache-max-mb than last time applies right away
+        with self.lock:
+            self._evict()
+            self.conn.commit()
+
+    def is_settled(self, report: Dict) -> bool:
+        """True when every date range of ``report`` ended before the settle period"""
+        return all(date_range['end_date'] < self.settled_before for date_range in report['date_ranges'])
+
+    def _tick(self) -> int:
+        # Monotonic access counter for LRU order; not wall time, so clock changes do not matter
+        self.clock += 1
+        return self.clock
+
+    def get(self, property_id: str, report: Dict):
+        """Stored result of ``report`` (rows only), or None"""
+        if not self.is_settled(report):
+            return None
+
+        key = report_key(property_id, report)
+        with self.lock:
+            row = self.conn.execute('SELECT data FROM reports WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute('UPDATE reports SET accessed = ? WHERE key = ?', (self._tick(), key))
+            self.conn.commit()
+            self.hits += 1
+        return _decode(row[0])
+
+    def put(self, property_id: str, report: Dict, result):
+        """Store the result of ``report`` if its months are settled"""
+        if not self.is_settled(report):
+            return
+
+        key = report_key(property_id, report)
+        data = _encode(result)
+        with self.lock:
+            previous = self.conn.execute('SELECT size FROM reports WHERE key = ?', (key,)).fetchone()
+            self.conn.execute('INSERT OR REPLACE INTO reports (key, property_id, data, size, accessed) '
+                              'VALUES (?, ?, ?, ?, ?)', (key, property_id, data, len(data), self._tick()))
+            self.size += len(data) - (previous[0] if previous else 0)
+            self.stored += 1
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """Drop least recently used reports until the cache fits in max_bytes"""
+        while self.size > self.max_bytes:
+            rows = self.conn.execute('SELECT key, size FROM reports ORDER BY accessed LIMIT 100').fetchall()
+            if not rows:
+                self.size = 0
+                return
+            for key, size in rows:
+                if self.size <= self.max_bytes:
+                    break
+                self.conn.execute('DELETE FROM reports WHERE key = ?', (key,))
+                self.size -= size
+                self.evicted += 1
+
+    def lookup(self, property_id: str, reports: List[Dict]) -> List:
+        """Cached result for each of ``reports`` (None where not cached)"""
+        return [self.get(property_id, report) for report in reports]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def print_summary(self):
+        print(f"\nReport cache ({self.path}):")
+        print(f"  - {self.hits} reports served from disk, {self.misses} not cached")
+        print(f"  - {self.stored} stored, {self.evicted} evicted, {self.size / (1024 * 1024):.1f} MB in use")
@@ -0,0 +1,285 @@
+"""
+GA4 Data API report definitions and parsing for the monthly metrics tables
+
+Mirrors api/analytics/ga4-service-enhanced.js and sync-monthly-data.js: the
+same metrics, dimensions, limits and derived values, so rows written by the
+Python engine (monthly.py) match the ones the Node sync writes to
+ga4_monthly_metrics_v2, ga4_traffic_sources and ga4_key_events.
+
+Requests are plain dicts in the Data API's field names; the client converts
+them, so nothing here imports google-analytics-data.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Total key events; the Node service reads the same metric so values match
+KEY_EVENTS_METRIC = 'conversions'
+
+# Core report metrics, in the order parse_core reads them
+CORE_METRICS = (
+    KEY_EVENTS_METRIC, 'newUsers', 'activeUsers', 'totalUsers', 'sessions',
+    'engagementRate', 'userEngagementDuration',
+)
+
+TRAFFIC_SOURCE_DIMENSIONS = ('sessionSource', 'sessionMedium', 'sessionDefaultChannelGroup')
+TRAFFIC_SOURCE_METRICS = (
+    'activeUsers', 'sessions', 'newUsers', 'engagedSessions', 'engagementRate', 'userEngagementDuration',
+)
+TRAFFIC_SOURCES_LIMIT = 50
+
+KEY_EVENT_METRICS = (KEY_EVENTS_METRIC, 'totalUsers', 'eventValue')
+# Used when the property rejects the key events report (eventValue is then 0)
+KEY_EVENT_FALLBACK_METRICS = ('eventCount', 'totalUsers')
+KEY_EVENTS_LIMIT = 100
+
+# batchRunReports accepts at most 5 reports, and a report at most 4 date ranges
+MAX_REPORTS_PER_BATCH = 5
+MAX_DATE_RANGES = 4
+
+# Months per batch: one core report covering each month and the month before,
+# plus a traffic sources and a key events report per month
+MONTHS_PER_BATCH = 2
+
+# A month is 'up' / 'down' when it changed by more than this many percent
+TREND_THRESHOLD = 5.0
+
+# Core metric columns of ga4_monthly_metrics_v2, each with previous_month_*,
+# *_trend and *_change companions
+CORE_COLUMNS = (
+    'key_events', 'new_users', 'active_users', 'total_users', 'sessions',
+    'engagement_rate', 'avg_engagement_time',
+)
+
+MONTHLY_METRICS_COLUMNS = (
+    ('domain', 'property_id', 'metric_month')
+    + CORE_COLUMNS
+    + tuple(f'previous_month_{column}' for column in CORE_COLUMNS)
+    + tuple(f'{column}_trend' for column in CORE_COLUMNS)
+    + tuple(f'{column}_change' for column in CORE_COLUMNS)
+    + ('fetched_at', 'is_stale')
+)
+
+TRAFFIC_SOURCE_COLUMNS = (
+    'domain', 'property_id', 'metric_month', 'source_medium', 'channel_group', 'users', 'sessions',
+    'new_users', 'engaged_sessions', 'engagement_rate', 'avg_engagement_time', 'fetched_at',
+)
+
+KEY_EVENT_COLUMNS = (
+    'domain', 'property_id', 'metric_month', 'event_name', 'event_count', 'users_triggering',
+    'event_value', 'fetched_at',
+)
+
+# Table -> (columns, unique key); breakdown tables are replaced per
+# (property_id, metric_month), as the Node sync does
+MONTHLY_TABLES = {
+    'ga4_monthly_metrics_v2': (MONTHLY_METRICS_COLUMNS, ('domain', 'property_id', 'metric_month')),
+    'ga4_traffic_sources': (TRAFFIC_SOURCE_COLUMNS, ('domain', 'property_id', 'metric_month', 'source_medium')),
+    'ga4_key_events': (KEY_EVENT_COLUMNS, ('domain', 'property_id', 'metric_month', 'event_name')),
+}
+
+
+def parse_month(value: str) -> date:
+    """'2025-10' or '2025-10-01' -> date(2025, 10, 1)"""
+    parts = value.split('-')
+    if len(parts) not in (2, 3):
+        raise ValueError(f"Invalid month {value!r}; expected YYYY-MM")
+    return date(int(parts[0]), int(parts[1]), 1)
+
+
+def previous_month(month: date) -> date:
+    return (month.replace(day=1) - timedelta(days=1)).replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def month_range(month: date) -> Tuple[str, str]:
+    """First and last day of ``month`` as YYYY-MM-DD"""
+    return month.isoformat(), (next_month(month) - timedelta(days=1)).isoformat()
+
+
+def months_between(first: date, last: date) -> List[date]:
+    """Every month from ``first`` to ``last``, inclusive"""
+    months = []
+    month = first.replace(day=1)
+    while month <= last:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+def _date_range(month: date) -> Dict:
+    start, end = month_range(month)
+    return {'start_date': start, 'end_date': end, 'name': month.isoformat()}
+
+
+def _core_report(months: Sequence[date]) -> Dict:
+    """Core metrics for ``months`` and the month before each, one row per date range"""
+    ranges = sorted({m for month in months for m in (month, previous_month(month))}, reverse=True)
+    return {
+        'date_ranges': [_date_range(month) for month in ranges],
+        'metrics': [{'name': metric} for metric in CORE_METRICS],
+    }
+
+
+def _traffic_sources_report(month: date) -> Dict:
+    return {
+        'date_ranges': [_date_range(month)],
+        'dimensions': [{'name': dimension} for dimension in TRAFFIC_SOURCE_DIMENSIONS],
+        'metrics': [{'name': metric} for metric in TRAFFIC_SOURCE_METRICS],
+        'order_bys': [{'metric': {'metric_name': 'sessions'}, 'desc': True}],
+        'limit': TRAFFIC_SOURCES_LIMIT,
+    }
+
+
+def _key_events_report(month: date, fallback: bool = False) -> Dict:
+    metrics = KEY_EVENT_FALLBACK_METRICS if fallback else KEY_EVENT_METRICS
+    return {
+        'date_ranges': [_date_range(month)],
+        'dimensions': [{'name': 'eventName'}],
+        'metrics': [{'name': metric} for metric in metrics],
+        'order_bys': [{'metric': {'metric_name': metrics[0]}, 'desc': True}],
+        'limit': KEY_EVENTS_LIMIT,
+    }
+
+
+# Report sets tried in turn for a batch: everything, then the key events
+# fallback, then the core metrics alone (the Node service also keeps the core
+# metrics when a breakdown report fails)
+REPORT_SETS = ('full', 'key_events_fallback', 'core')
+
+
+def build_batch_request(property_id: str, months: Sequence[date], report_set: str = 'full') -> Dict:
+    """batchRunReports request for up to MONTHS_PER_BATCH months of one property
+
+    The first report holds the core metrics of every month and its previous
+    month (date ranges are named by month); then, unless report_set is
+    'core', a traffic sources and a key events report per month.
+    """
+    if not 0 < len(months) <= MONTHS_PER_BATCH:
+        raise ValueError(f"A batch covers 1 to {MONTHS_PER_BATCH} months, got {len(months)}")
+
+    requests = [_core_report(months)]
+    if report_set != 'core':
+        for month in months:
+            requests.append(_traffic_sources_report(month))
+            requests.append(_key_events_report(month, fallback=report_set == 'key_events_fallback'))
+
+    return {'property': f'properties/{property_id}', 'requests': requests}
+
+
+def _value(values, index: int, default: str = '') -> str:
+    if index < len(values) and values[index].value:
+        return values[index].value
+    return default
+
+
+def _int(values, index: int) -> int:
+    return int(float(_value(values, index, '0')))
+
+
+def _float(values, index: int) -> float:
+    return float(_value(values, index, '0'))
+
+
+def empty_core_metrics() -> Dict[str, float]:
+    return dict.fromkeys(CORE_COLUMNS, 0)
+
+
+def parse_core(report) -> Dict[str, Dict[str, float]]:
+    """Core metrics by month (YYYY-MM-01); months without rows are left out"""
+    by_month = {}
+    for row in report.rows:
+        values = row.metric_values
+        active_users = _int(values, 2)
+        duration = _float(values, 6)
+        by_month[row.dimension_values[0].value] = {
+            'key_events': _int(values, 0),
+            'new_users': _int(values, 1),
+            'active_users': active_users,
+            'total_users': _int(values, 3),
+            'sessions': _int(values, 4),
+            'engagement_rate': _float(values, 5) * 100,
+            'avg_engagement_time': duration / active_users if active_users > 0 else 0,
+        }
+    return by_month
+
+
+def parse_traffic_sources(report) -> List[Dict]:
+    """Traffic source rows, one per source / medium
+
+    The report is split by channel group as well, so a source / medium can
+    come back more than once; those rows are summed (the first, busiest
+    one's channel group is kept), since source_medium is unique per month.
+    """
+    sources: Dict[str, Dict] = {}
+    for row in report.rows:
+        dimensions = row.dimension_values
+        values = row.metric_values
+        source_medium = f"{_value(dimensions, 0, '(not set)')} / {_value(dimensions, 1, '(not set)')}"
+
+        source = sources.get(source_medium)
+        if source is None:
+            source = sources[source_medium] = {
+                'source_medium': source_medium,
+                'channel_group': _value(dimensions, 2, 'Unassigned'),
+                'users': 0, 'sessions': 0, 'new_users': 0, 'engaged_sessions': 0, 'duration': 0.0,
+            }
+        source['users'] += _int(values, 0)
+        source['sessions'] += _int(values, 1)
+        source['new_users'] += _int(values, 2)
+        source['engaged_sessions'] += _int(values, 3)
+        source['duration'] += _float(values, 5)
+
+    for source in sources.values():
+        duration = source.pop('duration')
+        source['engagement_rate'] = (source['engaged_sessions'] / source['sessions'] * 100
+                                     if source['sessions'] > 0 else 0)
+        source['avg_engagement_time'] = duration / source['users'] if source['users'] > 0 else 0
+
+    return list(sources.values())
+
+
+def parse_key_events(report) -> List[Dict]:
+    """Key event rows, one per event name (eventValue is 0 for the fallback report)"""
+    return [
+        {
+            'event_name': _value(row.dimension_values, 0, 'unknown'),
+            'event_count': _int(row.metric_values, 0),
+            'users_triggering': _int(row.metric_values, 1),
+            'event_value': _float(row.metric_values, 2),
+        }
+        for row in report.rows
+    ]
+
+
+def compare(current: float, previous: float) -> Tuple[float, str]:
+    """Percent change and trend, as calculateMonthComparison in the Node service"""
+    if previous == 0:
+        return (100, 'up') if current > 0 else (0, 'neutral')
+
+    change = (current - previous) / previous * 100
+    if change > TREND_THRESHOLD:
+        return change, 'up'
+    if change < -TREND_THRESHOLD:
+        return change, 'down'
+    return change, 'neutral'
+
+
+def monthly_metrics_row(domain: str, property_id: str, month: date, current: Dict[str, float],
+                        previous: Optional[Dict[str, float]], fetched_at: str) -> Dict:
+    """One ga4_monthly_metrics_v2 row, with previous-month values, trends and changes"""
+    previous = previous or empty_core_metrics()
+    row = {'domain': domain, 'property_id': property_id, 'metric_month': month.isoformat()}
+    row.update(current)
+    for column in CORE_COLUMNS:
+        row[f'previous_month_{column}'] = previous[column]
+    for column in CORE_COLUMNS:
+        change, trend = compare(current[column], previous[column])
+        row[f'{column}_trend'] = trend
+        row[f'{column}_change'] = change
+    row['fetched_at'] = fetched_at
+    row['is_stale'] = False
+    return row
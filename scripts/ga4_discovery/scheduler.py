@@ -0,0 +1,267 @@
+"""
+Shared request scheduler for Google Analytics Admin API calls
+
+Every Admin API call made by the discovery and grant scripts goes through a
+RequestScheduler, which:
+1. Rate-limits calls with a token bucket sized to the Admin API quota
+2. Retries transient gRPC errors (429 / UNAVAILABLE / DEADLINE_EXCEEDED / ...)
+   with exponential backoff and full jitter
+3. Records calls, retries, errors and latency per API method in an ApiMetrics
+
+Usage:
+    scheduler = RequestScheduler(qps=10)
+    accounts = scheduler.list('list_accounts', client.list_accounts)
+    scheduler.print_summary()
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .metrics import ApiMetrics
+
+# gRPC status names treated as transient when the exception type is unknown
+RETRYABLE_STATUS_NAMES = (
+    'RESOURCE_EXHAUSTED', 'UNAVAILABLE', 'DEADLINE_EXCEEDED', 'INTERNAL', 'ABORTED',
+)
+
+RETRYABLE_HTTP_CODES = (429, 500, 503, 504)
+
+# Admin API default quota is 600 requests per minute per project
+DEFAULT_QPS = 10.0
+DEFAULT_BURST = 20
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 32.0
+
+# Keyword arguments of the generated client methods that are not request fields
+CALL_OPTIONS = ('retry', 'timeout', 'metadata')
+
+
+_retryable_exceptions: Optional[Tuple] = None
+
+
+def retryable_exceptions() -> Tuple:
+    """google.api_core exception types that mark transient errors
+
+    Imported on first use: google.api_core pulls in grpc, which is slow to load
+    and not needed until a call has actually failed.
+    """
+    global _retryable_exceptions
+    if _retryable_exceptions is None:
+        try:
+            from google.api_core import exceptions as core_exceptions
+            _retryable_exceptions = (
+                core_exceptions.TooManyRequests,
+                core_exceptions.ResourceExhausted,
+                core_exceptions.ServiceUnavailable,
+                core_exceptions.DeadlineExceeded,
+                core_exceptions.InternalServerError,
+                core_exceptions.Aborted,
+            )
+        except ImportError:
+            _retryable_exceptions = ()
+    return _retryable_exceptions
+
+
+def _page_request(kwargs: Dict, page_token: str) -> Dict:
+    """Call arguments for a list method asking for the page at ``page_token``
+
+    Flattened request fields (parent=..., filter=...) and dict requests are
+    merged into a new request dict; a request message is updated in place.
+    """
+    kwargs = dict(kwargs)
+    request = kwargs.pop('request', None)
+    if request is None or isinstance(request, dict):
+        fields = {key: kwargs.pop(key) for key in list(kwargs) if key not in CALL_OPTIONS}
+        kwargs['request'] = {**(request or {}), **fields, 'page_token': page_token}
+    else:
+        request.page_token = page_token
+        kwargs['request'] = request
+    return kwargs
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an API error is transient and worth retrying"""
+    exceptions = retryable_exceptions()
+    if exceptions and isinstance(error, exceptions):
+        return True
+
+    status = getattr(error, 'grpc_status_code', None)
+    if getattr(status, 'name', None) in RETRYABLE_STATUS_NAMES:
+        return True
+
+    return getattr(error, 'code', None) in RETRYABLE_HTTP_CODES
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token, returning how long the caller must wait for it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class RequestScheduler:
+    """Rate-limited, retrying executor for Admin API calls
+
+    One scheduler is meant to be shared by every thread or task of a run so the
+    token bucket reflects the project's whole request rate.
+    """
+
+    def __init__(self, qps: float = DEFAULT_QPS, burst: int = DEFAULT_BURST,
+                 max_retries: int = DEFAULT_MAX_RETRIES, base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY, metrics: Optional[ApiMetrics] = None,
+                 service: str = 'admin_api'):
+        """Initialize the scheduler
+
+        Args:
+            qps: Sustained requests per second (0 disables rate limiting)
+            burst: Requests allowed back to back before throttling
+            max_retries: Retries per call for transient errors
+            base_delay: Backoff for the first retry, in seconds
+            max_delay: Upper bound for a single backoff, in seconds
+            metrics: Accounting shared with the rest of the run (a private one if None)
+            service: Service label the calls are recorded under
+        """
+        self.bucket = TokenBucket(qps, burst) if qps > 0 else None
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.metrics = metrics or ApiMetrics()
+        self.service = service
+
+    @property
+    def stats(self) -> Dict[str, Dict]:
+        """Per-method counters (calls, retries, errors, latency) of this scheduler's service"""
+        return self.metrics.service_stats(self.service)
+
+    def _count(self, method: str, key: str):
+        self.metrics.count(self.service, method, key)
+
+    def _observe(self, method: str, started: float):
+        self.metrics.observe(self.service, method, time.perf_counter() - started)
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _should_retry(self, method: str, error: Exception, attempt: int) -> bool:
+        if attempt < self.max_retries and is_retryable(error):
+            self._count(method, 'retries')
+            return True
+
+        self._count(method, 'errors')
+        return False
+
+    def call(self, method: str, fn: Callable, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` under the rate limit, retrying transient errors"""
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                self.bucket.acquire()
+            self._count(method, 'calls')
+
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self._observe(method, started)
+                if not self._should_retry(method, e, attempt):
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            self._observe(method, started)
+            return result
+
+    def list(self, method: str, fn: Callable, *args, **kwargs) -> List:
+        """Like call(), but pages through a list method with one call() per page
+
+        Every page is requested explicitly with the previous page's
+        next_page_token, so each one takes a token, counts as a call and is
+        retried on its own. Items are read from the response field named after
+        the method (list_data_streams -> data_streams). A result without
+        pages (a plain list) is returned as a list.
+        """
+        field = method[len('list_'):]
+        items = []
+        page_token = ''
+        while True:
+            page = self.call(method, fn, *args, **_page_request(kwargs, page_token))
+            if not hasattr(page, 'next_page_token'):
+                return list(page)
+            items.extend(getattr(page, field))
+            page_token = page.next_page_token
+            if not page_token:
+                return items
+
+    async def call_async(self, method: str, fn: Callable, *args, **kwargs):
+        """Async variant of call() for coroutine functions"""
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                await self.bucket.acquire_async()
+            self._count(method, 'calls')
+
+            started = time.perf_counter()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                self._observe(method, started)
+                if not self._should_retry(method, e, attempt):
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            self._observe(method, started)
+            return result
+
+    async def list_async(self, method: str, fn: Callable, *args, **kwargs) -> List:
+        """Async variant of list() for async list methods"""
+        field = method[len('list_'):]
+        items = []
+        page_token = ''
+        while True:
+            page = await self.call_async(method, fn, *args, **_page_request(kwargs, page_token))
+            if not hasattr(page, 'next_page_token'):
+                if hasattr(page, '__aiter__'):
+                    return [item async for item in page]
+                return list(page)
+            items.extend(getattr(page, field))
+            page_token = page.next_page_token
+            if not page_token:
+                return items
+
+    def print_summary(self, title: Optional[str] = None):
+        """Print per-method call, retry, error and latency figures"""
+        self.metrics.print_summary(self.service, title or 'Admin API calls')
@@ -0,0 +1,305 @@
+"""
+Discovery sharded across several service accounts
+
+Admin API quotas are per project, so one service account caps a run's
+throughput. With several credential files the run is split in two phases:
+
+1. Every credential walks its account summaries (one paginated call) to find
+   the GA4 properties it can see.
+2. assign_shards gives each property to exactly one credential that can see
+   it, balancing property counts while keeping accounts together where they
+   fit. Each credential then discovers its shard in its own process, with its
+   own rate limiter. Workers send their records back in chunks through a
+   bounded queue as they are discovered, and the parent merges and
+   de-duplicates them as they arrive; no process holds a whole shard.
+
+Quota-bound runs scale roughly with the number of credentials.
+"""
+
+import os
+import math
+import queue
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .discovery import ACCOUNT_SUMMARIES_PAGE_SIZE, AsyncGA4PropertyDiscovery, GA4PropertyDiscovery
+from .journal import RunJournal
+from .metrics import ApiMetrics
+from .records import PropertyRecord
+from .scheduler import RequestScheduler
+
+# Properties assigned to one credential: {account name: property names}
+Shard = Dict[str, Set[str]]
+
+# Records a shard worker sends back at a time
+RECORD_CHUNK_SIZE = 200
+
+# Chunks queued for the parent before the workers wait for it
+DEFAULT_QUEUE_CHUNKS = 16
+
+# How often a blocked worker checks for a stop, and the parent for finished shards, in seconds
+_POLL_INTERVAL = 0.1
+
+
+class ShardAborted(Exception):
+    """Raised inside a shard worker when the parent stopped reading its records"""
+
+
+def list_visible_properties(client, scheduler: RequestScheduler) -> Dict[str, List[str]]:
+    """GA4 property names an Admin API client can see, grouped by account"""
+    summaries = scheduler.list(
+        'list_account_summaries', client.list_account_summaries,
+        request={'page_size': ACCOUNT_SUMMARIES_PAGE_SIZE}
+    )
+
+    return {
+        summary.account: [
+            prop_summary.property for prop_summary in summary.property_summaries
+            # Only include GA4 properties (not Universal Analytics)
+            if prop_summary.property_type.name == 'PROPERTY_TYPE_ORDINARY'
+        ]
+        for summary in summaries
+    }
+
+
+def assign_shards(visible: Sequence[Dict[str, List[str]]]) -> List[Shard]:
+    """Give every property to exactly one of the credentials that can see it
+
+    Properties are grouped by account and by the set of credentials that see
+    them. Groups are handed out largest first to the least-loaded eligible
+    credential: whole while they fit in its fair share of the total, split
+    across credentials otherwise (so one huge account does not end up on a
+    single credential).
+
+    Args:
+        visible: Per credential, the property names it can see by account
+
+    Returns:
+        One shard per credential, in the same order (possibly empty)
+    """
+    eligible: Dict[Tuple[str, str], List[int]] = {}
+    for index, accounts in enumerate(visible):
+        for account, props in accounts.items():
+            for prop in props:
+                eligible.setdefault((account, prop), []).append(index)
+
+    groups: Dict[Tuple[str, Tuple[int, ...]], List[str]] = {}
+    for (account, prop), indexes in eligible.items():
+        groups.setdefault((account, tuple(indexes)), []).append(prop)
+
+    shards: List[Shard] = [{} for _ in visible]
+    loads = [0] * len(visible)
+    target = len(eligible) / max(1, len(visible))
+
+    for (account, indexes), props in sorted(groups.items(), key=lambda item: (-len(item[1]), item[0])):
+        remaining = sorted(props)
+        while remaining:
+            index = min(indexes, key=lambda i: (loads[i], i))
+            room = math.ceil(target - loads[index])
+            # Every eligible credential is at its share already: no point splitting
+            taken, remaining = (remaining, []) if room <= 0 else (remaining[:room], remaining[room:])
+            shards[index].setdefault(account, set()).update(taken)
+            loads[index] += len(taken)
+
+    return shards
+
+
+def create_discovery(engine: str, credentials_path: str, **kwargs):
+    """Discovery engine for one credentials file ('sync' or 'async')"""
+    discovery_class = AsyncGA4PropertyDiscovery if engine == 'async' else GA4PropertyDiscovery
+    return discovery_class(credentials_path=credentials_path, **kwargs)
+
+
+def shard_journal_file(journal_file: str, index: int) -> str:
+    """Journal of one shard: ``.ga4-discovery-journal.jsonl`` -> ``.ga4-discovery-journal.1.jsonl``"""
+    root, ext = os.path.splitext(journal_file)
+    return f"{root}.{index}{ext}"
+
+
+def _list_shard_candidates(factory: Callable, credentials_path: str,
+                           scheduler_kwargs: Dict) -> Tuple[Dict[str, List[str]], Dict]:
+    """Worker: properties one credential can see, plus the metrics of the call"""
+    metrics = ApiMetrics()
+    scheduler = RequestScheduler(**scheduler_kwargs, metrics=metrics)
+    discovery = factory('sync', credentials_path, scheduler=scheduler)
+    return list_visible_properties(discovery.client, scheduler), metrics.methods
+
+
+def _send_chunk(records_queue, stop, chunk: List[PropertyRecord]):
+    """Queue a chunk of records for the parent, waiting while the queue is full"""
+    while not stop.is_set():
+        try:
+            records_queue.put(chunk, timeout=_POLL_INTERVAL)
+            return
+        except queue.Full:
+            continue
+    raise ShardAborted("the parent stopped reading records")
+
+
+def _discover_shard(factory: Callable, engine: str, credentials_path: str, shard: Shard,
+                    discovery_kwargs: Dict, scheduler_kwargs: Dict, journal_file: Optional[str],
+                    journal_params: Dict, resume: bool, records_queue, stop) -> Tuple[Dict, int, List[str]]:
+    """Worker: discover one shard, sending its records to ``records_queue`` in chunks
+
+    Returns the shard's metrics, resumed count and listing failures. Every
+    chunk is queued before the worker returns.
+    """
+    metrics = ApiMetrics()
+    scheduler = RequestScheduler(**scheduler_kwargs, metrics=metrics)
+    journal = RunJournal(journal_file, journal_params, resume=resume) if journal_file else None
+
+    discovery = factory(engine, credentials_path, scheduler=scheduler, journal=journal, shard=shard,
+                        **discovery_kwargs)
+    try:
+        chunk = []
+        for record in discovery.iter_properties():
+            chunk.append(record)
+            if len(chunk) >= RECORD_CHUNK_SIZE:
+                _send_chunk(records_queue, stop, chunk)
+                chunk = []
+        if chunk:
+            _send_chunk(records_queue, stop, chunk)
+    except BaseException:
+        if journal is not None:
+            journal.close()
+        raise
+
+    if journal is not None:
+        journal.finish()
+    return metrics.methods, discovery.resumed, discovery.listing_failures
+
+
+class ShardedDiscovery:
+    """Discover properties with several credentials, one worker process each
+
+    Has the same iter_properties / discover_all_properties interface as the
+    single-credential engines.
+    """
+
+    def __init__(self, credentials_paths: Sequence[str], engine: str = 'sync',
+                 discovery_kwargs: Optional[Dict] = None, scheduler_kwargs: Optional[Dict] = None,
+                 metrics: Optional[ApiMetrics] = None, journal_file: Optional[str] = None,
+                 resume: bool = False, factory: Callable = create_discovery,
+                 queue_chunks: int = DEFAULT_QUEUE_CHUNKS):
+        """
+        Args:
+            credentials_paths: Service account JSON files, one worker process each
+            engine: Discovery engine used in each worker, 'sync' or 'async'
+            discovery_kwargs: Extra engine arguments (workers/concurrency, strategy)
+            scheduler_kwargs: RequestScheduler arguments; each worker gets its own
+                scheduler, so qps applies per credential
+            metrics: Receives the merged request metrics of all workers
+            journal_file: Base journal path; shard i writes shard_journal_file(path, i)
+            resume: Resume each shard from its journal
+            factory: Creates an engine as factory(engine, credentials_path, **kwargs);
+                must be picklable (a module-level function)
+            queue_chunks: Chunks of RECORD_CHUNK_SIZE records in flight from
+                the workers before they wait for the parent to catch up
+        """
+        self.credentials_paths = list(credentials_paths)
+        self.engine = engine
+        self.discovery_kwargs = discovery_kwargs or {}
+        self.scheduler_kwargs = scheduler_kwargs or {}
+        self.metrics = metrics or ApiMetrics()
+        self.journal_file = journal_file
+        self.resume = resume
+        self.factory = factory
+        self.queue_chunks = max(1, queue_chunks)
+        self.resumed = 0
+        # Accounts (or credentials) that could not be listed, across all shards
+        self.listing_failures: List[str] = []
+
+    def discover_all_properties(self) -> List[PropertyRecord]:
+        return list(self.iter_properties())
+
+    def iter_properties(self) -> Iterator[PropertyRecord]:
+        """Yield the merged records as the shards send them"""
+        with multiprocessing.Manager() as manager, \
+                ProcessPoolExecutor(max_workers=len(self.credentials_paths)) as pool:
+            records_queue = manager.Queue(self.queue_chunks)
+            # Set when the parent stops reading, so blocked workers give up
+            stop = manager.Event()
+
+            visible = self._list_candidates(pool)
+            shards = assign_shards(visible)
+
+            total = sum(len(props) for shard in shards for props in shard.values())
+            print(f"\nSharding {total} properties across {len(shards)} credentials:")
+            for path, shard in zip(self.credentials_paths, shards):
+                print(f"  - {os.path.basename(path)}: {sum(len(props) for props in shard.values())} properties "
+                      f"in {len(shard)} accounts")
+            print()
+
+            futures = [
+                pool.submit(_discover_shard, self.factory, self.engine, path, shard,
+                            self.discovery_kwargs, self.scheduler_kwargs,
+                            shard_journal_file(self.journal_file, index) if self.journal_file else None,
+                            {'command': 'discovery', 'strategy': self.discovery_kwargs.get('strategy', 'accounts'),
+                             'credentials': os.path.abspath(path)},
+                            self.resume, records_queue, stop)
+                for index, (path, shard) in enumerate(zip(self.credentials_paths, shards))
+                if shard
+            ]
+
+            seen = set()
+            count = 0
+            try:
+                for chunk in self._chunks(records_queue, futures):
+                    for record in chunk:
+                        # A property is only ever assigned once; this guards
+                        # against overlapping shards all the same
+                        if record.property_id in seen:
+                            continue
+                        seen.add(record.property_id)
+                        count += 1
+                        yield record
+            finally:
+                stop.set()
+
+        print(f"\n✓ Total GA4 properties discovered across {len(self.credentials_paths)} credentials: {count}")
+
+    def _chunks(self, records_queue, futures: List[Future]) -> Iterator[List[PropertyRecord]]:
+        """Chunks from the workers until every shard has finished; raises a shard's error"""
+        pending = list(futures)
+        while pending:
+            try:
+                chunk = records_queue.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                for future in [future for future in pending if future.done()]:
+                    pending.remove(future)
+                    methods, resumed, listing_failures = future.result()
+                    self.metrics.merge(methods)
+                    self.resumed += resumed
+                    self.listing_failures.extend(listing_failures)
+                continue
+            yield chunk
+
+        # A worker queues all its chunks before it returns, so whatever is
+        # left now is complete
+        while True:
+            try:
+                chunk = records_queue.get_nowait()
+            except queue.Empty:
+                return
+            yield chunk
+
+    def _list_candidates(self, pool: ProcessPoolExecutor) -> List[Dict[str, List[str]]]:
+        futures = [pool.submit(_list_shard_candidates, self.factory, path, self.scheduler_kwargs)
+                   for path in self.credentials_paths]
+
+        visible = []
+        for path, future in zip(self.credentials_paths, futures):
+            try:
+                accounts, methods = future.result()
+                self.metrics.merge(methods)
+            except Exception as e:
+                print(f"  ⚠ Warning: {os.path.basename(path)} could not list account summaries: {e}")
+                # Properties only this credential sees are missing from the run
+                self.listing_failures.append(path)
+                accounts = {}
+            visible.append(accounts)
+
+        if not any(visible):
+            raise RuntimeError("None of the credentials could list any GA4 properties")
+        return visible
@@ -0,0 +1,545 @@
+"""
+SQL and CSV output for discovered properties
+
+Writers take one property at a time so files can be written while discovery
+runs; generate_sql_inserts and generate_csv wrap them for whole collections.
+When a domain shared by several properties is settled after discovery (see
+domains.DomainIndex), replace() writes the winner over the property that was
+written first.
+They work on PropertyRecord attributes directly; plain property dicts are
+converted on the way in.
+"""
+
+import os
+import csv
+from datetime import datetime
+from typing import Collection, Dict, Iterable, List, Optional, Set, Tuple
+
+from .records import PropertyRecord, as_record
+
+
+SQL_HEADER_LINES = [
+    "-- Auto-generated GA4 Properties",
+    "-- Generated: {generated}",
+    "",
+    "-- Clear existing data (optional - comment out if you want to keep existing)",
+    "-- DELETE FROM ga4_properties;",
+    "",
+    "-- Insert discovered properties",
+]
+
+CSV_FIELDNAMES = ['domain', 'property_id', 'display_name', 'category', 'currency_code', 'time_zone', 'is_active']
+
+
+SQL_INSERT_COLUMNS = "INSERT INTO ga4_properties (domain, property_id, description, category, is_active)"
+
+SQL_ON_CONFLICT = """ON CONFLICT (domain) DO UPDATE SET
+    property_id = EXCLUDED.property_id,
+    description = EXCLUDED.description,
+    category = EXCLUDED.category,
+    updated_at = NOW();"""
+
+# Output formats for the SQL file
+SQL_FORMATS = ('statements', 'multirow', 'copy', 'diff')
+
+# ga4_properties columns written for each property, in table order
+PROPERTY_ROW_COLUMNS = ('domain', 'property_id', 'description', 'category', 'is_active')
+
+# Rows per INSERT statement with --sql-format multirow
+SQL_MULTIROW_BATCH_SIZE = 500
+
+
+STAGING_COLUMNS = "row_number, domain, property_id, description, category, is_active"
+
+STAGING_TABLE_SQL = """CREATE TEMP TABLE ga4_properties_staging (
+    row_number INTEGER,
+    domain TEXT,
+    property_id TEXT,
+    description TEXT,
+    category TEXT,
+    is_active BOOLEAN
+) ON COMMIT DROP;"""
+
+# Later rows win when several properties share a domain
+STAGING_SELECT_SQL = """SELECT DISTINCT ON (domain) domain, property_id, description, category, is_active
+FROM ga4_properties_staging
+ORDER BY domain, row_number DESC"""
+
+
+def _sql_values(prop: PropertyRecord) -> str:
+    """Build the VALUES tuple for one property"""
+    # Escape single quotes in strings
+    display_name = prop.display_name.replace("'", "''")
+    domain = prop.domain.replace("'", "''")
+
+    return f"('{domain}', '{prop.property_id}', '{display_name}', '{prop.category}', true)"
+
+
+def _sql_literal(value) -> str:
+    """Quote a string or boolean for SQL"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def property_values(prop: PropertyRecord) -> Tuple:
+    """The ga4_properties column values for a property, in PROPERTY_ROW_COLUMNS order"""
+    return (prop.domain, prop.property_id, prop.display_name, prop.category, True)
+
+
+def property_row(prop: PropertyRecord) -> Dict:
+    """The ga4_properties row for a property, as a dict (e.g. a Supabase payload)"""
+    return dict(zip(PROPERTY_ROW_COLUMNS, property_values(prop)))
+
+
+def _sql_upsert_statement(prop: PropertyRecord) -> str:
+    """Build the upsert statement for one property"""
+    return f"""{SQL_INSERT_COLUMNS}
+VALUES {_sql_values(prop)}
+{SQL_ON_CONFLICT}"""
+
+
+def _copy_field(value: str) -> str:
+    """Escape a value for PostgreSQL COPY text format"""
+    return (value.replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def _csv_row(prop: PropertyRecord) -> Tuple:
+    """Build the CSV row for one property, in CSV_FIELDNAMES order"""
+    return (prop.domain, prop.property_id, prop.display_name, prop.category,
+            prop.currency_code, prop.time_zone, 'true')
+
+
+class SqlFileWriter:
+    """Write upsert statements to a file as properties arrive
+
+    Each statement is flushed immediately, so an interrupted run still leaves
+    every property discovered so far on disk. The total is written as a
+    trailing comment when the writer is closed.
+    """
+
+    def __init__(self, output_file: str):
+        self.output_file = output_file
+        self.count = 0
+        self.file = open(output_file, 'w')
+        self.file.write('\n'.join(SQL_HEADER_LINES).format(generated=datetime.now().isoformat()) + '\n')
+        self.file.flush()
+
+    def write(self, prop: PropertyRecord):
+        self.file.write(_sql_upsert_statement(as_record(prop)) + '\n\n')
+        self.file.flush()
+        self.count += 1
+
+    def replace(self, streamed: PropertyRecord, winner: PropertyRecord):
+        """Write ``winner`` in place of ``streamed``, written earlier for the same site
+
+        With the same domain the winner's upsert overwrites the row; otherwise
+        the row ``streamed`` wrote is deactivated first.
+        """
+        if streamed.domain != winner.domain:
+            self._deactivate(streamed)
+        self.write(winner)
+        self.count -= 1
+
+    def _deactivate(self, prop: PropertyRecord):
+        self.file.write(f"UPDATE ga4_properties SET is_active = false, updated_at = NOW()\n"
+                        f"WHERE domain = {_sql_literal(prop.domain)} "
+                        f"AND property_id = {_sql_literal(prop.property_id)};\n\n")
+        self.file.flush()
+
+    def close(self, complete: bool = True):
+        if complete:
+            self.file.write(f"-- Total properties: {self.count}\n")
+        else:
+            self.file.write(f"-- INCOMPLETE: discovery stopped after {self.count} properties\n")
+        self.file.close()
+        print(f"✓ SQL saved to: {self.output_file}")
+
+
+class MultiRowSqlFileWriter(SqlFileWriter):
+    """Write one multi-row upsert statement per ``batch_size`` properties
+
+    Postgres plans and executes a handful of statements instead of one per
+    property. A single INSERT cannot touch the same conflict key twice, so
+    within a batch the last property for a domain wins (as it would with
+    one statement per property).
+    """
+
+    def __init__(self, output_file: str, batch_size: int = SQL_MULTIROW_BATCH_SIZE):
+        super().__init__(output_file)
+        self.batch_size = max(1, batch_size)
+        self.batch: Dict[str, PropertyRecord] = {}
+
+    def write(self, prop: PropertyRecord):
+        prop = as_record(prop)
+        self.batch.pop(prop.domain, None)
+        self.batch[prop.domain] = prop
+        self.count += 1
+        if len(self.batch) >= self.batch_size:
+            self._flush_batch()
+
+    def _deactivate(self, prop: PropertyRecord):
+        # Still in the pending batch: just leave it out
+        pending = self.batch.get(prop.domain)
+        if pending is not None and pending.property_id == prop.property_id:
+            del self.batch[prop.domain]
+            return
+        self._flush_batch()
+        super()._deactivate(prop)
+
+    def _flush_batch(self):
+        if not self.batch:
+            return
+
+        values = ',\n'.join(f"    {_sql_values(prop)}" for prop in self.batch.values())
+        self.file.write(f"{SQL_INSERT_COLUMNS}\nVALUES\n{values}\n{SQL_ON_CONFLICT}\n\n")
+        self.file.flush()
+        self.batch = {}
+
+    def close(self, complete: bool = True):
+        self._flush_batch()
+        super().close(complete)
+
+
+class CopyFileWriter:
+    """Write a COPY-format TSV data file plus a staging-table merge script
+
+    The TSV is streamed row by row. The script loads it into a temporary
+    staging table with psql's \\copy and merges it into ga4_properties with
+    one INSERT ... SELECT, keeping the last row for each domain. Properties
+    that lost their domain to a later one are deleted from the staging table
+    before the merge.
+    """
+
+    def __init__(self, output_file: str):
+        self.output_file = output_file
+        self.data_file = os.path.splitext(output_file)[0] + '.tsv'
+        self.count = 0
+        self.row_number = 0
+        self.superseded: List[str] = []
+        self.file = open(self.data_file, 'w', encoding='utf-8', newline='\n')
+
+    def write(self, prop: PropertyRecord):
+        prop = as_record(prop)
+        self.count += 1
+        self.row_number += 1
+        fields = [str(self.row_number), prop.domain, prop.property_id, prop.display_name, prop.category, 't']
+        self.file.write('\t'.join(_copy_field(field) for field in fields) + '\n')
+        self.file.flush()
+
+    def replace(self, streamed: PropertyRecord, winner: PropertyRecord):
+        """Write ``winner`` in place of ``streamed``, written earlier for the same site"""
+        self.superseded.append(streamed.property_id)
+        self.write(winner)
+        self.count -= 1
+
+    def close(self, complete: bool = True):
+        self.file.close()
+
+        # psql resolves \copy paths against its working directory
+        data_file = os.path.basename(self.data_file).replace("'", "''")
+        status = (f"-- Total properties: {self.count}" if complete
+                  else f"-- INCOMPLETE: discovery stopped after {self.count} properties")
+        superseded = ''
+        if self.superseded:
+            property_ids = ', '.join(_sql_literal(property_id) for property_id in self.superseded)
+            superseded = (f"\n-- Properties that lost their domain to one discovered later\n"
+                          f"DELETE FROM ga4_properties_staging WHERE property_id IN ({property_ids});\n")
+
+        with open(self.output_file, 'w') as f:
+            f.write(f"""-- Auto-generated GA4 Properties (COPY format)
+-- Generated: {datetime.now().isoformat()}
+-- Data file: {data_file}
+{status}
+--
+-- Run with psql from the directory that contains the data file:
+--   psql "$DATABASE_URL" -f {os.path.basename(self.output_file)}
+
+BEGIN;
+
+{STAGING_TABLE_SQL}
+
+\\copy ga4_properties_staging ({STAGING_COLUMNS}) FROM '{data_file}'
+{superseded}
+-- Later rows win when several properties share a domain
+{SQL_INSERT_COLUMNS}
+{STAGING_SELECT_SQL}
+{SQL_ON_CONFLICT}
+
+COMMIT;
+""")
+
+        print(f"✓ COPY data saved to: {self.data_file}")
+        print(f"✓ SQL saved to: {self.output_file}")
+
+
+class DiffSqlFileWriter:
+    """Write only the statements needed to bring ga4_properties up to date
+
+    ``existing`` holds the table's current rows keyed by domain (see
+    loaders.fetch_current_properties). Discovered properties are compared
+    with them when the writer is closed:
+
+    - new domains become multi-row INSERTs
+    - changed rows become one UPDATE each, setting only the changed columns
+    - active rows whose domain was not discovered are deactivated
+
+    Unchanged rows produce no SQL at all, so updated_at only moves for rows
+    that really changed. As with the other formats, the last property for a
+    domain wins.
+
+    ``listing_failures`` is the discovery's live list of accounts it could
+    not list; it is read at close, and if any are recorded the run is missing
+    their properties, so nothing is deactivated.
+    """
+
+    def __init__(self, output_file: str, existing: Dict[str, Dict], deactivate_missing: bool = True,
+                 batch_size: int = SQL_MULTIROW_BATCH_SIZE, listing_failures: Optional[Collection[str]] = None):
+        self.output_file = output_file
+        self.existing = existing
+        self.deactivate_missing = deactivate_missing
+        self.listing_failures = listing_failures if listing_failures is not None else ()
+        self.batch_size = max(1, batch_size)
+        self.rows: Dict[str, PropertyRecord] = {}
+        self.count = 0
+        self.stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deactivated': 0}
+
+    def write(self, prop: PropertyRecord):
+        prop = as_record(prop)
+        self.rows.pop(prop.domain, None)
+        self.rows[prop.domain] = prop
+        self.count += 1
+
+    def replace(self, streamed: PropertyRecord, winner: PropertyRecord):
+        """Compare ``winner`` instead of ``streamed``, written earlier for the same site"""
+        current = self.rows.get(streamed.domain)
+        if current is not None and current.property_id == streamed.property_id:
+            del self.rows[streamed.domain]
+        self.write(winner)
+        self.count -= 1
+
+    def diff(self, complete: bool = True) -> Dict[str, list]:
+        """Split discovered rows into inserts, per-row column updates and deactivations
+
+        Deactivations need the full discovery result, so they are left out
+        when ``complete`` is False or an account could not be listed.
+        """
+        inserts, updates = [], []
+        for domain, prop in self.rows.items():
+            values = property_values(prop)
+            current = self.existing.get(domain)
+            if current is None:
+                inserts.append(values)
+                continue
+
+            changes = {col: value for col, value in zip(PROPERTY_ROW_COLUMNS, values) if current.get(col) != value}
+            if changes:
+                updates.append((domain, changes))
+
+        deactivations = []
+        if complete and self.deactivate_missing and not self.listing_failures:
+            deactivations = sorted(domain for domain, current in self.existing.items()
+                                   if current.get('is_active') and domain not in self.rows)
+
+        return {'inserts': inserts, 'updates': updates, 'deactivations': deactivations}
+
+    def _statements(self, diff: Dict[str, list]) -> Iterable[str]:
+        columns = ', '.join(PROPERTY_ROW_COLUMNS)
+        inserts = diff['inserts']
+        for start in range(0, len(inserts), self.batch_size):
+            values = ',\n'.join(
+                "    (" + ', '.join(_sql_literal(value) for value in row) + ")"
+                for row in inserts[start:start + self.batch_size]
+            )
+            # DO NOTHING keeps a re-run of the same file from failing or
+            # overwriting a row added since the table was read
+            yield f"INSERT INTO ga4_properties ({columns})\nVALUES\n{values}\nON CONFLICT (domain) DO NOTHING;"
+
+        for domain, changes in diff['updates']:
+            assignments = ', '.join(f"{col} = {_sql_literal(value)}" for col, value in changes.items())
+            yield (f"UPDATE ga4_properties SET {assignments}, updated_at = NOW()\n"
+                   f"WHERE domain = {_sql_literal(domain)};")
+
+        deactivations = diff['deactivations']
+        for start in range(0, len(deactivations), self.batch_size):
+            domains = ',\n'.join(f"    {_sql_literal(domain)}"
+                                  for domain in deactivations[start:start + self.batch_size])
+            yield (f"UPDATE ga4_properties SET is_active = false, updated_at = NOW()\n"
+                   f"WHERE is_active AND domain IN (\n{domains}\n);")
+
+    def close(self, complete: bool = True):
+        diff = self.diff(complete)
+        self.stats = {
+            'inserted': len(diff['inserts']),
+            'updated': len(diff['updates']),
+            'unchanged': len(self.rows) - len(diff['inserts']) - len(diff['updates']),
+            'deactivated': len(diff['deactivations']),
+        }
+
+        if not complete:
+            status = f"-- INCOMPLETE: discovery stopped after {self.count} properties (no deactivations)"
+        elif self.listing_failures:
+            status = (f"-- INCOMPLETE: {len(self.listing_failures)} accounts could not be listed; "
+                      f"{self.count} properties (no deactivations)")
+        else:
+            status = f"-- Total properties: {self.count}"
+
+        with open(self.output_file, 'w') as f:
+            f.write(f"""-- Auto-generated GA4 Properties (changes only)
+-- Generated: {datetime.now().isoformat()}
+-- Compared with {len(self.existing)} existing ga4_properties rows
+{status}
+-- Inserted: {self.stats['inserted']}, updated: {self.stats['updated']}, unchanged: {self.stats['unchanged']}, deactivated: {self.stats['deactivated']}
+
+BEGIN;
+
+""")
+            for statement in self._statements(diff):
+                f.write(statement + '\n\n')
+            f.write("COMMIT;\n")
+
+        print(f"✓ SQL saved to: {self.output_file} ({self.stats['inserted']} inserts, "
+              f"{self.stats['updated']} updates, {self.stats['deactivated']} deactivations, "
+              f"{self.stats['unchanged']} unchanged)")
+
+
+def create_sql_writer(output_file: str, sql_format: str = 'statements',
+                      batch_size: int = SQL_MULTIROW_BATCH_SIZE,
+                      existing: Optional[Dict[str, Dict]] = None, deactivate_missing: bool = True,
+                      listing_failures: Optional[Collection[str]] = None):
+    """Create the streaming writer for an SQL output format
+
+    The 'diff' format needs ``existing``, the current ga4_properties rows keyed
+    by domain, and skips deactivations if ``listing_failures`` is non-empty
+    when it is closed.
+    """
+    if sql_format == 'multirow':
+        return MultiRowSqlFileWriter(output_file, batch_size)
+    if sql_format == 'copy':
+        return CopyFileWriter(output_file)
+    if sql_format == 'diff':
+        if existing is None:
+            raise ValueError("SQL format 'diff' requires the existing ga4_properties rows")
+        return DiffSqlFileWriter(output_file, existing, deactivate_missing, batch_size, listing_failures)
+    if sql_format == 'statements':
+        return SqlFileWriter(output_file)
+    raise ValueError(f"Unknown SQL format: {sql_format}")
+
+
+class CsvFileWriter:
+    """Write CSV rows to a file as properties arrive, flushing each row
+
+    Rows of properties replaced by a later domain winner are dropped when the
+    writer is closed, by rewriting the file once.
+    """
+
+    def __init__(self, output_file: str):
+        self.output_file = output_file
+        self.count = 0
+        self.superseded: Set[str] = set()
+        self.file = open(output_file, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(CSV_FIELDNAMES)
+        self.file.flush()
+
+    def write(self, prop: PropertyRecord):
+        self.writer.writerow(_csv_row(as_record(prop)))
+        self.file.flush()
+        self.count += 1
+
+    def replace(self, streamed: PropertyRecord, winner: PropertyRecord):
+        """Write ``winner`` in place of ``streamed``, written earlier for the same site"""
+        self.superseded.add(streamed.property_id)
+        self.write(winner)
+        self.count -= 1
+
+    def _drop_superseded(self):
+        temp_file = self.output_file + '.tmp'
+        with open(self.output_file, newline='') as source, open(temp_file, 'w', newline='') as target:
+            writer = csv.writer(target)
+            for row in csv.reader(source):
+                if row[1] not in self.superseded:
+                    writer.writerow(row)
+        os.replace(temp_file, self.output_file)
+
+    def close(self, complete: bool = True):
+        self.file.close()
+        if self.superseded:
+            self._drop_superseded()
+        status = "" if complete else f" (incomplete, {self.count} rows)"
+        print(f"✓ CSV saved to: {self.output_file}{status}")
+
+
+def generate_sql_inserts(properties: Iterable[PropertyRecord], output_file: str = None,
+                         sql_format: str = 'statements',
+                         batch_size: int = SQL_MULTIROW_BATCH_SIZE,
+                         existing: Optional[Dict[str, Dict]] = None) -> str:
+    """Generate SQL INSERT statements for discovered properties
+
+    Args:
+        properties: PropertyRecords (or property dicts); any iterable, including the
+            generator returned by GA4PropertyDiscovery.iter_properties()
+        output_file: Optional file path to save SQL
+        sql_format: 'statements' (one upsert per property), 'multirow'
+            (one upsert per batch_size properties), 'copy' (TSV data file
+            plus staging merge script) or 'diff' (only the inserts, updates and
+            deactivations that differ from ``existing``); formats other than
+            'statements' require output_file
+        batch_size: Rows per statement for the 'multirow' and 'diff' formats
+        existing: Current ga4_properties rows keyed by domain, for 'diff'
+
+    Returns:
+        SQL INSERT statements as string, or the file path when output_file is
+        given (statements are streamed to the file instead of kept in memory)
+    """
+    if output_file:
+        writer = create_sql_writer(output_file, sql_format, batch_size, existing)
+        complete = False
+        try:
+            for prop in properties:
+                writer.write(prop)
+            complete = True
+        finally:
+            writer.close(complete)
+        return output_file
+
+    if sql_format != 'statements':
+        raise ValueError(f"SQL format '{sql_format}' requires an output_file")
+
+    properties = list(properties)
+    sql_lines = [line.format(generated=datetime.now().isoformat()) for line in SQL_HEADER_LINES]
+    sql_lines.insert(2, f"-- Total properties: {len(properties)}")
+
+    for prop in properties:
+        sql_lines.append(_sql_upsert_statement(as_record(prop)))
+        sql_lines.append("")
+
+    return '\n'.join(sql_lines)
+
+
+def generate_csv(properties: Iterable[PropertyRecord], output_file: str = None) -> str:
+    """Generate CSV file of discovered properties
+
+    Args:
+        properties: PropertyRecords (or property dicts); any iterable, including the
+            generator returned by GA4PropertyDiscovery.iter_properties()
+        output_file: Optional file path to save CSV
+
+    Returns:
+        The CSV file path
+    """
+    if not output_file:
+        return output_file
+
+    writer = CsvFileWriter(output_file)
+    complete = False
+    try:
+        for prop in properties:
+            writer.write(prop)
+        complete = True
+    finally:
+        writer.close(complete)
+
+    return output_file
+
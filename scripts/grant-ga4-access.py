@@ -2,18 +2,26 @@
 """
 Script to automatically grant Viewer access to service account for all GA4 properties
 This solves the "no data" problem by giving the service account permission to read analytics data
+
+Usage:
+    python grant-ga4-access.py                      # one property at a time
+    python grant-ga4-access.py --batch --workers 16 # plan, then batch-apply concurrently
+    python grant-ga4-access.py --plan-only          # show missing bindings, change nothing
+    python grant-ga4-access.py --batch --resume     # continue an interrupted run
+    python grant-ga4-access.py --credentials a.json --credentials b.json  # shard across service accounts
 """
 
+import argparse
 import json
 import os
 import sys
-from google.analytics.admin_v1alpha import AnalyticsAdminServiceClient
-from google.analytics.admin_v1alpha.types import (
-    AccessBinding,
-    GetPropertyRequest,
-    CreateAccessBindingRequest
-)
-from google.oauth2 import service_account
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from types import SimpleNamespace
+
+from ga4_discovery.journal import RunJournal
+from ga4_discovery.metrics import ApiMetrics, write_metrics
+from ga4_discovery.scheduler import RequestScheduler
+from ga4_discovery.sharding import assign_shards, list_visible_properties, shard_journal_file
 
 # Service account email that needs access
 SERVICE_ACCOUNT_EMAIL = 'gtm-tool-386203@appspot.gserviceaccount.com'
@@ -21,38 +29,86 @@ SERVICE_ACCOUNT_EMAIL = 'gtm-tool-386203@appspot.gserviceaccount.com'
 # Role to grant (predefined Viewer role)
 VIEWER_ROLE = 'predefinedRoles/viewer'
 
-def grant_access_to_all_properties(credentials_path):
-    """Grant Viewer access to service account for all GA4 properties"""
+# Default credentials file, next to this script
+DEFAULT_CREDENTIALS_PATH = os.path.join(os.path.dirname(__file__), 'gtm-tool-386203-c8dc903f3c2d.json')
+
+# Journal of accounts and properties already handled, read back by --resume
+DEFAULT_JOURNAL_FILE = '.ga4-grant-journal.jsonl'
 
-    print("=" * 70)
-    print("GA4 ACCESS GRANTING SCRIPT")
-    print("=" * 70)
-    print(f"\nService Account: {SERVICE_ACCOUNT_EMAIL}")
-    print(f"Role: Viewer (Read-only access)")
-    print(f"Credentials: {credentials_path}\n")
 
-    # Load credentials
+def _import_admin_api() -> SimpleNamespace:
+    """Import the Admin API client, request types and credentials modules on first use"""
     try:
+        from google.analytics.admin_v1alpha import AnalyticsAdminServiceClient
+        from google.analytics.admin_v1alpha import types
+        from google.oauth2 import service_account
+    except ImportError as e:
+        raise ImportError("Missing required packages. Install with: "
+                          "pip install google-analytics-admin google-auth") from e
+
+    return SimpleNamespace(
+        AnalyticsAdminServiceClient=AnalyticsAdminServiceClient,
+        types=types,
+        service_account=service_account,
+    )
+
+
+def load_client(credentials_path):
+    """Create an Admin API client from a service account file, or None on failure"""
+    try:
+        admin_api = _import_admin_api()
         with open(credentials_path, 'r', encoding='utf-8') as f:
             creds_info = json.load(f)
-        credentials = service_account.Credentials.from_service_account_info(creds_info)
+        credentials = admin_api.service_account.Credentials.from_service_account_info(creds_info)
     except Exception as e:
         print(f"ERROR loading credentials: {e}")
-        return
+        return None
 
-    # Initialize client
     try:
-        client = AnalyticsAdminServiceClient(credentials=credentials)
+        client = admin_api.AnalyticsAdminServiceClient(credentials=credentials)
         print("[OK] Connected to Google Analytics Admin API\n")
+        return client
     except Exception as e:
         print(f"ERROR connecting to API: {e}")
+        return None
+
+
+def _bound_emails(bindings):
+    """Emails that have a user binding among ``bindings``"""
+    # Bindings are created as "user:<email>" here, but the API reports plain emails
+    return {binding.user[len('user:'):] if binding.user.startswith('user:') else binding.user
+            for binding in bindings if binding.user}
+
+
+def grant_access_to_all_properties(credentials_path, scheduler=None, journal=None):
+    """Grant Viewer access to service account for all GA4 properties
+
+    Every Admin API call goes through ``scheduler`` (rate limit + retry on
+    transient errors); a default RequestScheduler is used if none is given.
+    Accounts and properties already in ``journal`` are skipped, and each one
+    finished here is added to it.
+
+    Returns:
+        True if every account was processed
+    """
+    scheduler = scheduler or RequestScheduler()
+
+    print("=" * 70)
+    print("GA4 ACCESS GRANTING SCRIPT")
+    print("=" * 70)
+    print(f"\nService Account: {SERVICE_ACCOUNT_EMAIL}")
+    print(f"Role: Viewer (Read-only access)")
+    print(f"Credentials: {credentials_path}\n")
+
+    client = load_client(credentials_path)
+    if client is None:
         return
+    admin_types = _import_admin_api().types
 
     # Get all accounts
     print("Fetching accounts...")
     try:
-        accounts_response = client.list_accounts()
-        accounts = list(accounts_response)
+        accounts = scheduler.list('list_accounts', client.list_accounts)
         print(f"[OK] Found {len(accounts)} accounts\n")
     except Exception as e:
         print(f"ERROR fetching accounts: {e}")
@@ -69,15 +125,18 @@ def grant_access_to_all_properties(credentials_path):
         print(f"\n[{account_idx}/{len(accounts)}] Processing account: {account_name}")
         print("-" * 70)
 
+        if journal is not None and journal.done('account', account.name):
+            print("  [SKIP] Done in a previous run")
+            continue
+        account_errors = error_count
+
         # Get properties for this account
         try:
-            from google.analytics.admin_v1alpha.types import ListPropertiesRequest
-            request = ListPropertiesRequest(
+            request = admin_types.ListPropertiesRequest(
                 filter=f"parent:{account.name}",
                 show_deleted=False
             )
-            properties_response = client.list_properties(request=request)
-            properties = list(properties_response)
+            properties = scheduler.list('list_properties', client.list_properties, request=request)
 
             print(f"  Found {len(properties)} properties")
 
@@ -88,11 +147,17 @@ def grant_access_to_all_properties(credentials_path):
 
                 print(f"  [{total_properties}] {prop_name} (ID: {property_id})", end=" ... ")
 
+                if journal is not None and journal.done('property', prop.name):
+                    print("[SKIP] Done in a previous run")
+                    already_has_access_count += 1
+                    continue
+
                 try:
                     # Check if access already exists
                     try:
-                        access_bindings = client.list_access_bindings(parent=prop.name)
-                        existing_bindings = list(access_bindings)
+                        existing_bindings = scheduler.list(
+                            'list_access_bindings', client.list_access_bindings, parent=prop.name
+                        )
 
                         # Check if service account already has access
                         already_has_access = any(
@@ -103,31 +168,35 @@ def grant_access_to_all_properties(credentials_path):
                         if already_has_access:
                             print("[SKIP] Already has access")
                             already_has_access_count += 1
+                            _journal_property(journal, prop.name, 'already_has_access')
                             continue
                     except Exception as check_error:
                         # If we can't check, try to add anyway
                         pass
 
                     # Create access binding
-                    access_binding = AccessBinding(
+                    access_binding = admin_types.AccessBinding(
                         user=f"user:{SERVICE_ACCOUNT_EMAIL}",
                         roles=[VIEWER_ROLE]
                     )
 
-                    request = CreateAccessBindingRequest(
+                    request = admin_types.CreateAccessBindingRequest(
                         parent=prop.name,
                         access_binding=access_binding
                     )
 
-                    result = client.create_access_binding(request=request)
+                    result = scheduler.call('create_access_binding', client.create_access_binding,
+                                            request=request)
                     print("[OK] Access granted!")
                     granted_count += 1
+                    _journal_property(journal, prop.name, 'granted')
 
                 except Exception as grant_error:
                     error_msg = str(grant_error)
                     if "ALREADY_EXISTS" in error_msg or "already exists" in error_msg.lower():
                         print("[SKIP] Already has access")
                         already_has_access_count += 1
+                        _journal_property(journal, prop.name, 'already_has_access')
                     elif "PERMISSION_DENIED" in error_msg:
                         print("[ERROR] Permission denied - you may not be admin")
                         error_count += 1
@@ -139,6 +208,10 @@ def grant_access_to_all_properties(credentials_path):
             print(f"  ERROR processing account: {e}")
             continue
 
+        # Accounts with failed properties are retried on --resume
+        if journal is not None and error_count == account_errors:
+            journal.record('account', account.name)
+
     # Summary
     print("\n" + "=" * 70)
     print("SUMMARY")
@@ -149,6 +222,8 @@ def grant_access_to_all_properties(credentials_path):
     print(f"Errors:                      {error_count}")
     print("=" * 70)
 
+    scheduler.print_summary()
+
     if granted_count > 0:
         print(f"\n[SUCCESS] Granted access to {granted_count} properties!")
         print("\nNext steps:")
@@ -161,11 +236,418 @@ def grant_access_to_all_properties(credentials_path):
     else:
         print("\n[WARNING] No access was granted. Check errors above.")
 
+    return True
+
+
+def _journal_property(journal, property_name, outcome):
+    if journal is not None:
+        journal.record('property', property_name, outcome)
+
+
+def plan_access_grants(client, emails, scheduler, workers=1, journal=None, shard=None, admin_types=None):
+    """Compute the access bindings missing for each GA4 property
+
+    Properties are listed per account; an account where every email is
+    already bound (access is inherited by its properties) is skipped
+    entirely. The remaining properties' bindings are listed concurrently.
+
+    Args:
+        client: AnalyticsAdminServiceClient
+        emails: Emails that should have Viewer access
+        scheduler: RequestScheduler shared by all calls
+        workers: Threads used to list property bindings
+        journal: Accounts and properties in it are not checked again; ones
+            found to need nothing are added
+        shard: Only plan these properties ({account name: property names}),
+            when several credentials split the run
+        admin_types: Module with the Admin API request types
+            (google.analytics.admin_v1alpha.types when None)
+
+    Returns:
+        List of dicts with property, display_name, account and missing emails,
+        only for properties that need at least one new binding
+    """
+    emails = list(dict.fromkeys(emails))
+    admin_types = admin_types or _import_admin_api().types
+    accounts = scheduler.list('list_accounts', client.list_accounts)
+    print(f"[OK] Found {len(accounts)} accounts\n")
+
+    candidates = []
+    resumed = 0
+    for account in accounts:
+        if shard is not None and account.name not in shard:
+            continue
+        if journal is not None and journal.done('account', account.name):
+            print(f"  [SKIP] {account.display_name}: done in a previous run")
+            continue
+
+        try:
+            account_bound = _bound_emails(scheduler.list(
+                'list_access_bindings', client.list_access_bindings, parent=account.name
+            ))
+        except Exception:
+            # Listing account bindings needs account-level admin; check properties instead
+            account_bound = set()
+
+        if all(email in account_bound for email in emails):
+            print(f"  [SKIP] {account.display_name}: access granted at account level")
+            if journal is not None:
+                journal.record('account', account.name)
+            continue
+
+        try:
+            request = admin_types.ListPropertiesRequest(filter=f"parent:{account.name}", show_deleted=False)
+            properties = scheduler.list('list_properties', client.list_properties, request=request)
+        except Exception as e:
+            print(f"  ERROR listing properties for {account.display_name}: {e}")
+            continue
+
+        if shard is not None:
+            properties = [prop for prop in properties if prop.name in shard[account.name]]
+
+        print(f"  {account.display_name}: {len(properties)} properties")
+        for prop in properties:
+            if journal is not None and journal.done('property', prop.name):
+                resumed += 1
+                continue
+            candidates.append((account, prop))
+
+    if resumed:
+        print(f"  [SKIP] {resumed} properties done in a previous run")
+
+    def missing_for(item):
+        account, prop = item
+        try:
+            bound = _bound_emails(scheduler.list(
+                'list_access_bindings', client.list_access_bindings, parent=prop.name
+            ))
+        except Exception:
+            # If we can't check, plan to add anyway
+            bound = set()
+
+        property_missing = [email for email in emails if email not in bound]
+        if not property_missing:
+            _journal_property(journal, prop.name, 'already_has_access')
+        return property_missing
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        missing = list(executor.map(missing_for, candidates))
+
+    return [
+        {
+            'property': prop.name,
+            'display_name': prop.display_name,
+            'account': account.display_name,
+            'missing': property_missing,
+        }
+        for (account, prop), property_missing in zip(candidates, missing)
+        if property_missing
+    ]
+
+
+def _already_exists(error):
+    error_msg = str(error)
+    return "ALREADY_EXISTS" in error_msg or "already exists" in error_msg.lower()
+
+
+def apply_access_grants(client, plan, scheduler, workers=1, journal=None, admin_types=None):
+    """Create the planned bindings, one batch request per property
+
+    Properties are processed concurrently on ``workers`` threads; each one
+    granted is added to ``journal``. ``admin_types`` is the module with the
+    Admin API request types (google.analytics.admin_v1alpha.types when None).
+
+    A batch is all-or-nothing, so when one of its emails turns out to be bound
+    already (the plan could not list the property's bindings, or someone else
+    granted it meanwhile), the bindings are listed again and only the emails
+    still missing are sent.
+
+    Returns:
+        Dict with granted, already_has_access and errors counts
+    """
+    admin_types = admin_types or _import_admin_api().types
+
+    def create(property_name, emails):
+        request = admin_types.BatchCreateAccessBindingsRequest(
+            parent=property_name,
+            requests=[
+                admin_types.CreateAccessBindingRequest(
+                    parent=property_name,
+                    access_binding=admin_types.AccessBinding(user=f"user:{email}", roles=[VIEWER_ROLE])
+                )
+                for email in emails
+            ]
+        )
+        scheduler.call('batch_create_access_bindings', client.batch_create_access_bindings, request=request)
+
+    def apply(entry):
+        missing = entry['missing']
+        try:
+            try:
+                create(entry['property'], missing)
+            except Exception as grant_error:
+                if not _already_exists(grant_error):
+                    raise
+                bound = _bound_emails(scheduler.list(
+                    'list_access_bindings', client.list_access_bindings, parent=entry['property']
+                ))
+                missing = [email for email in missing if email not in bound]
+                if not missing:
+                    _journal_property(journal, entry['property'], 'already_has_access')
+                    return 'already_has_access', 1, "[SKIP] Already has access"
+                create(entry['property'], missing)
+            _journal_property(journal, entry['property'], 'granted')
+            if len(missing) < len(entry['missing']):
+                return 'granted', len(missing), f"[OK] Access granted to {', '.join(missing)}; the rest had it"
+            return 'granted', len(missing), "[OK] Access granted!"
+        except Exception as grant_error:
+            error_msg = str(grant_error)
+            if _already_exists(grant_error):
+                # Bound again between the re-listing and the retry; left for --resume
+                return 'errors', 1, "[ERROR] Bindings changed while granting"
+            elif "PERMISSION_DENIED" in error_msg:
+                return 'errors', 1, "[ERROR] Permission denied - you may not be admin"
+            return 'errors', 1, f"[ERROR] {error_msg[:50]}"
+
+    counts = {'granted': 0, 'already_has_access': 0, 'errors': 0}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for entry, (outcome, count, message) in zip(plan, executor.map(apply, plan)):
+            counts[outcome] += count
+            print(f"  {entry['display_name']} ({entry['property'].split('/')[-1]}) ... {message}")
+
+    return counts
+
+
+def grant_access_batched(credentials_path, emails, workers=8, plan_only=False, scheduler=None,
+                         journal=None):
+    """Plan missing Viewer bindings for all properties, then apply them in batches
+
+    Returns:
+        True if planning (and applying, unless plan_only) ran to the end
+    """
+    scheduler = scheduler or RequestScheduler()
+
+    print("=" * 70)
+    print("GA4 ACCESS GRANTING SCRIPT (batch mode)")
+    print("=" * 70)
+    print(f"\nService Accounts: {', '.join(emails)}")
+    print("Role: Viewer (Read-only access)")
+    print(f"Credentials: {credentials_path}\n")
+
+    client = load_client(credentials_path)
+    if client is None:
+        return
+
+    print("Planning...")
+    try:
+        plan = plan_access_grants(client, emails, scheduler, workers, journal)
+    except Exception as e:
+        print(f"ERROR fetching accounts: {e}")
+        return
+
+    missing_total = sum(len(entry['missing']) for entry in plan)
+    print(f"\n[OK] {len(plan)} properties need {missing_total} new bindings")
+    for entry in plan:
+        print(f"  + {entry['display_name']} ({entry['property']}): {', '.join(entry['missing'])}")
+
+    if plan_only or not plan:
+        scheduler.print_summary()
+        return True
+
+    print("\nApplying...")
+    counts = apply_access_grants(client, plan, scheduler, workers, journal)
+
+    print("\n" + "=" * 70)
+    print("SUMMARY")
+    print("=" * 70)
+    print(f"Properties planned:          {len(plan)}")
+    print(f"Bindings granted:            {counts['granted']}")
+    print(f"Already had access:          {counts['already_has_access']}")
+    print(f"Errors:                      {counts['errors']}")
+    print("=" * 70)
+
+    scheduler.print_summary()
+    return True
+
+
+def _list_grant_candidates(credentials_path):
+    """Worker: GA4 properties one credential can see, plus the metrics of the call"""
+    metrics = ApiMetrics()
+    scheduler = RequestScheduler(metrics=metrics)
+    client = load_client(credentials_path)
+    if client is None:
+        return {}, metrics.methods
+    return list_visible_properties(client, scheduler), metrics.methods
+
+
+def _grant_shard(credentials_path, emails, shard, workers, plan_only, journal_file, journal_params, resume):
+    """Worker: plan and apply the grants of one shard with its own client, scheduler and journal
+
+    Returns:
+        (completed, properties planned, counts, metrics by method)
+    """
+    metrics = ApiMetrics()
+    scheduler = RequestScheduler(metrics=metrics)
+    journal = RunJournal(journal_file, journal_params, resume=resume)
+    counts = {'granted': 0, 'already_has_access': 0, 'errors': 0}
+    completed = False
+    planned = 0
+
+    try:
+        client = load_client(credentials_path)
+        if client is not None:
+            plan = plan_access_grants(client, emails, scheduler, workers, journal, shard=shard)
+            planned = len(plan)
+            for entry in plan:
+                print(f"  + {entry['display_name']} ({entry['property']}): {', '.join(entry['missing'])}")
+            if not plan_only and plan:
+                counts = apply_access_grants(client, plan, scheduler, workers, journal)
+            completed = True
+    except Exception as e:
+        print(f"ERROR in shard for {credentials_path}: {e}")
+    finally:
+        if completed:
+            journal.finish()
+        else:
+            journal.close()
+
+    return completed, planned, counts, metrics.methods
+
+
+def grant_access_sharded(credentials_paths, emails, workers=8, plan_only=False, metrics=None,
+                         journal_file=DEFAULT_JOURNAL_FILE, resume=False):
+    """Batch mode split across several service accounts, one process each
+
+    Each credential lists the properties it can see; every property is then
+    assigned to exactly one of them (see ga4_discovery.sharding), and each
+    credential plans and applies its shard under its own API quota. Shard i
+    journals to ``<journal-file stem>.<i>.jsonl``.
+
+    Returns:
+        True if every shard ran to the end
+    """
+    metrics = metrics or ApiMetrics()
+
+    print("=" * 70)
+    print("GA4 ACCESS GRANTING SCRIPT (batch mode, sharded)")
+    print("=" * 70)
+    print(f"\nService Accounts: {', '.join(emails)}")
+    print("Role: Viewer (Read-only access)")
+    print(f"Credentials: {', '.join(credentials_paths)}\n")
+
+    with ProcessPoolExecutor(max_workers=len(credentials_paths)) as pool:
+        visible = []
+        for path, (accounts, methods) in zip(credentials_paths,
+                                             pool.map(_list_grant_candidates, credentials_paths)):
+            metrics.merge(methods)
+            if not accounts:
+                print(f"  [WARN] {path}: no GA4 properties visible")
+            visible.append(accounts)
+
+        if not any(visible):
+            print("ERROR: none of the credentials can see any GA4 properties")
+            return False
+
+        shards = assign_shards(visible)
+        for path, shard in zip(credentials_paths, shards):
+            print(f"  {os.path.basename(path)}: {sum(len(props) for props in shard.values())} properties "
+                  f"in {len(shard)} accounts")
+
+        print("\nPlanning and applying...")
+        journal_params = {'command': 'grant', 'emails': sorted(set(emails))}
+        futures = [
+            pool.submit(_grant_shard, path, emails, shard, workers, plan_only,
+                        shard_journal_file(journal_file, index),
+                        {**journal_params, 'credentials': os.path.abspath(path)}, resume)
+            for index, (path, shard) in enumerate(zip(credentials_paths, shards))
+            if shard
+        ]
+
+        completed = True
+        planned = 0
+        counts = {'granted': 0, 'already_has_access': 0, 'errors': 0}
+        for future in futures:
+            shard_completed, shard_planned, shard_counts, methods = future.result()
+            metrics.merge(methods)
+            completed = completed and shard_completed
+            planned += shard_planned
+            for outcome, count in shard_counts.items():
+                counts[outcome] += count
+
+    print("\n" + "=" * 70)
+    print("SUMMARY")
+    print("=" * 70)
+    print(f"Credentials:                 {len(credentials_paths)}")
+    print(f"Properties planned:          {planned}")
+    if not plan_only:
+        print(f"Bindings granted:            {counts['granted']}")
+        print(f"Already had access:          {counts['already_has_access']}")
+        print(f"Errors:                      {counts['errors']}")
+    print("=" * 70)
+
+    return completed
+
+
 if __name__ == "__main__":
-    credentials_path = os.path.join(os.path.dirname(__file__), 'gtm-tool-386203-c8dc903f3c2d.json')
+    parser = argparse.ArgumentParser(description='Grant Viewer access to GA4 properties')
+    parser.add_argument('--credentials', action='append',
+                        help='Path to service account JSON (default: file next to this script); '
+                             'repeat to shard the run across several service accounts (implies --batch)')
+    parser.add_argument('--email', action='append',
+                        help=f'Email to grant access to in batch mode, repeatable (default: {SERVICE_ACCOUNT_EMAIL})')
+    parser.add_argument('--batch', action='store_true',
+                        help='Plan missing bindings first, then apply them with batch requests')
+    parser.add_argument('--plan-only', action='store_true',
+                        help='Show the missing bindings without creating any (implies --batch)')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='Properties processed concurrently in batch mode (default: 8)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip accounts and properties finished by an interrupted run')
+    parser.add_argument('--journal-file', default=DEFAULT_JOURNAL_FILE,
+                        help=f'Journal of finished work, written on every run (default: {DEFAULT_JOURNAL_FILE})')
+    parser.add_argument('--metrics-json',
+                        help='Write per-method call counts and latency histograms to this JSON file')
+    parser.add_argument('--metrics-prom',
+                        help='Write the same metrics as a Prometheus textfile')
+    args = parser.parse_args()
 
-    if not os.path.exists(credentials_path):
-        print(f"ERROR: Credentials file not found: {credentials_path}")
-        sys.exit(1)
+    credentials_paths = args.credentials or [DEFAULT_CREDENTIALS_PATH]
+    credentials_path = credentials_paths[0]
 
-    grant_access_to_all_properties(credentials_path)
+    for path in credentials_paths:
+        if not os.path.exists(path):
+            print(f"ERROR: Credentials file not found: {path}")
+            sys.exit(1)
+
+    metrics = ApiMetrics()
+    scheduler = RequestScheduler(metrics=metrics)
+
+    # --email only applies to batch mode; the per-property flow grants SERVICE_ACCOUNT_EMAIL
+    sharded = len(credentials_paths) > 1
+    batch = args.batch or args.plan_only or sharded
+    emails = (args.email or [SERVICE_ACCOUNT_EMAIL]) if batch else [SERVICE_ACCOUNT_EMAIL]
+    # Sharded runs keep one journal per credential, opened in the worker processes
+    journal = None if sharded else RunJournal(args.journal_file, {'command': 'grant', 'emails': sorted(set(emails))},
+                                              resume=args.resume)
+
+    completed = False
+    try:
+        if sharded:
+            completed = grant_access_sharded(credentials_paths, emails, workers=args.workers,
+                                             plan_only=args.plan_only, metrics=metrics,
+                                             journal_file=args.journal_file, resume=args.resume)
+        elif batch:
+            completed = grant_access_batched(credentials_path, emails, workers=args.workers,
+                                             plan_only=args.plan_only, scheduler=scheduler, journal=journal)
+        else:
+            completed = grant_access_to_all_properties(credentials_path, scheduler=scheduler, journal=journal)
+    finally:
+        if journal is not None:
+            if completed:
+                journal.finish()
+            else:
+                journal.close()
+        if not completed:
+            print(f"\n[INFO] Run did not finish; rerun with --resume to continue from {args.journal_file}")
+        write_metrics(metrics, args.metrics_json, args.metrics_prom, job='ga4_grant_access')
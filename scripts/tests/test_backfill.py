@@ -0,0 +1,64 @@
+"""Tests for ga4_discovery.backfill"""
+
+from datetime import date
+
+from ga4_discovery.backfill import MISSING, PRESENT, STALE, CoverageMatrix, plan_backfill
+from ga4_discovery.reports import MONTHS_PER_BATCH
+
+MONTHS = [date(2025, month, 1) for month in range(1, 7)]
+PROPERTIES = [('a.com', '1'), ('b.com', '2')]
+
+
+def test_cells_track_missing_stale_and_present():
+    matrix = CoverageMatrix.from_rows(PROPERTIES, MONTHS, [
+        ('a.com', '1', '2025-06-01', False),
+        ('a.com', '1', '2025-05-01T00:00:00', True),
+        # A fresh duplicate wins over a stale one, in either order
+        ('a.com', '1', '2025-04-01', True),
+        ('a.com', '1', '2025-04-01', False),
+        # Rows for other properties, domains or months are ignored
+        ('c.com', '9', '2025-06-01', False),
+        ('b.com', '2', '2024-12-01', False),
+        ('old-b.com', '2', '2025-06-01', False),
+    ])
+
+    assert list(matrix.cells[('a.com', '1')][:4]) == [PRESENT, STALE, PRESENT, MISSING]
+    assert matrix.needed('a.com', '1') == [date(2025, 5, 1), date(2025, 3, 1), date(2025, 2, 1), date(2025, 1, 1)]
+    assert matrix.needed('b.com', '2') == sorted(MONTHS, reverse=True)
+    assert matrix.counts() == {'missing': 9, 'stale': 1, 'present': 2}
+
+
+def test_plan_pairs_needed_months_newest_first():
+    _, batches = plan_backfill(PROPERTIES, MONTHS, [
+        ('a.com', '1', '2025-06-01', False),
+        ('a.com', '1', '2025-04-01', False),
+        ('b.com', '2', '2025-05-01', False),
+    ])
+
+    assert all(0 < len(months) <= MONTHS_PER_BATCH for _, _, months in batches)
+    assert batches == [
+        ('b.com', '2', [date(2025, 6, 1), date(2025, 4, 1)]),
+        ('a.com', '1', [date(2025, 5, 1), date(2025, 3, 1)]),
+        ('b.com', '2', [date(2025, 3, 1), date(2025, 2, 1)]),
+        ('a.com', '1', [date(2025, 2, 1), date(2025, 1, 1)]),
+        ('b.com', '2', [date(2025, 1, 1)]),
+    ]
+
+
+def test_plan_is_empty_when_covered():
+    rows = [(domain, property_id, month.isoformat(), False) for domain, property_id in PROPERTIES for month in MONTHS]
+    matrix, batches = plan_backfill(PROPERTIES, MONTHS, rows)
+
+    assert batches == []
+    assert matrix.counts()['present'] == len(PROPERTIES) * len(MONTHS)
+
+
+def test_duplicate_properties_are_planned_once():
+    _, batches = plan_backfill([('a.com', '1'), ('a.com', '1')], MONTHS[:2], [])
+    assert batches == [('a.com', '1', [date(2025, 2, 1), date(2025, 1, 1)])]
+
+
+def test_rows_under_another_domain_do_not_cover_a_property():
+    rows = [('a.com', '1', month.isoformat(), False) for month in MONTHS[:2]]
+    _, batches = plan_backfill([('a.com', '1'), ('www.a.com', '1')], MONTHS[:2], rows)
+    assert batches == [('www.a.com', '1', [date(2025, 2, 1), date(2025, 1, 1)])]
@@ -0,0 +1,69 @@
+"""Tests for rule priority in ga4_discovery.categories"""
+
+import json
+
+import pytest
+
+from ga4_discovery.categories import CategoryRules
+
+RULES = CategoryRules([
+    ('blog', ['blog']),
+    ('ecommerce', ['shop', 'store']),
+    ('veterinary', ['vet', 'clinic']),
+    ('pet-services', ['pet', 'animal']),
+])
+
+
+@pytest.mark.parametrize('display_name, domain, expected', [
+    ('Happy Paws Pet Shop', 'happypaws.com', 'ecommerce'),
+    ('Animal Clinic', 'animalclinic.com', 'veterinary'),
+    ('Clinic Blog', 'example.com', 'blog'),
+    ('Happy Paws', 'pets.example.com', 'pet-services'),
+    ('Main Site', 'example.com', 'website'),
+])
+def test_earliest_rule_wins(display_name, domain, expected):
+    assert RULES.categorize(display_name, domain) == expected
+
+
+def test_name_and_domain_are_weighed_together():
+    assert RULES.categorize('Animal Hospital', 'shop.example.com') == 'ecommerce'
+    assert RULES.categorize('Online Store', 'blog.example.com') == 'blog'
+
+
+def test_overlapping_keywords_are_all_seen():
+    # 'pet' starts inside 'petshop' before 'shop' does; both must count
+    assert RULES.categorize('petshop', 'example.com') == 'ecommerce'
+    # 'vet' and 'velvet' overlap in the text
+    assert RULES.categorize('Velvetblog', 'example.com') == 'blog'
+
+
+def test_keyword_listed_twice_keeps_its_first_rule():
+    rules = CategoryRules([('first', ['care']), ('second', ['care', 'home'])], default='other')
+    assert rules.categorize('Home Care', 'example.com') == 'first'
+    assert rules.categorize('Home', 'example.com') == 'second'
+    assert rules.categorize('Other', 'example.com') == 'other'
+
+
+def test_results_are_cached_per_text():
+    rules = CategoryRules([('blog', ['blog'])])
+    assert rules.categorize_all([{'display_name': 'A Blog', 'domain': 'a.com'}] * 3) == ['blog'] * 3
+    assert rules.cache == {'A Blog': 0, 'a.com': None}
+
+
+def test_rules_file_sets_order_and_default(tmp_path):
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps({'default': 'other', 'rules': [
+        {'category': 'pets', 'keywords': ['pet']},
+        {'category': 'shops', 'keywords': ['shop']},
+    ]}))
+    rules = CategoryRules.from_file(str(path))
+
+    assert rules.categorize('Pet Shop', 'example.com') == 'pets'
+    assert rules.categorize('Bookstore', 'example.com') == 'other'
+
+
+def test_invalid_rules_file_is_rejected(tmp_path):
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps({'rules': [{'category': 'blog', 'keywords': 'blog'}]}))
+    with pytest.raises(ValueError):
+        CategoryRules.from_file(str(path))
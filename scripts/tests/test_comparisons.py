@@ -0,0 +1,99 @@
+"""Tests for ga4_discovery.comparisons"""
+
+from datetime import date
+
+import pytest
+
+from ga4_discovery import comparisons
+from ga4_discovery.comparisons import DERIVED_COLUMNS, derive_columns, derive_month, to_column_scale
+from ga4_discovery.reports import CORE_COLUMNS, compare, monthly_metrics_row
+
+INTEGER_COLUMNS = {'key_events', 'new_users', 'active_users', 'total_users', 'sessions'}
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(comparisons, 'is_available', lambda module: False)
+    return request.param
+
+
+def stored(row):
+    """A row as it comes back from ga4_monthly_metrics_v2 (numeric columns at their scale)"""
+    result = dict(row)
+    for column, value in row.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        if column.replace('previous_month_', '') in INTEGER_COLUMNS:
+            result[column] = int(value)
+        else:
+            result[column] = to_column_scale(value)
+    return result
+
+
+def metrics(seed):
+    return {
+        'key_events': seed % 7, 'new_users': seed * 3, 'active_users': seed * 5, 'total_users': seed * 6,
+        'sessions': seed * 9 % 40, 'engagement_rate': seed * 1.37 % 100, 'avg_engagement_time': seed / 3,
+    }
+
+
+def test_derive_columns_matches_compare(backend):
+    current = [metrics(seed) for seed in range(60)]
+    previous = [metrics(seed * 7 % 13) for seed in range(60)]
+    derived = derive_columns({c: [row[c] for row in current] for c in CORE_COLUMNS},
+                             {c: [row[c] for row in previous] for c in CORE_COLUMNS})
+
+    for index in range(60):
+        expected = monthly_metrics_row('a.com', str(index), date(2025, 10, 1), current[index], previous[index], 'x')
+        for column in DERIVED_COLUMNS:
+            assert derived[column][index] == expected[column], column
+
+
+@pytest.mark.parametrize('current, previous, expected', [
+    (0, 0, (0, 'neutral')),
+    (3, 0, (100, 'up')),
+    (105, 100, (5.0, 'neutral')),
+    (106, 100, (6.0, 'up')),
+    (94, 100, (-6.0, 'down')),
+])
+def test_compare_columns_threshold(backend, current, previous, expected):
+    changes, trends = comparisons.compare_columns([current], [previous])
+    assert (changes[0], trends[0]) == expected == compare(current, previous)
+
+
+def test_stored_rounding_is_not_a_change():
+    assert not comparisons._differs('33.33', 100 / 3)
+    assert comparisons._differs('33.34', 100 / 3)
+    assert comparisons._differs('up', 'down')
+
+
+def test_recompute_twice_writes_nothing_the_second_time(backend):
+    september = [stored(monthly_metrics_row('a.com', str(i), date(2025, 9, 1), metrics(i + 1), None, 'x'))
+                 for i in range(40)]
+    october = [stored(monthly_metrics_row('a.com', str(i), date(2025, 10, 1), metrics(i * 5 % 11), None, 'x'))
+               for i in range(40)]
+    previous_rows = {row['property_id']: row for row in september}
+
+    _, changed = derive_month(october, previous_rows)
+    assert changed
+    written = {row['property_id']: stored(row) for row in changed}
+    october = [written.get(row['property_id'], row) for row in october]
+
+    _, changed = derive_month(october, previous_rows)
+    assert changed == []
+
+
+def test_compare_columns_rejects_unequal_lengths(backend):
+    with pytest.raises(ValueError):
+        comparisons.compare_columns([1, 2], [1])
+
+
+def test_property_without_previous_row_keeps_its_stored_previous_values(backend):
+    row = stored(monthly_metrics_row('a.com', '1', date(2025, 10, 1), metrics(4), metrics(2), 'x'))
+    updated, _ = derive_month([row], {})
+
+    for column in CORE_COLUMNS:
+        assert updated[0][f'previous_month_{column}'] == float(row[f'previous_month_{column}'])
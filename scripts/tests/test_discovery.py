@@ -0,0 +1,60 @@
+"""Tests for the discovery engines, run against the benchmark's fake Admin API"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ga4_discovery.benchmark import FakeAdminService, _discovery_class, build_fleet
+from ga4_discovery.scheduler import RequestScheduler
+
+FLEET = build_fleet(300)
+
+
+def discovery(engine, latency=0.0, **kwargs):
+    """Discovery engine on a fake Admin API, without rate limiting"""
+    return _discovery_class(engine)(FakeAdminService(FLEET, latency=latency),
+                                    scheduler=RequestScheduler(qps=0), **kwargs)
+
+
+def discover(engine, **kwargs):
+    option = 'concurrency' if engine == 'async' else 'workers'
+    discovery_engine = discovery(engine, **{option: 4}, **kwargs)
+    return [record.property_id for record in discovery_engine.iter_properties()]
+
+
+@pytest.mark.parametrize('strategy', ['accounts', 'summaries'])
+def test_engines_yield_the_same_records_in_order(strategy, capsys):
+    expected = [prop.name.split('/')[-1] for account in FLEET.accounts for prop in FLEET.properties[account.name]]
+
+    assert discover('sync', strategy=strategy) == expected
+    assert discover('async', strategy=strategy) == expected
+
+
+@pytest.mark.parametrize('strategy', ['accounts', 'summaries'])
+def test_async_engine_keeps_a_bounded_number_of_tasks(strategy, capsys):
+    async_discovery = discovery('async', latency=0.001, concurrency=2, strategy=strategy)
+
+    async def consume():
+        peak = count = 0
+        async for _ in async_discovery.aiter_properties():
+            count += 1
+            peak = max(peak, len(asyncio.all_tasks()))
+        return count, peak
+
+    count, peak = asyncio.run(consume())
+    assert count == FLEET.property_count
+    # Four stream lookups and four account listings at most, plus the consumer
+    assert peak <= 2 * 2 * 2 + 1
+
+
+def test_async_iter_properties_stops_when_the_consumer_does(capsys):
+    records = discovery('async', latency=0.001, concurrency=1).iter_properties()
+    next(records)
+    records.close()
+
+    deadline = time.monotonic() + 5
+    while any(thread.name == 'ga4-async-discovery' for thread in threading.enumerate()):
+        assert time.monotonic() < deadline, "discovery thread still blocked after the consumer stopped"
+        time.sleep(0.05)
@@ -0,0 +1,102 @@
+"""Tests for domain normalization and ga4_discovery.domains"""
+
+import pytest
+
+from ga4_discovery.domains import DomainIndex
+from ga4_discovery.records import PropertyRecord, normalize_domain
+from ga4_discovery.writers import DiffSqlFileWriter
+
+
+def record(property_id, domain, default_uri=None, create_time=None):
+    return PropertyRecord(property_id, f"Site {property_id}", domain, default_uri=default_uri,
+                          create_time=create_time)
+
+
+@pytest.mark.parametrize('domain', [
+    'example.com', 'www.example.com', 'WWW.Example.COM', 'https://www.example.com/path',
+    'http://example.com:8080', ' example.com. ',
+])
+def test_normalize_domain(domain):
+    assert normalize_domain(domain) == 'example.com'
+
+
+def test_records_carry_the_normalized_domain():
+    prop = record('1', 'WWW.Example.com')
+    assert prop.domain == 'example.com'
+    assert PropertyRecord.from_dict({**prop.to_dict(), 'domain': 'www.example.com'}).domain == 'example.com'
+
+
+def test_index_and_writers_agree_on_the_domain(tmp_path):
+    index = DomainIndex()
+    writer = DiffSqlFileWriter(str(tmp_path / 'diff.sql'), existing={})
+    first = record('1', 'www.shared.com', 'https://www.shared.com/sub')
+    winner = record('2', 'shared.com', 'https://shared.com/')
+
+    for prop in (first, winner):
+        if index.add(prop):
+            writer.write(prop)
+    for streamed, replacement in index.replacements():
+        writer.replace(streamed, replacement)
+
+    assert len(writer.diff()['inserts']) == 1
+    assert list(writer.rows) == ['shared.com']
+    assert writer.rows['shared.com'].property_id == '2'
+
+
+def winner(rule, *props):
+    index = DomainIndex(rule)
+    for prop in props:
+        index.add(prop)
+    [kept] = index.winners()
+    return kept.property_id
+
+
+def test_root_path_prefers_the_site_root_then_any_web_stream():
+    sub_path = record('1', 'a.com', 'https://a.com/clinic')
+    root = record('2', 'a.com', 'https://www.a.com/')
+    guessed = record('3', 'a.com')
+
+    assert winner('root-path', sub_path, root, guessed) == '2'
+    assert winner('root-path', guessed, sub_path) == '1'
+
+
+@pytest.mark.parametrize('rule, expected', [('oldest', '20'), ('newest', '3'), ('lowest-id', '3')])
+def test_create_time_and_id_rules(rule, expected):
+    props = [
+        record('20', 'a.com', create_time='2020-01-01T00:00:00'),
+        record('3', 'a.com', create_time='2024-01-01T00:00:00'),
+        record('100', 'a.com'),
+    ]
+    assert winner(rule, *props) == expected
+
+
+def test_ties_go_to_the_lowest_property_id_whatever_the_order():
+    props = [record(property_id, 'a.com', 'https://a.com/', '2024-01-01T00:00:00') for property_id in ('10', '9', '11')]
+    for rule in ('root-path', 'oldest', 'newest'):
+        assert winner(rule, *props) == '9'
+        assert winner(rule, *reversed(props)) == '9'
+
+
+def test_unknown_rule_is_rejected():
+    with pytest.raises(ValueError):
+        DomainIndex('first')
+
+
+def test_replacements_and_collision_report(tmp_path):
+    index = DomainIndex()
+    first = record('1', 'a.com', 'https://a.com/x')
+    assert index.add(first)
+    assert not index.add(record('2', 'www.a.com', 'https://www.a.com/'))
+    assert index.add(record('3', 'b.com', 'https://b.com/'))
+
+    assert [(streamed.property_id, kept.property_id) for streamed, kept in index.replacements()] == [('1', '2')]
+    [collision] = index.collisions()
+    assert collision['domain'] == 'a.com'
+    assert [prop.property_id for prop in collision['dropped']] == ['1']
+
+    report = tmp_path / 'collisions.csv'
+    index.write_report(str(report))
+    assert report.read_text().splitlines()[1:] == [
+        'a.com,kept,2,Site 2,https://www.a.com/,',
+        'a.com,dropped,1,Site 1,https://a.com/x,',
+    ]
@@ -0,0 +1,88 @@
+"""Tests for the batch apply step of grant-ga4-access.py"""
+
+import importlib.util
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from ga4_discovery.benchmark import FAKE_ADMIN_TYPES
+from ga4_discovery.journal import RunJournal
+from ga4_discovery.scheduler import RequestScheduler
+
+PROPERTY = 'properties/1'
+
+
+def load_grant_module():
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'grant-ga4-access.py')
+    spec = importlib.util.spec_from_file_location('grant_ga4_access', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+grant = load_grant_module()
+
+
+class FakeAdminClient:
+    """Admin API whose batch create fails as a whole when any binding exists"""
+
+    def __init__(self, bound, list_error=None):
+        self.bound = {name: set(emails) for name, emails in bound.items()}
+        self.list_error = list_error
+        self.batches = []
+
+    def list_access_bindings(self, request):
+        if self.list_error is not None:
+            raise self.list_error
+        bindings = [SimpleNamespace(user=email) for email in sorted(self.bound.get(request['parent'], ()))]
+        return SimpleNamespace(access_bindings=bindings, next_page_token='')
+
+    def batch_create_access_bindings(self, request):
+        emails = [create.access_binding.user[len('user:'):] for create in request.requests]
+        self.batches.append(emails)
+        bound = self.bound.setdefault(request.parent, set())
+        if bound.intersection(emails):
+            raise Exception("409 ALREADY_EXISTS: binding already exists")
+        bound.update(emails)
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = RunJournal(str(tmp_path / 'grant.jsonl'))
+    yield journal
+    journal.close()
+
+
+def apply(client, missing, journal):
+    plan = [{'property': PROPERTY, 'display_name': 'Site', 'account': 'Account', 'missing': missing}]
+    return grant.apply_access_grants(client, plan, RequestScheduler(qps=0), journal=journal,
+                                     admin_types=FAKE_ADMIN_TYPES)
+
+
+def test_partly_bound_property_gets_the_rest(journal):
+    client = FakeAdminClient({PROPERTY: ['a@x.com']})
+    counts = apply(client, ['a@x.com', 'b@x.com'], journal)
+
+    assert client.batches == [['a@x.com', 'b@x.com'], ['b@x.com']]
+    assert client.bound[PROPERTY] == {'a@x.com', 'b@x.com'}
+    assert counts == {'granted': 1, 'already_has_access': 0, 'errors': 0}
+    assert journal.get('property', PROPERTY) == 'granted'
+
+
+def test_fully_bound_property_is_skipped(journal):
+    client = FakeAdminClient({PROPERTY: ['user:a@x.com', 'b@x.com']})
+    counts = apply(client, ['a@x.com', 'b@x.com'], journal)
+
+    assert client.batches == [['a@x.com', 'b@x.com']]
+    assert counts == {'granted': 0, 'already_has_access': 1, 'errors': 0}
+    assert journal.get('property', PROPERTY) == 'already_has_access'
+
+
+def test_property_is_not_journaled_when_bindings_cannot_be_listed(journal):
+    client = FakeAdminClient({PROPERTY: ['a@x.com']}, list_error=Exception("403 PERMISSION_DENIED"))
+    counts = apply(client, ['a@x.com', 'b@x.com'], journal)
+
+    assert client.bound[PROPERTY] == {'a@x.com'}
+    assert counts == {'granted': 0, 'already_has_access': 0, 'errors': 1}
+    assert not journal.done('property', PROPERTY)
@@ -0,0 +1,94 @@
+"""Tests for ga4_discovery.journal and resumed discovery runs"""
+
+import json
+
+from ga4_discovery.benchmark import FakeAdminService, _discovery_class, build_fleet
+from ga4_discovery.journal import RunJournal
+from ga4_discovery.scheduler import RequestScheduler
+
+PARAMS = {'command': 'grant', 'emails': ['a@x.com']}
+
+
+def test_resume_reads_back_finished_work(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = RunJournal(path, PARAMS)
+    journal.record('account', 'accounts/1')
+    journal.record('property', '42', {'domain': 'a.com'})
+    journal.close()
+
+    resumed = RunJournal(path, PARAMS, resume=True)
+    assert resumed.done('account', 'accounts/1')
+    assert resumed.get('property', '42') == {'domain': 'a.com'}
+    assert not resumed.done('account', 'accounts/2')
+    resumed.close()
+
+
+def test_without_resume_the_journal_starts_over(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = RunJournal(path, PARAMS)
+    journal.record('account', 'accounts/1')
+    journal.close()
+
+    journal = RunJournal(path, PARAMS)
+    assert not journal.done('account', 'accounts/1')
+    journal.close()
+
+
+def test_other_settings_or_a_finished_run_are_not_resumed(tmp_path, capsys):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = RunJournal(path, PARAMS)
+    journal.record('account', 'accounts/1')
+    journal.close()
+
+    other = RunJournal(path, {**PARAMS, 'emails': ['b@x.com']}, resume=True)
+    assert other.count('account') == 0
+    other.record('account', 'accounts/1')
+    other.finish()
+
+    finished = RunJournal(path, {**PARAMS, 'emails': ['b@x.com']}, resume=True)
+    assert finished.count('account') == 0
+    finished.close()
+    assert 'different settings' in capsys.readouterr().out
+
+
+def test_line_cut_short_by_a_crash_is_skipped(tmp_path, capsys):
+    path = tmp_path / 'journal.jsonl'
+    journal = RunJournal(str(path), PARAMS)
+    journal.record('account', 'accounts/1')
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"kind": "account", "ke')
+
+    resumed = RunJournal(str(path), PARAMS, resume=True)
+    resumed.record('account', 'accounts/2')
+    resumed.close()
+
+    lines = path.read_text().splitlines()
+    assert json.loads(lines[-1])['key'] == 'accounts/2'
+    reread = RunJournal(str(path), PARAMS, resume=True)
+    assert reread.count('account') == 2
+    reread.close()
+
+
+def test_resumed_discovery_skips_journaled_properties(tmp_path, capsys):
+    fleet = build_fleet(60)
+    path = str(tmp_path / 'discovery.jsonl')
+
+    def discovery(journal):
+        service = FakeAdminService(fleet, latency=0)
+        engine = _discovery_class('sync')(service, scheduler=RequestScheduler(qps=0), journal=journal)
+        return service, engine
+
+    service, engine = discovery(RunJournal(path, {'command': 'discover'}))
+    records = engine.iter_properties()
+    interrupted = [next(records).property_id for _ in range(20)]
+    records.close()
+    engine.journal.close()
+
+    service, engine = discovery(RunJournal(path, {'command': 'discover'}, resume=True))
+    resumed = [record.property_id for record in engine.iter_properties()]
+    engine.journal.close()
+
+    assert resumed[:20] == interrupted
+    assert len(resumed) == fleet.property_count
+    assert service.calls['list_data_streams'] == fleet.property_count - 20
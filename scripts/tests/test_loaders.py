@@ -0,0 +1,176 @@
+"""Tests for ga4_discovery.loaders, against in-memory Supabase stand-ins"""
+
+from datetime import date
+from types import SimpleNamespace
+
+from ga4_discovery.loaders import insert_monthly_metrics_to_supabase, insert_to_supabase
+from ga4_discovery.monthly import MonthlyReport
+from ga4_discovery.records import PropertyRecord
+from ga4_discovery.reports import MONTHLY_TABLES
+from ga4_discovery.writers import property_row
+
+OCTOBER = date(2025, 10, 1)
+
+
+class FakeSupabase:
+    """Tables keyed on their unique key; ``fail`` holds (method, table) pairs that raise"""
+
+    def __init__(self, fail=()):
+        self.tables = {table: {} for table in MONTHLY_TABLES}
+        self.fail = set(fail)
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rows(self, table):
+        return sorted(self.tables[table].values(), key=lambda row: tuple(map(str, row.values())))
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.method = None
+        self.filters = []
+
+    def upsert(self, rows, on_conflict=None):
+        self.method, self.payload, self.key = 'upsert', rows, on_conflict.split(',')
+        return self
+
+    def delete(self):
+        self.method = 'delete'
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row[column] in values)
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row[column] == value)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row[column] < value)
+        return self
+
+    def execute(self):
+        if (self.method, self.table) in self.db.fail:
+            raise Exception(f"{self.method} on {self.table} failed")
+        rows = self.db.tables[self.table]
+        if self.method == 'upsert':
+            for row in self.payload:
+                rows[tuple(row[column] for column in self.key)] = dict(row)
+        else:
+            for key, row in list(rows.items()):
+                if all(matches(row) for matches in self.filters):
+                    del rows[key]
+
+
+def report(sources, fetched_at):
+    return MonthlyReport('a.com', '1', OCTOBER, {'domain': 'a.com', 'property_id': '1',
+                                                 'metric_month': OCTOBER.isoformat(), 'fetched_at': fetched_at},
+                         [{'source_medium': source, 'users': users} for source, users in sources], None)
+
+
+def write(db, *reports):
+    return insert_monthly_metrics_to_supabase(reports, '', '', client=db)
+
+
+def traffic(db):
+    return [(row['source_medium'], row['users']) for row in db.rows('ga4_traffic_sources')]
+
+
+def test_breakdown_rows_are_replaced(capsys):
+    db = FakeSupabase()
+    write(db, report([('google / organic', 5), ('bing / organic', 1)], '2025-11-01T00:00:00'))
+    stats = write(db, report([('google / organic', 7)], '2025-11-02T00:00:00'))
+
+    assert traffic(db) == [('google / organic', 7)]
+    assert stats['errors'] == 0
+
+
+def test_failed_upsert_keeps_the_stored_rows(capsys):
+    db = FakeSupabase()
+    write(db, report([('google / organic', 5), ('bing / organic', 1)], '2025-11-01T00:00:00'))
+
+    capsys.readouterr()
+    db.fail.add(('upsert', 'ga4_traffic_sources'))
+    stats = write(db, report([('google / organic', 7)], '2025-11-02T00:00:00'))
+
+    assert traffic(db) == [('bing / organic', 1), ('google / organic', 5)]
+    assert stats['errors'] == 1
+    assert stats['ga4_traffic_sources'] == 0
+    output = capsys.readouterr().out
+    assert 'finished with errors' in output
+    assert '✓ Wrote' not in output
+
+
+class FakePropertiesClient:
+    """ga4_properties holding ``rows``; an upsert containing a domain in ``bad`` fails"""
+
+    def __init__(self, rows=(), bad=()):
+        self.rows = {row['domain']: dict(row) for row in rows}
+        self.bad = set(bad)
+        self.upserts = []
+
+    def table(self, name):
+        assert name == 'ga4_properties'
+        return self
+
+    def select(self, columns):
+        self.result = SimpleNamespace(data=sorted(self.rows.values(), key=lambda row: row['domain']))
+        return self
+
+    def order(self, column):
+        return self
+
+    def range(self, start, end):
+        self.result = SimpleNamespace(data=self.result.data[start:end + 1])
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.result = None
+        self.payload = rows
+        return self
+
+    def execute(self):
+        if self.result is not None:
+            return self.result
+        self.upserts.append([row['domain'] for row in self.payload])
+        if self.bad & {row['domain'] for row in self.payload}:
+            raise Exception('invalid row')
+        for row in self.payload:
+            self.rows[row['domain']] = dict(row)
+
+
+def properties(*domains):
+    return [PropertyRecord(str(n), f"Site {n}", domain) for n, domain in enumerate(domains)]
+
+
+def test_properties_are_classified_and_only_changes_sent(capsys):
+    unchanged, renamed, new = properties('a.com', 'b.com', 'd.com')
+    client = FakePropertiesClient([property_row(unchanged), {**property_row(renamed), 'description': 'Old'}])
+
+    stats = insert_to_supabase([unchanged, renamed, new], '', '', client=client)
+
+    assert (stats['inserted'], stats['updated'], stats['unchanged'], stats['errors']) == (1, 1, 1, 0)
+    assert client.upserts == [['b.com', 'd.com']]
+
+
+def test_failing_batch_is_bisected_down_to_the_bad_row(capsys):
+    client = FakePropertiesClient(bad={'c.com'})
+    stats = insert_to_supabase(properties('a.com', 'b.com', 'c.com', 'd.com'), '', '', batch_size=4, client=client)
+
+    assert stats['inserted'] == 3 and stats['errors'] == 1
+    assert sorted(client.rows) == ['a.com', 'b.com', 'd.com']
+    assert client.upserts == [['a.com', 'b.com', 'c.com', 'd.com'], ['a.com', 'b.com'], ['c.com', 'd.com'],
+                              ['c.com'], ['d.com']]
+    assert '✗ Error inserting c.com' in capsys.readouterr().out
+
+
+def test_later_property_wins_a_shared_domain(capsys):
+    client = FakePropertiesClient()
+    stats = insert_to_supabase(properties('a.com', 'www.a.com'), '', '', client=client)
+
+    assert stats['inserted'] == 1
+    assert client.rows['a.com']['property_id'] == '1'
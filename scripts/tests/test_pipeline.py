@@ -0,0 +1,100 @@
+"""Tests for the bounded queues of ga4_discovery.pipeline"""
+
+import threading
+
+import pytest
+
+from ga4_discovery.domains import DomainIndex
+from ga4_discovery.pipeline import DatabasePipeline, PipelineAborted, QueueFeed
+from ga4_discovery.records import PropertyRecord
+
+
+def record(property_id, domain, default_uri=None):
+    return PropertyRecord(property_id, f"Site {property_id}", domain, default_uri=default_uri)
+
+
+def run_in_thread(fn):
+    thread = threading.Thread(target=fn, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_put_stops_blocking_once_the_consumer_stops():
+    feed = QueueFeed(maxsize=1)
+    assert feed.put('a')
+
+    results = []
+    producer = run_in_thread(lambda: results.append(feed.put('b')))
+    producer.join(0.3)
+    assert producer.is_alive()
+
+    feed.stopped.set()
+    producer.join(2)
+    assert not producer.is_alive()
+    assert results == [False]
+
+
+def test_abort_ends_iteration_with_an_error():
+    feed = QueueFeed()
+    feed.put('a')
+    feed.abort()
+
+    items = []
+    with pytest.raises(PipelineAborted):
+        for item in feed:
+            items.append(item)
+    assert items == ['a']
+
+
+def test_loaders_get_every_property_and_the_superseded_ids():
+    seen = {}
+
+    def loader(properties, superseded):
+        seen['ids'] = [prop.property_id for prop in properties]
+        seen['superseded'] = set(superseded)
+        return len(seen['ids'])
+
+    pipeline = DatabasePipeline({'postgres': loader}, queue_size=1, domain_index=DomainIndex())
+    assert pipeline.add(record('1', 'a.com', 'https://a.com/sub'))
+    assert not pipeline.add(record('2', 'a.com', 'https://a.com/'))
+    assert pipeline.add(record('3', 'b.com'))
+
+    assert pipeline.finish() == {'postgres': 3}
+    assert seen == {'ids': ['1', '3', '2'], 'superseded': {'1'}}
+
+
+def test_interrupted_run_aborts_the_loaders(capsys):
+    def loader(properties, superseded):
+        for _ in properties:
+            pass
+        return 'committed'
+
+    pipeline = DatabasePipeline({'postgres': loader})
+    pipeline.add(record('1', 'a.com'))
+
+    assert pipeline.finish(complete=False) == {}
+    assert isinstance(pipeline.errors['postgres'], PipelineAborted)
+    assert '⚠ postgres load stopped' in capsys.readouterr().out
+
+
+def test_failed_loader_does_not_block_discovery_or_the_others(capsys):
+    loaded = []
+
+    def broken(properties, superseded):
+        raise RuntimeError('connection refused')
+
+    def working(properties, superseded):
+        loaded.extend(prop.property_id for prop in properties)
+        return len(loaded)
+
+    pipeline = DatabasePipeline({'supabase': broken, 'postgres': working}, queue_size=1)
+    done = []
+    producer = run_in_thread(lambda: done.append(
+        [pipeline.add(record(str(n), f"site{n}.com")) for n in range(20)]
+    ))
+    producer.join(5)
+    assert not producer.is_alive()
+
+    assert pipeline.finish() == {'postgres': 20}
+    assert loaded == [str(n) for n in range(20)]
+    assert 'ERROR: supabase load failed: connection refused' in capsys.readouterr().out
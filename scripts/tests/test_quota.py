@@ -0,0 +1,107 @@
+"""Tests for ga4_discovery.quota"""
+
+import threading
+from types import SimpleNamespace
+
+from ga4_discovery.quota import PROJECT_SERVER_ERROR_RESERVE, QuotaTracker, is_quota_error, quota_statuses
+
+
+def property_quota(**quotas):
+    """A response's property_quota with (consumed, remaining) per quota name"""
+    return SimpleNamespace(**{name: SimpleNamespace(consumed=consumed, remaining=remaining)
+                              for name, (consumed, remaining) in quotas.items()})
+
+
+HEALTHY = property_quota(tokens_per_day=(10, 20000), tokens_per_hour=(10, 4000), concurrent_requests=(0, 10))
+
+
+def respond(tracker, count, quota=HEALTHY):
+    for _ in range(count):
+        with tracker.slot():
+            tracker.record('1', [quota])
+
+
+def test_quota_statuses():
+    assert quota_statuses(None) == {}
+    assert quota_statuses(property_quota(tokens_per_hour=(12, 3988))) == {'tokens_per_hour': (12, 3988)}
+
+
+def test_is_quota_error():
+    assert is_quota_error(type('ResourceExhausted', (Exception,), {})())
+    assert is_quota_error(SimpleNamespace(code=429))
+    assert not is_quota_error(SimpleNamespace(code=503))
+
+
+def test_additive_increase():
+    tracker = QuotaTracker(initial=2, max_workers=4)
+    respond(tracker, 1)
+    assert tracker.limit == 2
+    respond(tracker, 1)
+    assert tracker.limit == 3
+    respond(tracker, 3 + 4 + 4)
+    assert tracker.limit == 4
+    assert tracker.increases == 2
+
+
+def test_multiplicative_decrease():
+    tracker = QuotaTracker(initial=8, min_workers=2)
+    with tracker.slot():
+        tracker.throttled()
+    assert tracker.limit == 4
+    with tracker.slot():
+        tracker.throttled()
+    with tracker.slot():
+        tracker.throttled()
+    assert tracker.limit == 2
+    assert tracker.decreases == 2
+
+
+def test_throttles_from_before_a_decrease_do_not_halve_again():
+    tracker = QuotaTracker(initial=8)
+    sent = threading.Barrier(2)
+    first_done = threading.Event()
+
+    def request(first):
+        with tracker.slot():
+            sent.wait()
+            if first:
+                tracker.throttled()
+                first_done.set()
+            else:
+                first_done.wait()
+                tracker.throttled()
+
+    threads = [threading.Thread(target=request, args=(first,)) for first in (True, False)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert tracker.limit == 4
+    assert tracker.decreases == 1
+
+
+def test_low_server_error_budget_drops_to_minimum():
+    tracker = QuotaTracker(initial=8, min_workers=2)
+    respond(tracker, 1, property_quota(
+        tokens_per_hour=(10, 4000), server_errors_per_project_per_hour=(1, PROJECT_SERVER_ERROR_RESERVE - 1)))
+    assert tracker.limit == 2
+
+
+def test_concurrent_request_limit_holds_growth():
+    tracker = QuotaTracker(initial=1, max_workers=4)
+    respond(tracker, 5, property_quota(tokens_per_hour=(10, 4000), concurrent_requests=(1, 0)))
+    assert tracker.limit == 1
+
+
+def test_defer_reason():
+    tracker = QuotaTracker(initial=1, reserve_requests=3)
+    assert tracker.defer_reason('1') is None
+
+    tracker.record('1', [property_quota(tokens_per_day=(10, 500), tokens_per_hour=(10, 30))])
+    assert tracker.defer_reason('1') is None
+    tracker.record('1', [property_quota(tokens_per_day=(10, 500), tokens_per_hour=(10, 29))])
+    assert tracker.defer_reason('1') == '29 hourly tokens left'
+    tracker.record('1', [property_quota(tokens_per_day=(10, 9), tokens_per_hour=(10, 1000))])
+    assert tracker.defer_reason('1') == 'daily tokens exhausted'
+    assert tracker.defer_reason('2') is None
@@ -0,0 +1,85 @@
+"""Tests for ga4_discovery.report_cache"""
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from ga4_discovery.report_cache import ReportCache, report_key
+
+TODAY = date(2025, 11, 10)
+
+
+def report(end_date, start_date='2025-10-01'):
+    return {'date_ranges': [{'start_date': start_date, 'end_date': end_date, 'name': start_date}],
+            'metrics': [{'name': 'sessions'}]}
+
+
+def result(*rows):
+    return SimpleNamespace(rows=[
+        SimpleNamespace(dimension_values=[SimpleNamespace(value=dimension)],
+                        metric_values=[SimpleNamespace(value=value)])
+        for dimension, value in rows
+    ])
+
+
+def rows_of(cached):
+    return [(row.dimension_values[0].value, row.metric_values[0].value) for row in cached.rows]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ReportCache(str(tmp_path / 'reports.sqlite'), settle_days=3, today=TODAY)
+    yield cache
+    cache.close()
+
+
+def test_settled_months_only(cache):
+    # Settled once every date range ended more than settle_days before today
+    assert cache.is_settled(report('2025-10-31'))
+    assert cache.is_settled(report('2025-11-06', '2025-11-01'))
+    assert not cache.is_settled(report('2025-11-07', '2025-11-01'))
+    assert not cache.is_settled({'date_ranges': [report('2025-10-31')['date_ranges'][0],
+                                                 report('2025-11-30', '2025-11-01')['date_ranges'][0]]})
+
+
+def test_round_trip_of_settled_reports(cache):
+    cache.put('1', report('2025-10-31'), result(('2025-10-01', '42')))
+    cache.put('1', report('2025-11-30', '2025-11-01'), result(('2025-11-01', '7')))
+
+    assert rows_of(cache.get('1', report('2025-10-31'))) == [('2025-10-01', '42')]
+    assert cache.get('2', report('2025-10-31')) is None
+    assert cache.get('1', report('2025-11-30', '2025-11-01')) is None
+    assert cache.stored == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_ignores_dict_order():
+    definition = report('2025-10-31')
+    reordered = {'metrics': definition['metrics'], 'date_ranges': definition['date_ranges']}
+    assert report_key('1', definition) == report_key('1', reordered)
+    assert report_key('1', definition) != report_key('2', definition)
+
+
+def test_least_recently_used_reports_are_evicted(tmp_path):
+    path = str(tmp_path / 'reports.sqlite')
+    months = [f'2025-0{month}' for month in range(1, 6)]
+    with_month = {month: report(f'{month}-28', f'{month}-01') for month in months}
+
+    cache = ReportCache(path, today=TODAY)
+    for month in months:
+        cache.put('1', with_month[month], result((month, 'x' * 200)))
+    entry = cache.size // len(months)
+    cache.close()
+
+    # Reading the oldest entry makes it the most recently used
+    cache = ReportCache(path, max_bytes=entry * 3, today=TODAY)
+    assert cache.evicted == 2
+    assert cache.get('1', with_month[months[0]]) is None
+    cache.get('1', with_month[months[2]])
+    cache.put('1', report('2025-06-28', '2025-06-01'), result(('2025-06', 'x' * 200)))
+
+    assert cache.size <= entry * 3
+    assert cache.get('1', with_month[months[2]]) is not None
+    assert cache.get('1', with_month[months[3]]) is None
+    cache.close()
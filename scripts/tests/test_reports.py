@@ -0,0 +1,123 @@
+"""Tests for ga4_discovery.reports"""
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from ga4_discovery.reports import (
+    CORE_METRICS, KEY_EVENT_FALLBACK_METRICS, KEY_EVENT_METRICS, MAX_DATE_RANGES, MAX_REPORTS_PER_BATCH,
+    MONTHS_PER_BATCH, REPORT_SETS, TRAFFIC_SOURCE_METRICS, build_batch_request, compare, months_between,
+    parse_core, parse_key_events, parse_month, parse_traffic_sources, previous_month,
+)
+
+
+def row(dimensions, metrics):
+    return SimpleNamespace(dimension_values=[SimpleNamespace(value=value) for value in dimensions],
+                           metric_values=[SimpleNamespace(value=str(value)) for value in metrics])
+
+
+def response_rows(request_report, rows):
+    """Rows as the Data API returns them for ``request_report``: metric values in request order
+
+    Each row is (dimension values, {metric name: value}).
+    """
+    names = [metric['name'] for metric in request_report['metrics']]
+    return SimpleNamespace(rows=[row(dimensions, [values[name] for name in names]) for dimensions, values in rows])
+
+
+def test_months():
+    assert parse_month('2025-10') == parse_month('2025-10-01') == date(2025, 10, 1)
+    with pytest.raises(ValueError):
+        parse_month('2025')
+    assert previous_month(date(2025, 1, 1)) == date(2024, 12, 1)
+    assert months_between(date(2024, 11, 15), date(2025, 2, 1)) == [
+        date(2024, 11, 1), date(2024, 12, 1), date(2025, 1, 1), date(2025, 2, 1)]
+
+
+@pytest.mark.parametrize('report_set', REPORT_SETS)
+def test_batch_request_fits_api_limits(report_set):
+    request = build_batch_request('123', [date(2025, 10, 1), date(2025, 9, 1)], report_set)
+
+    assert request['property'] == 'properties/123'
+    assert len(request['requests']) <= MAX_REPORTS_PER_BATCH
+    assert all(len(report['date_ranges']) <= MAX_DATE_RANGES for report in request['requests'])
+    core = request['requests'][0]
+    assert [r['name'] for r in core['date_ranges']] == ['2025-10-01', '2025-09-01', '2025-08-01']
+    assert [metric['name'] for metric in core['metrics']] == list(CORE_METRICS)
+
+
+def test_batch_request_month_count():
+    months = [date(2025, month, 1) for month in range(1, MONTHS_PER_BATCH + 2)]
+    with pytest.raises(ValueError):
+        build_batch_request('1', months)
+    with pytest.raises(ValueError):
+        build_batch_request('1', [])
+
+
+def test_parse_core_reads_request_metric_order():
+    request = build_batch_request('1', [date(2025, 10, 1)], 'core')
+    values = {
+        'conversions': 4, 'newUsers': 10, 'activeUsers': 20, 'totalUsers': 25, 'sessions': 30,
+        'engagementRate': 0.5, 'userEngagementDuration': 200,
+    }
+    report = response_rows(request['requests'][0], [(['2025-10-01'], values)])
+
+    assert parse_core(report) == {'2025-10-01': {
+        'key_events': 4, 'new_users': 10, 'active_users': 20, 'total_users': 25, 'sessions': 30,
+        'engagement_rate': 50.0, 'avg_engagement_time': 10.0,
+    }}
+
+
+def test_parse_traffic_sources_reads_request_metric_order():
+    request = build_batch_request('1', [date(2025, 10, 1)])
+    traffic = request['requests'][1]
+    assert [metric['name'] for metric in traffic['metrics']] == list(TRAFFIC_SOURCE_METRICS)
+
+    def values(users, sessions, engaged, duration):
+        return {'activeUsers': users, 'sessions': sessions, 'newUsers': users // 2, 'engagedSessions': engaged,
+                'engagementRate': 0, 'userEngagementDuration': duration}
+
+    report = response_rows(traffic, [
+        (['google', 'organic', 'Organic Search'], values(10, 20, 10, 100)),
+        (['google', 'organic', 'Unassigned'], values(10, 20, 5, 100)),
+        (['', 'email', 'Email'], values(4, 4, 4, 8)),
+    ])
+    sources = {source['source_medium']: source for source in parse_traffic_sources(report)}
+
+    # Rows split by channel group are summed under the first (busiest) group
+    assert sources['google / organic'] == {
+        'source_medium': 'google / organic', 'channel_group': 'Organic Search', 'users': 20, 'sessions': 40,
+        'new_users': 10, 'engaged_sessions': 15, 'engagement_rate': 37.5, 'avg_engagement_time': 10.0,
+    }
+    assert '(not set) / email' in sources
+
+
+@pytest.mark.parametrize('report_set, metrics', [
+    ('full', KEY_EVENT_METRICS),
+    ('key_events_fallback', KEY_EVENT_FALLBACK_METRICS),
+])
+def test_parse_key_events_reads_request_metric_order(report_set, metrics):
+    request = build_batch_request('1', [date(2025, 10, 1)], report_set)
+    key_events = request['requests'][2]
+    assert [metric['name'] for metric in key_events['metrics']] == list(metrics)
+
+    values = {'conversions': 7, 'eventCount': 7, 'totalUsers': 3, 'eventValue': 12.5}
+    report = response_rows(key_events, [(['purchase'], values)])
+
+    assert parse_key_events(report) == [{
+        'event_name': 'purchase', 'event_count': 7, 'users_triggering': 3,
+        'event_value': 12.5 if 'eventValue' in metrics else 0.0,
+    }]
+
+
+@pytest.mark.parametrize('current, previous, expected', [
+    (0, 0, (0, 'neutral')),
+    (5, 0, (100, 'up')),
+    (105, 100, (5.0, 'neutral')),
+    (95, 100, (-5.0, 'neutral')),
+    (105.01, 100, (pytest.approx(5.01), 'up')),
+    (94.99, 100, (pytest.approx(-5.01), 'down')),
+])
+def test_compare_threshold(current, previous, expected):
+    assert compare(current, previous) == expected
@@ -0,0 +1,211 @@
+"""Tests for ga4_discovery.scheduler"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from ga4_discovery.scheduler import RequestScheduler
+
+
+class TransientError(Exception):
+    code = 503
+
+
+class FakePager:
+    """Pager holding one response; fetching further pages through it is a test failure"""
+
+    def __init__(self, response):
+        self._response = response
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    def _method(self, *args, **kwargs):
+        raise AssertionError("later pages must be requested explicitly")
+
+    def __iter__(self):
+        raise AssertionError("the pager must not be drained")
+
+
+class FakeListMethod:
+    """list_properties over ``pages``, failing once on each page in ``fail_on``"""
+
+    def __init__(self, pages, fail_on=()):
+        self.pages = pages
+        self.fail_on = set(fail_on)
+        self.requests = []
+
+    def __call__(self, request):
+        page_token = request['page_token'] if isinstance(request, dict) else request.page_token
+        self.requests.append(dict(request) if isinstance(request, dict) else page_token)
+        index = int(page_token or 0)
+        if index in self.fail_on:
+            self.fail_on.discard(index)
+            raise TransientError(f"page {index} failed")
+        return FakePager(SimpleNamespace(
+            properties=self.pages[index],
+            next_page_token=str(index + 1) if index + 1 < len(self.pages) else '',
+        ))
+
+
+PAGES = [['a', 'b'], ['c'], ['d', 'e']]
+
+
+@pytest.fixture
+def scheduler():
+    return RequestScheduler(qps=0, base_delay=0)
+
+
+def test_list_requests_every_page_explicitly(scheduler):
+    list_properties = FakeListMethod(PAGES)
+    items = scheduler.list('list_properties', list_properties, filter='parent:accounts/1')
+
+    assert items == ['a', 'b', 'c', 'd', 'e']
+    assert list_properties.requests == [
+        {'filter': 'parent:accounts/1', 'page_token': page_token} for page_token in ('', '1', '2')
+    ]
+    assert scheduler.stats['list_properties']['calls'] == len(PAGES)
+
+
+def test_list_retries_a_failed_page_on_its_own(scheduler):
+    list_properties = FakeListMethod(PAGES, fail_on={1})
+    items = scheduler.list('list_properties', list_properties, request={'filter': 'parent:accounts/1'})
+
+    assert items == ['a', 'b', 'c', 'd', 'e']
+    assert [request['page_token'] for request in list_properties.requests] == ['', '1', '1', '2']
+    assert scheduler.stats['list_properties']['calls'] == len(PAGES) + 1
+    assert scheduler.stats['list_properties']['retries'] == 1
+
+
+def test_list_sets_the_page_token_on_a_request_message(scheduler):
+    list_properties = FakeListMethod(PAGES)
+    request = SimpleNamespace(filter='parent:accounts/1')
+
+    assert scheduler.list('list_properties', list_properties, request=request) == ['a', 'b', 'c', 'd', 'e']
+    assert list_properties.requests == ['', '1', '2']
+
+
+def test_list_returns_plain_lists_as_they_are(scheduler):
+    assert scheduler.list('list_accounts', lambda request: ['x', 'y']) == ['x', 'y']
+
+
+def test_list_async_requests_every_page_explicitly(scheduler):
+    list_properties = FakeListMethod(PAGES, fail_on={2})
+
+    async def list_properties_async(request):
+        return list_properties(request)
+
+    items = asyncio.run(scheduler.list_async('list_properties', list_properties_async,
+                                             request={'filter': 'parent:accounts/1'}))
+
+    assert items == ['a', 'b', 'c', 'd', 'e']
+    assert scheduler.stats['list_properties']['calls'] == len(PAGES) + 1
+    assert scheduler.stats['list_properties']['retries'] == 1
+
+
+def test_list_async_returns_plain_async_iterables_as_lists(scheduler):
+    class Items:
+        async def __aiter__(self):
+            for item in ('x', 'y'):
+                yield item
+
+    async def list_accounts(request):
+        return Items()
+
+    assert asyncio.run(scheduler.list_async('list_accounts', list_accounts)) == ['x', 'y']
+
+
+class DeniedError(Exception):
+    code = 403
+
+
+def failing(errors):
+    """A call raising ``errors`` in turn, then returning 'ok'"""
+    errors = list(errors)
+    calls = []
+
+    def fn():
+        calls.append(len(calls))
+        if errors:
+            raise errors.pop(0)
+        return 'ok'
+
+    return fn, calls
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays asked for, with random.uniform returning its upper bound"""
+    delays = []
+    monkeypatch.setattr('ga4_discovery.scheduler.random.uniform', lambda low, high: high)
+    monkeypatch.setattr('ga4_discovery.scheduler.time.sleep', delays.append)
+    return delays
+
+
+def test_transient_errors_are_retried_until_the_call_succeeds(sleeps):
+    scheduler = RequestScheduler(qps=0, max_retries=3, base_delay=1, max_delay=32)
+    fn, calls = failing([TransientError('busy'), TransientError('busy')])
+
+    assert scheduler.call('get_property', fn) == 'ok'
+    assert len(calls) == 3
+    assert sleeps == [1, 2]
+    stats = scheduler.stats['get_property']
+    assert (stats['calls'], stats['retries'], stats['errors']) == (3, 2, 0)
+
+
+def test_transient_error_is_raised_once_retries_run_out(sleeps):
+    scheduler = RequestScheduler(qps=0, max_retries=2, base_delay=1)
+    fn, calls = failing([TransientError(str(n)) for n in range(5)])
+
+    with pytest.raises(TransientError, match='2'):
+        scheduler.call('get_property', fn)
+    assert len(calls) == 3
+    stats = scheduler.stats['get_property']
+    assert (stats['retries'], stats['errors']) == (2, 1)
+
+
+def test_other_errors_are_raised_without_a_retry(sleeps):
+    scheduler = RequestScheduler(qps=0)
+    fn, calls = failing([DeniedError('denied')])
+
+    with pytest.raises(DeniedError):
+        scheduler.call('create_access_binding', fn)
+    assert len(calls) == 1
+    assert sleeps == []
+    stats = scheduler.stats['create_access_binding']
+    assert (stats['retries'], stats['errors']) == (0, 1)
+
+
+def test_grpc_status_names_are_retryable(sleeps):
+    error = Exception('quota')
+    error.grpc_status_code = SimpleNamespace(name='RESOURCE_EXHAUSTED')
+    fn, calls = failing([error])
+
+    assert RequestScheduler(qps=0).call('list_accounts', fn) == 'ok'
+    assert len(calls) == 2
+
+
+def test_backoff_doubles_up_to_the_cap(sleeps):
+    scheduler = RequestScheduler(qps=0, max_retries=6, base_delay=1, max_delay=5)
+    fn, _ = failing([TransientError('busy')] * 6)
+
+    assert scheduler.call('get_property', fn) == 'ok'
+    assert sleeps == [1, 2, 4, 5, 5, 5]
+
+
+def test_async_calls_back_off_the_same_way(monkeypatch, sleeps):
+    async def sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr('ga4_discovery.scheduler.asyncio.sleep', sleep)
+    scheduler = RequestScheduler(qps=0, max_retries=1, base_delay=3)
+    errors = [TransientError('busy'), TransientError('busy')]
+
+    async def fn():
+        raise errors.pop(0)
+
+    with pytest.raises(TransientError):
+        asyncio.run(scheduler.call_async('get_property', fn))
+    assert sleeps == [3]
+    assert scheduler.stats['get_property']['errors'] == 1
@@ -0,0 +1,57 @@
+"""Tests for assign_shards in ga4_discovery.sharding"""
+
+from ga4_discovery.sharding import assign_shards, shard_journal_file
+
+
+def props(account, count, start=0):
+    return {account: [f"properties/{account}-{n}" for n in range(start, start + count)]}
+
+
+def loads(shards):
+    return [sum(len(names) for names in shard.values()) for shard in shards]
+
+
+def assigned(shards):
+    return sorted(name for shard in shards for names in shard.values() for name in names)
+
+
+def test_every_property_goes_to_exactly_one_credential():
+    shared = {**props('a', 10), **props('b', 6)}
+    visible = [shared, shared, {**shared, **props('c', 4)}]
+    shards = assign_shards(visible)
+
+    names = assigned(shards)
+    assert len(names) == len(set(names)) == 20
+    assert shards[2]['c'] == set(props('c', 4)['c'])
+
+
+def test_accounts_stay_whole_while_they_fit():
+    shared = {**props('a', 5), **props('b', 5), **props('c', 5), **props('d', 5)}
+    shards = assign_shards([shared, shared])
+
+    assert loads(shards) == [10, 10]
+    assert sorted(len(shard) for shard in shards) == [2, 2]
+
+
+def test_large_account_is_split_across_credentials():
+    shared = props('big', 9)
+    shards = assign_shards([shared, shared, shared])
+
+    assert loads(shards) == [3, 3, 3]
+    assert all(list(shard) == ['big'] for shard in shards)
+
+
+def test_properties_only_go_to_credentials_that_see_them():
+    only_first = props('a', 8)
+    shards = assign_shards([only_first, props('b', 2)])
+
+    assert loads(shards) == [8, 2]
+    assert set(shards[0]) == {'a'} and set(shards[1]) == {'b'}
+
+
+def test_credential_that_sees_nothing_gets_an_empty_shard():
+    assert assign_shards([props('a', 3), {}]) == [{'a': set(props('a', 3)['a'])}, {}]
+
+
+def test_shard_journal_file():
+    assert shard_journal_file('.ga4-discovery-journal.jsonl', 1) == '.ga4-discovery-journal.1.jsonl'
@@ -0,0 +1,124 @@
+"""Tests for the SQL writers in ga4_discovery.writers"""
+
+import pytest
+
+from ga4_discovery.records import PropertyRecord
+from ga4_discovery.writers import DiffSqlFileWriter, create_sql_writer, property_row
+
+
+def record(property_id, domain, display_name=None):
+    return PropertyRecord(property_id, display_name or f"Site {property_id}", domain)
+
+
+def existing(*props, is_active=True):
+    return {prop.domain: {**property_row(prop), 'is_active': is_active} for prop in props}
+
+
+def diff_writer(tmp_path, rows, props, **kwargs):
+    writer = DiffSqlFileWriter(str(tmp_path / 'diff.sql'), rows, **kwargs)
+    for prop in props:
+        writer.write(prop)
+    return writer
+
+
+def test_new_domains_are_inserted_and_unchanged_rows_left_alone(tmp_path):
+    kept = record('1', 'a.com')
+    writer = diff_writer(tmp_path, existing(kept), [kept, record('2', 'b.com')])
+
+    diff = writer.diff()
+    assert diff['inserts'] == [('b.com', '2', 'Site 2', record('2', 'b.com').category, True)]
+    assert diff['updates'] == []
+    assert diff['deactivations'] == []
+
+
+def test_updates_set_only_the_changed_columns(tmp_path):
+    rows = existing(record('1', 'a.com', 'Old Name'))
+    rows['b.com'] = {**property_row(record('2', 'b.com')), 'is_active': False}
+    writer = diff_writer(tmp_path, rows, [record('1', 'a.com', 'New Name'), record('2', 'b.com')])
+
+    assert writer.diff()['updates'] == [('a.com', {'description': 'New Name'}), ('b.com', {'is_active': True})]
+
+
+def test_missing_active_domains_are_deactivated(tmp_path):
+    rows = {**existing(record('1', 'a.com'), record('2', 'gone.com')),
+            **existing(record('3', 'inactive.com'), is_active=False)}
+    writer = diff_writer(tmp_path, rows, [record('1', 'a.com')])
+
+    assert writer.diff()['deactivations'] == ['gone.com']
+    assert writer.diff(complete=False)['deactivations'] == []
+    assert diff_writer(tmp_path, rows, [], deactivate_missing=False).diff()['deactivations'] == []
+
+
+def test_listing_failures_read_at_close_block_deactivations(tmp_path, capsys):
+    failures = []
+    writer = diff_writer(tmp_path, existing(record('1', 'gone.com')), [], listing_failures=failures)
+    failures.append('accounts/9')
+    writer.close()
+
+    sql = (tmp_path / 'diff.sql').read_text()
+    assert '-- INCOMPLETE: 1 accounts could not be listed' in sql
+    assert 'is_active = false' not in sql
+    assert writer.stats['deactivated'] == 0
+
+
+def test_closed_file_holds_one_transaction(tmp_path, capsys):
+    rows = existing(record('1', 'a.com', "Old Name"), record('2', 'gone.com'), record('3', 'same.com'))
+    props = [record('1', 'a.com', "Bob's Site"), record('3', 'same.com'), record('4', 'new.com'), record('5', 'newer.com')]
+    writer = diff_writer(tmp_path, rows, props, batch_size=1)
+    writer.close()
+
+    sql = (tmp_path / 'diff.sql').read_text()
+    body = sql[sql.index('BEGIN;'):]
+    assert body.startswith('BEGIN;') and body.endswith('COMMIT;\n')
+    assert body.count('INSERT INTO ga4_properties') == 2
+    assert body.count('ON CONFLICT (domain) DO NOTHING;') == 2
+    assert ("UPDATE ga4_properties SET description = 'Bob''s Site', updated_at = NOW()\n"
+            "WHERE domain = 'a.com';") in body
+    assert "WHERE is_active AND domain IN (\n    'gone.com'\n);" in body
+    assert 'same.com' not in body
+    assert writer.stats == {'inserted': 2, 'updated': 1, 'unchanged': 1, 'deactivated': 1}
+    assert '-- Total properties: 4' in sql
+
+
+def test_replaced_rows_are_compared_as_the_winner(tmp_path):
+    streamed, winner = record('1', 'a.com'), record('2', 'a.com')
+    writer = diff_writer(tmp_path, existing(winner), [streamed])
+    writer.replace(streamed, winner)
+
+    assert writer.count == 1
+    assert writer.diff() == {'inserts': [], 'updates': [], 'deactivations': []}
+
+
+def test_diff_format_needs_the_existing_rows(tmp_path):
+    with pytest.raises(ValueError, match='existing'):
+        create_sql_writer(str(tmp_path / 'diff.sql'), 'diff')
+
+
+def test_multirow_writer_batches_and_keeps_the_last_row_per_domain(tmp_path, capsys):
+    path = tmp_path / 'multirow.sql'
+    writer = create_sql_writer(str(path), 'multirow', batch_size=2)
+    for prop in (record('1', 'a.com'), record('2', 'a.com'), record('3', 'b.com'), record('4', 'c.com')):
+        writer.write(prop)
+    writer.close()
+
+    sql = path.read_text()
+    assert sql.count('INSERT INTO ga4_properties') == 2
+    assert "('a.com', '1'" not in sql and "('a.com', '2'" in sql
+    assert sql.endswith('-- Total properties: 4\n')
+
+
+def test_copy_writer_escapes_fields_and_drops_superseded_rows(tmp_path, capsys):
+    path = tmp_path / 'properties.sql'
+    writer = create_sql_writer(str(path), 'copy')
+    streamed = record('1', 'a.com', 'Tab\there')
+    writer.write(streamed)
+    writer.replace(streamed, record('2', 'a.com'))
+    writer.close()
+
+    rows = (tmp_path / 'properties.tsv').read_text().splitlines()
+    assert rows[0].split('\t')[:4] == ['1', 'a.com', '1', 'Tab\\there']
+    assert rows[1].split('\t')[:3] == ['2', 'a.com', '2']
+    sql = path.read_text()
+    assert "\\copy ga4_properties_staging" in sql and "FROM 'properties.tsv'" in sql
+    assert "DELETE FROM ga4_properties_staging WHERE property_id IN ('1');" in sql
+    assert '-- Total properties: 1' in sql